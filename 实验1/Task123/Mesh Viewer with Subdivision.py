@@ -1,36 +1,150 @@
-from custom_mesh import CustomMesh
+from mesh_cache import MeshCache
+from gpu_buffers import MeshBuffers
+from subdivision_cache import SubdivisionCache
+from subdivision_process import SubdivisionService
+from lod import LodPyramid, projected_diameter
+from laplacian import SMOOTHING_METHODS, WEIGHTINGS
+from procedural import SURFACES, is_procedural, load_mesh
+from profiling import PROFILER, JsonLinesSink
 import os
 from OpenGL.GL import *
 from OpenGL.GLU import *
 from PyQt5 import QtWidgets
-from PyQt5.QtWidgets import QApplication, QVBoxLayout, QPushButton, QLabel, QHBoxLayout, QSpinBox, QComboBox
+from PyQt5.QtWidgets import QApplication, QVBoxLayout, QPushButton, QLabel, QHBoxLayout, QSpinBox, QComboBox, QCheckBox
+from PyQt5.QtWidgets import QDoubleSpinBox
 from PyQt5.QtWidgets import QSizePolicy, QMessageBox
 from PyQt5.QtCore import QThread, pyqtSignal
 from PyQt5.QtGui import QFont
-import numpy as np
 OBJECT_FOLDER = "Object"  # 定义Object文件夹路径
+MESH_CACHE_FOLDER = ".mesh_cache"  # 网格二进制缓存的路径，设置环境变量 MESH_CACHE=0 可关闭缓存
+# 模型列表中附加的参数曲面（在内存中生成），也可以在列表中输入 procedural://sphere?res=2048 这样的地址
+PROCEDURAL_MODELS = [f"procedural://{surface}?res=128" for surface in SURFACES]
+PROFILE_LOG = os.environ.get("MESH_PROFILE")  # 设置后各阶段的耗时和计数以 JSON Lines 格式追加写入该文件
 
 def print_mesh_face(mesh):
     for i, face in enumerate(mesh.faces):
         print(f"Face {i}: {face}")
 
+# 细分线程：mesh 是对源网格 source 依次做 schemes 中的细分得到的网格，
+# 从缓存中已有的最深一级继续细分，每一级的结果（已计算法线和三角形索引）都放入缓存；
+# 细分本身在 service 的子进程中进行（见 subdivision_process），本线程只等待结果，不占用 GIL，细分期间界面可以正常旋转；
+# 每细分完一级发出 progress 和 level_ready（最后一级除外），界面可以先显示已完成的级别；cancel 后不再发出任何结果；
+# limit 为 True 时，发出的是将最后一级投影到极限曲面的网格（极限位置与极限法线），control_mesh 保存未投影的网格供继续细分；
+# profile 为 True 时还发出每一级各阶段的耗时（由子进程中的性能分析钩子收集）
 class SubdivisionWorker(QThread):
-    finished = pyqtSignal(object)
-
-    def __init__(self, mesh, subdivision_type, iterations):
+    finished = pyqtSignal(object, object)  # (细分后的网格, 细分方案序列)
+    level_ready = pyqtSignal(object, object)  # (已完成的中间级网格, 细分方案序列)
+    progress = pyqtSignal(int, int, str, float)  # (已完成的级数, 目标级数, 本级的细分方案, 本级耗时秒数)
+    stage_timings = pyqtSignal(int, object)  # (级数, 按耗时从大到小排列的 [(阶段路径, 秒数), ...])
+    failed = pyqtSignal(str)  # 子进程中细分出错时的错误信息
+
+    def __init__(self, mesh, subdivision_type, iterations, cache=None, source=None, schemes=(), limit=False, profile=False,
+                 service=None):
         super().__init__()
         self.mesh = mesh
         self.subdivision_type = subdivision_type
         self.iterations = iterations
+        self.cache = cache if cache is not None else SubdivisionCache()
+        self.source = source
+        self.schemes = tuple(schemes)
+        self.limit = limit
+        self.profile = profile
+        self.service = service if service is not None else SubdivisionService()
+        self.control_mesh = None
+        self.job = None
+        self.cancelled = False
+
+    # 取消细分：子进程中正在进行的计算立即终止
+    def cancel(self):
+        self.cancelled = True
+        if self.job is not None:
+            self.service.cancel(self.job)
 
     def run(self):
-        subdivided_mesh = self.mesh.copy()
-        for _ in range(self.iterations):
-            if self.subdivision_type == "Loop":
-                subdivided_mesh = subdivided_mesh.subdivide_loop()
-            elif self.subdivision_type == "Catmull-Clark":
-                subdivided_mesh = subdivided_mesh.subdivide_catmull_clark()
-        self.finished.emit(subdivided_mesh)
+        target = self.schemes + (self.subdivision_type,) * self.iterations
+        level, subdivided_mesh = self.cache.deepest(self.source, target, min_level=len(self.schemes) + 1)
+        if subdivided_mesh is None:
+            level, subdivided_mesh = len(self.schemes), self.mesh
+        remaining = target[level:]
+        if remaining and not self.cancelled:
+            self.job = self.service.submit(subdivided_mesh, remaining, profile=self.profile)
+            if self.cancelled:
+                self.service.cancel(self.job)  # submit 之前已被取消
+            try:
+                for offset, subdivided_mesh, seconds, timings in self.job.levels():
+                    self.cache.put(self.source, target[:level + offset], subdivided_mesh)
+                    self.progress.emit(level + offset, len(target), remaining[offset - 1], seconds)
+                    if timings is not None:
+                        self.stage_timings.emit(level + offset, timings)
+                    if offset < len(remaining):
+                        self.level_ready.emit(subdivided_mesh, target[:level + offset])
+            except RuntimeError as error:
+                self.failed.emit(str(error))
+                return
+        if self.cancelled:
+            return
+        self.control_mesh = subdivided_mesh
+
+        if self.limit and target and target[-1] in ("Loop", "Catmull-Clark"):
+            limit_key = target + ("limit",)
+            limit_mesh = self.cache.get(self.source, limit_key)
+            if limit_mesh is None:
+                limit_mesh = subdivided_mesh.project_to_limit(target[-1])
+                self.cache.put(self.source, limit_key, limit_mesh)
+            subdivided_mesh = limit_mesh
+        self.finished.emit(subdivided_mesh, target)
+
+# 简化线程：对网格做二次误差度量（QEM）简化，保留 ratio 比例的顶点；
+# 简化也作为一步记入方案序列（("QEM", ratio)），结果放入细分缓存，之后的细分从简化后的网格继续
+class SimplificationWorker(QThread):
+    finished = pyqtSignal(object, object)  # (简化后的网格, 方案序列)
+
+    def __init__(self, mesh, ratio, cache=None, source=None, schemes=()):
+        super().__init__()
+        self.mesh = mesh
+        self.ratio = ratio
+        self.cache = cache if cache is not None else SubdivisionCache()
+        self.source = source
+        self.schemes = tuple(schemes)
+        self.control_mesh = None
+        self.cancelled = False
+
+    def run(self):
+        target = self.schemes + (("QEM", self.ratio),)
+        simplified_mesh = self.cache.get(self.source, target)
+        if simplified_mesh is None:
+            simplified_mesh = self.mesh.simplify(target_ratio=self.ratio)
+            simplified_mesh.extract_edges()  # 在线程中生成边索引，上传时不阻塞界面
+            self.cache.put(self.source, target, simplified_mesh)
+        self.control_mesh = simplified_mesh
+        self.finished.emit(simplified_mesh, target)
+
+# 平滑线程：对网格做若干次拉普拉斯或 Taubin 平滑（顶点位置），与简化一样作为一步记入方案序列
+# （("Smooth", 方法, 权重, 次数)），结果放入细分缓存，之后的细分从平滑后的网格继续
+class SmoothingWorker(QThread):
+    finished = pyqtSignal(object, object)  # (平滑后的网格, 方案序列)
+
+    def __init__(self, mesh, method, weighting, iterations, cache=None, source=None, schemes=()):
+        super().__init__()
+        self.mesh = mesh
+        self.method = method
+        self.weighting = weighting
+        self.iterations = iterations
+        self.cache = cache if cache is not None else SubdivisionCache()
+        self.source = source
+        self.schemes = tuple(schemes)
+        self.control_mesh = None
+        self.cancelled = False
+
+    def run(self):
+        target = self.schemes + (("Smooth", self.method, self.weighting, self.iterations),)
+        smoothed_mesh = self.cache.get(self.source, target)
+        if smoothed_mesh is None:
+            smoothed_mesh = self.mesh.smooth(self.iterations, self.method, self.weighting)
+            smoothed_mesh.extract_edges()  # 与输入共用面片时已有边索引，不会重复生成
+            self.cache.put(self.source, target, smoothed_mesh)
+        self.control_mesh = smoothed_mesh
+        self.finished.emit(smoothed_mesh, target)
 
 class MeshViewer(QtWidgets.QOpenGLWidget):
     def __init__(self):
@@ -44,6 +158,23 @@ class MeshViewer(QtWidgets.QOpenGLWidget):
         self.normals = None
         self.last_x, self.last_y = 0, 0
         self.subdivision_worker = None
+        self.simplification_worker = None
+        self.smoothing_worker = None
+        self.retired_workers = []  # 已取消但仍在运行的细分线程，保持引用直到线程结束
+        self.subdivision_cache = SubdivisionCache()
+        self.subdivision_service = SubdivisionService()  # 细分子进程，首次细分时启动
+        self.source = None  # 当前源网格的标识（文件路径和修改时间）
+        self.schemes = ()  # 当前显示的网格由源网格经过的细分方案序列
+        self.control_mesh = None  # 当前细分级别未投影到极限曲面的网格，继续细分时从它开始
+        self.buffers = MeshBuffers()
+        # 细节层次模式：lod_pyramid 保存 lod_target 各前缀对应的细分级别（键为级数），每级各有一组常驻的 GPU 缓冲区
+        self.lod_pyramid = LodPyramid()
+        self.lod_target = ()
+        self.lod_buffers = {}
+        self.lod_level = None  # 当前绘制的级别
+        self.mesh_cache = MeshCache(MESH_CACHE_FOLDER, enabled=os.environ.get("MESH_CACHE", "1") != "0")
+        if PROFILE_LOG:
+            PROFILER.add_sink(JsonLinesSink(PROFILE_LOG))
         
         self.setup_ui()
         self.load_mesh_files()
@@ -97,20 +228,72 @@ class MeshViewer(QtWidgets.QOpenGLWidget):
         self.subdivision_iterations.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
 
         subdivide_button = create_button("细分", self.subdivide_mesh)
+        cancel_button = create_button("取消细分", self.cancel_subdivision)
         reset_button = create_button("重置网格", self.reset_mesh)
 
         subdivision_layout.addWidget(create_white_label("细分类型:"))
         subdivision_layout.addWidget(self.subdivision_type)
         subdivision_layout.addWidget(create_white_label("细分次数:"))
         subdivision_layout.addWidget(self.subdivision_iterations)
+        self.limit_checkbox = QCheckBox("极限位置")
+        self.limit_checkbox.setStyleSheet("QCheckBox { color : white; }")
+        self.limit_checkbox.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+
+        # 简化比例：简化后保留的顶点比例
+        self.simplification_ratio = QDoubleSpinBox()
+        self.simplification_ratio.setRange(0.01, 1.0)
+        self.simplification_ratio.setSingleStep(0.05)
+        self.simplification_ratio.setValue(0.5)
+        self.simplification_ratio.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        simplify_button = create_button("简化", self.simplify_mesh)
+
+        subdivision_layout.addWidget(self.limit_checkbox)
+        # 性能分析：细分时收集各阶段的耗时并显示
+        self.profile_checkbox = QCheckBox("性能分析")
+        self.profile_checkbox.setStyleSheet("QCheckBox { color : white; }")
+        self.profile_checkbox.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        subdivision_layout.addWidget(self.profile_checkbox)
+        # 细节层次：按缩放自动选择绘制的细分级别（不超过当前级别），不勾选时固定绘制当前级别
+        self.lod_checkbox = QCheckBox("自动细节层次")
+        self.lod_checkbox.setStyleSheet("QCheckBox { color : white; }")
+        self.lod_checkbox.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.lod_checkbox.toggled.connect(self.on_lod_toggled)
+        subdivision_layout.addWidget(self.lod_checkbox)
         subdivision_layout.addWidget(subdivide_button)
+        subdivision_layout.addWidget(cancel_button)
+        subdivision_layout.addWidget(create_white_label("简化比例:"))
+        subdivision_layout.addWidget(self.simplification_ratio)
+        subdivision_layout.addWidget(simplify_button)
         subdivision_layout.addWidget(reset_button)
 
         layout.addLayout(subdivision_layout)
 
+        # 平滑控制布局：平滑方法、权重和迭代次数，边界点保持不动
+        smoothing_layout = QHBoxLayout()
+        self.smoothing_method = QComboBox()
+        self.smoothing_method.addItems(SMOOTHING_METHODS)
+        self.smoothing_method.setCurrentText("taubin")
+        self.smoothing_method.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.smoothing_weighting = QComboBox()
+        self.smoothing_weighting.addItems(WEIGHTINGS)
+        self.smoothing_weighting.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.smoothing_iterations = QSpinBox()
+        self.smoothing_iterations.setRange(1, 200)
+        self.smoothing_iterations.setValue(20)
+        self.smoothing_iterations.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        smoothing_layout.addWidget(create_white_label("平滑方法:"))
+        smoothing_layout.addWidget(self.smoothing_method)
+        smoothing_layout.addWidget(create_white_label("权重:"))
+        smoothing_layout.addWidget(self.smoothing_weighting)
+        smoothing_layout.addWidget(create_white_label("平滑次数:"))
+        smoothing_layout.addWidget(self.smoothing_iterations)
+        smoothing_layout.addWidget(create_button("平滑", self.smooth_mesh))
+        layout.addLayout(smoothing_layout)
+
         # 加载OBJ文件的选择控件
         obj_selection_layout = QHBoxLayout()
         self.obj_file_selector = QComboBox()
+        self.obj_file_selector.setEditable(True)  # 可以输入参数曲面的地址，回车后加入列表并加载
         self.obj_file_selector.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.obj_file_selector.currentIndexChanged.connect(self.load_selected_obj)
 
@@ -122,6 +305,12 @@ class MeshViewer(QtWidgets.QOpenGLWidget):
         # 说明文字
         layout.addWidget(create_white_label("使用鼠标拖动旋转，滚轮缩放"))
 
+        # 细分进度和耗时
+        self.status_label = create_white_label("")
+        layout.addWidget(self.status_label)
+        self.lod_label = create_white_label("")
+        layout.addWidget(self.lod_label)
+
         # 设置布局的伸缩因子
         layout.addStretch(1)
 
@@ -133,110 +322,69 @@ class MeshViewer(QtWidgets.QOpenGLWidget):
         font = QFont("Arial", new_font_size)
 
         # 遍历所有子控件并设置字体大小
-        for widget in self.findChildren((QPushButton, QLabel, QComboBox, QSpinBox)):
+        for widget in self.findChildren((QPushButton, QLabel, QComboBox, QSpinBox, QDoubleSpinBox, QCheckBox)):
             widget.setFont(font)
 
         super().resizeEvent(event)
 
     def load_mesh_files(self):
-        """加载Object文件夹中的.obj文件"""
+        """加载Object文件夹中的.obj文件，并附加参数曲面"""
+        self.obj_file_selector.clear()
         if os.path.exists(OBJECT_FOLDER):
             obj_files = [f for f in os.listdir(OBJECT_FOLDER) if f.endswith('.obj')]
-            self.obj_file_selector.clear()
             self.obj_file_selector.addItems(obj_files)
         else:
             print(f"文件夹 {OBJECT_FOLDER} 不存在")
+        self.obj_file_selector.addItems(PROCEDURAL_MODELS)
 
     def load_selected_obj(self):
         """根据选择加载OBJ文件"""
         selected_file = self.obj_file_selector.currentText()
         if selected_file:
-            file_path = os.path.join(OBJECT_FOLDER, selected_file)
-            self.mesh = CustomMesh.from_obj(file_path)
-            self.original_mesh = self.mesh.copy()
+            if is_procedural(selected_file):
+                try:
+                    mesh = load_mesh(selected_file)  # 参数曲面在内存中生成，不经过文件和网格缓存
+                except ValueError as e:
+                    self.status_label.setText(f"无法生成参数曲面：{e}")
+                    return
+                source = (selected_file, 0)
+            else:
+                file_path = os.path.join(OBJECT_FOLDER, selected_file)
+                if not os.path.isfile(file_path):
+                    self.status_label.setText(f"文件 {file_path} 不存在")
+                    return
+                mesh = self.mesh_cache.load(file_path)
+                source = (os.path.abspath(file_path), os.stat(file_path).st_mtime_ns)
+            self.cancel_subdivision()
+            self.clear_lod()
+            self.mesh = mesh
+            self.original_mesh = self.control_mesh = self.mesh  # 网格不会被原地修改，源网格直接作为第 0 级放入细分缓存
+            self.source = source
+            self.schemes = ()
+            self.subdivision_cache.put(self.source, (), self.mesh)
             self.update()
 
-    def setup_buffers(self):
-        self.VAO = glGenVertexArrays(1)
-        self.VBO = glGenBuffers(1)
-        self.EBO = glGenBuffers(1)
-        vertices = []
-        normals = []
-        indices = []
-
-        vertices = self.mesh.vertices
-        normals = self.mesh.normals
-        indices = self.mesh.indices
-
-        vertices = np.array(self.mesh.vertices, dtype=np.float32).flatten()
-        normals = np.array(self.mesh.normals, dtype=np.float32).flatten()
-        indices = np.array(indices, dtype=np.uint32)
-
-        glBindVertexArray(self.VAO)
-
-        glBindBuffer(GL_ARRAY_BUFFER, self.VBO)
-        glBufferData(GL_ARRAY_BUFFER, vertices.nbytes + normals.nbytes, None, GL_STATIC_DRAW)
-        glBufferSubData(GL_ARRAY_BUFFER, 0, vertices.nbytes, vertices)
-        glBufferSubData(GL_ARRAY_BUFFER, vertices.nbytes, normals.nbytes, normals)
-
-        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.EBO)
-        glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
-
-        glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 3 * sizeof(GLfloat), ctypes.c_void_p(0))
-        glEnableVertexAttribArray(0)
-
-        glVertexAttribPointer(1, 3, GL_FLOAT, GL_FALSE, 3 * sizeof(GLfloat), ctypes.c_void_p(vertices.nbytes))
-        glEnableVertexAttribArray(1)
-
-        glBindVertexArray(0)
-
-    def draw_mesh(self):
-        if self.mesh is not None:
-            if self.draw_mode == GL_POINTS:
-                glDisable(GL_LIGHTING)
-                glColor3f(1.0, 1.0, 1.0)
-                glPointSize(4.0)
-                glBegin(GL_POINTS)
-                for vertex in self.mesh.vertices:
-                    glVertex3fv(vertex)
-                glEnd()
-            elif self.draw_mode == GL_LINES:
-                glDisable(GL_LIGHTING)
-                glColor3f(1.0, 1.0, 1.0)
-                glLineWidth(1.0)
-                glBegin(GL_LINES)
-                for face in self.mesh.faces:
-                    for i in range(len(face)):
-                        v0 = self.mesh.vertices[face[i]]
-                        v1 = self.mesh.vertices[face[(i + 1) % len(face)]]
-                        glVertex3fv(v0)
-                        glVertex3fv(v1)
-                glEnd()
-            else:
-                self.setup_lighting()
-                glBegin(GL_TRIANGLES) 
-                for face in self.mesh.faces:
-                    for i in range(len(face) - 2):
-                        v0, v1, v2 = face[0], face[i+1], face[i+2]
-                        glNormal3fv(self.mesh.normals[v0])
-                        glVertex3fv(self.mesh.vertices[v0])
-                        glNormal3fv(self.mesh.normals[v1])
-                        glVertex3fv(self.mesh.vertices[v1])
-                        glNormal3fv(self.mesh.normals[v2])
-                        glVertex3fv(self.mesh.vertices[v2])
-                glEnd()
-
-    def render(self):
-        glBindVertexArray(self.VAO)
-        glPolygonMode(GL_FRONT_AND_BACK, self.draw_mode)
-        glDrawElements(GL_TRIANGLES, len(self.mesh.indices), GL_UNSIGNED_INT, None)
-        glBindVertexArray(0)
+    def render(self, buffers):
+        # 点和线模式分别绘制顶点和网格的边（不受光照影响），面模式绘制三角形
+        if self.draw_mode != GL_FILL:
+            glDisable(GL_LIGHTING)
+            glColor3f(1.0, 1.0, 1.0)
+        buffers.draw(self.draw_mode)
 
     def initializeGL(self):
         glEnable(GL_DEPTH_TEST)
         glDisable(GL_CULL_FACE)
         glPointSize(5) # size 为点的大小，单位是像素
         glLineWidth(3)  # width 为线条的宽度，单位是像素
+        self.context().aboutToBeDestroyed.connect(self.release_buffers)
+
+    def release_buffers(self):
+        self.makeCurrent()
+        self.buffers.release()
+        for buffers in self.lod_buffers.values():
+            buffers.release()
+        self.lod_buffers = {}
+        self.doneCurrent()
 
 
     def resizeGL(self, w, h):
@@ -252,9 +400,61 @@ class MeshViewer(QtWidgets.QOpenGLWidget):
         glTranslatef(0.0, 0.0, self.zoom)
         glRotatef(self.rotation_x, 1, 0, 0)
         glRotatef(self.rotation_y, 0, 1, 0)
-        self.setup_buffers()
+        if self.mesh is None:
+            return
+        buffers = self.lod_level_buffers() if self.lod_active() else None
+        if buffers is None:
+            buffers = self.buffers
+            buffers.update(self.mesh)  # 只有网格改变时才重新上传数据
         self.setup_lighting()
-        self.render()
+        self.render(buffers)
+
+    # 细节层次模式是否可用：已勾选、金字塔不为空，且当前网格是金字塔所在细分序列中的一级（简化等操作之后不可用）
+    def lod_active(self):
+        return (self.lod_checkbox.isChecked() and len(self.lod_pyramid) > 0
+                and self.lod_target[:len(self.schemes)] == self.schemes)
+
+    # 按模型的投影大小选择级别（不超过当前显示的级别），返回该级的缓冲区；金字塔中的各级在首次绘制时上传，之后常驻 GPU
+    def lod_level_buffers(self):
+        diameter = projected_diameter(self.lod_pyramid.radius, -self.zoom, self.height() * self.devicePixelRatioF())
+        level = self.lod_pyramid.select(diameter, self.lod_level, max_level=len(self.schemes))
+        mesh = self.lod_pyramid.get(level)
+        if mesh is None:
+            return None
+        for resident_level in list(self.lod_pyramid.levels):
+            resident_mesh = self.lod_pyramid.get(resident_level)
+            if resident_mesh is not None:
+                self.lod_buffers.setdefault(resident_level, MeshBuffers()).update(resident_mesh)
+        if level != self.lod_level:
+            self.lod_level = level
+            self.lod_label.setText(f"细节层次：绘制第 {level} 级（{len(mesh.indices) // 3} 个三角形）")
+        return self.lod_buffers[level]
+
+    # 把一级网格加入细节层次金字塔，超出内存预算时停止继续细分
+    def add_lod_level(self, schemes, mesh):
+        if not self.lod_checkbox.isChecked() or self.lod_target[:len(schemes)] != tuple(schemes):
+            return
+        if not self.lod_pyramid.add(len(schemes), mesh):
+            self.cancel_subdivision()
+            self.status_label.setText(f"第 {len(schemes)} 级超出细节层次的内存预算，停止细分")
+
+    # 清空金字塔并释放各级的 GPU 缓冲区
+    def clear_lod(self):
+        self.lod_pyramid.clear()
+        self.lod_target = ()
+        self.lod_level = None
+        if self.lod_buffers:
+            self.makeCurrent()
+            for buffers in self.lod_buffers.values():
+                buffers.release()
+            self.lod_buffers = {}
+            self.doneCurrent()
+        self.lod_label.setText("")
+
+    def on_lod_toggled(self, checked):
+        if not checked:
+            self.clear_lod()
+        self.update()
 
     def setup_lighting(self):
         glEnable(GL_LIGHTING)  # 启用光照
@@ -303,6 +503,10 @@ class MeshViewer(QtWidgets.QOpenGLWidget):
     def subdivide_mesh(self):
         if self.mesh is None:
             return
+        busy_worker = self.busy_worker()
+        if busy_worker is not None and busy_worker is not self.subdivision_worker:
+            self.status_label.setText("正在简化或平滑，请等待完成后再细分")
+            return  # 正在进行的细分可以被新的细分取代，简化和平滑不能中途取消
 
         subdivision_type = self.subdivision_type.currentText()
         iterations = self.subdivision_iterations.value()
@@ -332,20 +536,121 @@ class MeshViewer(QtWidgets.QOpenGLWidget):
             if result == QMessageBox.Cancel:
                 return  # 用户取消，不进行细分
 
-        # 如果用户选择继续，则执行细分
-        self.subdivision_worker = SubdivisionWorker(self.mesh, subdivision_type, iterations)
+        # 如果用户选择继续，则执行细分；正在进行的细分被新的请求取代
+        self.cancel_subdivision()
+        if self.lod_checkbox.isChecked():
+            # 细节层次金字塔从第 0 级开始，已缓存的级别直接加入，其余级别由细分线程逐级加入
+            self.clear_lod()
+            self.lod_target = self.schemes + (subdivision_type,) * iterations
+            for level in range(len(self.lod_target) + 1):
+                cached_mesh = self.subdivision_cache.get(self.source, self.lod_target[:level])
+                if cached_mesh is not None:
+                    self.add_lod_level(self.lod_target[:level], cached_mesh)
+        self.subdivision_worker = SubdivisionWorker(self.control_mesh, subdivision_type, iterations,
+                                                    self.subdivision_cache, self.source, self.schemes,
+                                                    limit=self.limit_checkbox.isChecked(),
+                                                    profile=self.profile_checkbox.isChecked(),
+                                                    service=self.subdivision_service)
         self.subdivision_worker.finished.connect(self.on_subdivision_finished)
+        self.subdivision_worker.level_ready.connect(self.on_level_ready)
+        self.subdivision_worker.failed.connect(self.on_subdivision_failed)
+        self.subdivision_worker.progress.connect(self.on_subdivision_progress)
+        self.subdivision_worker.stage_timings.connect(self.on_stage_timings)
+        self.status_label.setText("正在细分...")
         self.subdivision_worker.start()
 
-    def on_subdivision_finished(self, subdivided_mesh):
-        self.mesh = subdivided_mesh
-        self.calculate_normals()
-        self.mesh.triangulate_face()
+    # 取消正在进行的细分，已完成的级别保留在缓存中；被取消的线程在结束前保持引用，它之后发出的信号都被忽略
+    def cancel_subdivision(self):
+        if self.subdivision_worker is not None and self.subdivision_worker.isRunning():
+            self.subdivision_worker.cancel()
+            self.retired_workers = [worker for worker in self.retired_workers if worker.isRunning()]
+            self.retired_workers.append(self.subdivision_worker)
+            self.status_label.setText("细分已取消")
+
+    # 细分、简化、平滑都以 control_mesh 为输入、结果都替换当前网格，同一时间只运行一个：返回正在运行且未被取消的线程
+    def busy_worker(self):
+        for worker in (self.subdivision_worker, self.simplification_worker, self.smoothing_worker):
+            if worker is not None and worker.isRunning() and not worker.cancelled:
+                return worker
+        return None
+
+    # 线程的结果是否仍然有效：发出结果的是当前的线程，没有被取消，期间也没有切换模型；
+    # 细分以外的线程还要求它的输入仍是当前的网格（期间网格被其他操作改变时丢弃结果）
+    def is_current(self, worker):
+        return (any(worker is current for current in (self.subdivision_worker, self.simplification_worker, self.smoothing_worker))
+                and not worker.cancelled and worker.source == self.source
+                and (worker is self.subdivision_worker or worker.mesh is self.control_mesh))
+
+    # 在后台线程中简化当前细分级别的网格（未投影到极限曲面的网格），不阻塞界面
+    def simplify_mesh(self):
+        if self.mesh is None:
+            return
+        if self.busy_worker() is not None:
+            self.status_label.setText("正在处理网格，请等待完成后再简化")
+            return  # 不能丢弃仍在运行的线程的引用
+        self.simplification_worker = SimplificationWorker(self.control_mesh, round(self.simplification_ratio.value(), 2),
+                                                          self.subdivision_cache, self.source, self.schemes)
+        self.simplification_worker.finished.connect(self.on_subdivision_finished)
+        self.simplification_worker.start()
+
+    # 在后台线程中平滑当前细分级别的网格（未投影到极限曲面的网格），不阻塞界面
+    def smooth_mesh(self):
+        if self.mesh is None:
+            return
+        if self.busy_worker() is not None:
+            self.status_label.setText("正在处理网格，请等待完成后再平滑")
+            return
+        self.smoothing_worker = SmoothingWorker(self.control_mesh, self.smoothing_method.currentText(),
+                                                self.smoothing_weighting.currentText(), self.smoothing_iterations.value(),
+                                                self.subdivision_cache, self.source, self.schemes)
+        self.smoothing_worker.finished.connect(self.on_subdivision_finished)
+        self.smoothing_worker.start()
+
+    # 细分线程每完成一级显示进度和这一级的耗时
+    def on_subdivision_progress(self, level, total, scheme, seconds):
+        if not self.is_current(self.sender()):
+            return
+        self.status_label.setText(f"细分进度：{level}/{total} 级（{scheme}），本级用时 {seconds:.3f} 秒")
+
+    # 显示这一级耗时最多的几个阶段
+    def on_stage_timings(self, level, timings):
+        if not self.is_current(self.sender()):
+            return
+        stages = "，".join(f"{path} {seconds:.3f} 秒" for path, seconds in timings[:5])
+        self.status_label.setText(f"{self.status_label.text()}\n第 {level} 级各阶段耗时：{stages}")
+
+    # 细分、简化、平滑线程结束后显示结果
+    def on_subdivision_finished(self, subdivided_mesh, schemes):
+        if not self.is_current(self.sender()):
+            return  # 细分被取消或取代，或细分期间切换了模型，丢弃旧的结果
+        if self.status_label.text() == "正在细分...":
+            self.status_label.setText("细分完成（使用缓存的结果）")
+        self.mesh = subdivided_mesh  # 细分线程已计算好法线和三角形索引
+        self.control_mesh = self.sender().control_mesh
+        self.schemes = schemes
+        self.add_lod_level(schemes, subdivided_mesh)
+        self.update()
+
+    # 显示已完成的中间级别，之后的级别仍在子进程中计算
+    def on_level_ready(self, subdivided_mesh, schemes):
+        if not self.is_current(self.sender()):
+            return
+        self.mesh = self.control_mesh = subdivided_mesh
+        self.schemes = schemes
+        self.add_lod_level(schemes, subdivided_mesh)
         self.update()
 
+    def on_subdivision_failed(self, message):
+        if not self.is_current(self.sender()):
+            return
+        self.status_label.setText(f"细分失败：{message}")
+
     def reset_mesh(self):
-        self.mesh = self.original_mesh.copy()
-        self.calculate_normals()
+        self.cancel_subdivision()
+        # 直接使用缓存的第 0 级网格，不需要复制和重新计算法线
+        level_zero = self.subdivision_cache.get(self.source, ())
+        self.mesh = self.control_mesh = level_zero if level_zero is not None else self.original_mesh
+        self.schemes = ()
         self.update()
 
     def mousePressEvent(self, event):
@@ -366,6 +671,16 @@ class MeshViewer(QtWidgets.QOpenGLWidget):
         self.zoom += event.angleDelta().y() * 0.005
         self.update()
 
+    # 关闭窗口时结束细分子进程并等待各线程退出，再写回网格缓存的索引
+    def closeEvent(self, event):
+        self.cancel_subdivision()
+        self.subdivision_service.shutdown()
+        for worker in self.retired_workers + [self.simplification_worker, self.smoothing_worker]:
+            if worker is not None:
+                worker.wait()
+        self.mesh_cache.flush()
+        super().closeEvent(event)
+
 def main():
     app = QApplication([])
     viewer = MeshViewer()
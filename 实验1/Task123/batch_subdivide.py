@@ -0,0 +1,133 @@
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from custom_mesh import CustomMesh
+
+# 批量细分：对目录（或通配符匹配）中的每个 OBJ 文件做若干级细分，可选投影到极限曲面，结果按输入的子目录结构写成 OBJ 或 PLY 文件（可压缩）；
+# 各文件在进程池中并行处理，同时提交的任务数有上限，输出文件比输入文件新时跳过，单个文件出错不影响其余文件，
+# 最后打印每个文件和总体的耗时与吞吐量
+SCHEMES = ("Loop", "Catmull-Clark")
+
+# 输入文件列表：input_path 为目录时取其中的 .obj 文件，否则按通配符匹配（支持 **）
+def find_inputs(input_path):
+    if os.path.isdir(input_path):
+        return sorted(os.path.join(input_path, name) for name in os.listdir(input_path) if name.lower().endswith(".obj"))
+    return sorted(path for path in glob.glob(input_path, recursive=True) if os.path.isfile(path))
+
+# 输入文件的公共目录，输出文件保持输入相对于它的子目录结构
+def common_root(input_paths):
+    return os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in input_paths])
+
+# 输出文件名由输入相对于 root 的路径、细分方案、级数、是否投影到极限曲面和是否写出法向量决定，
+# 不同子目录中的同名文件和参数不同的结果互不覆盖
+def output_path(input_path, output_dir, scheme, levels, limit, normals=False, extension="obj", root=None):
+    relative = os.path.relpath(os.path.abspath(input_path), root) if root else os.path.basename(input_path)
+    stem = os.path.splitext(relative)[0]
+    suffix = f"_{scheme.replace('-', '').lower()}{levels}" + ("_limit" if limit else "") + ("_normals" if normals else "")
+    return os.path.join(output_dir, f"{stem}{suffix}.{extension}")
+
+def is_up_to_date(input_path, output_file):
+    try:
+        return os.stat(output_file).st_mtime_ns >= os.stat(input_path).st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+# 处理一个文件（在工作进程中运行），返回统计信息
+def process_file(input_path, output_file, scheme, levels, normals=False, limit=False):
+    start = time.perf_counter()
+    mesh = CustomMesh.from_obj(input_path)
+    for _ in range(levels):
+        mesh = mesh.subdivide(scheme)
+    if limit and levels > 0:
+        mesh = mesh.project_to_limit(scheme)
+    mesh.export(output_file, normals=normals)  # 先写临时文件再替换，中断时不会留下不完整的输出
+    return {"vertices": len(mesh.vertices), "faces": len(mesh.face_arrays()[0]) - 1,
+            "seconds": time.perf_counter() - start}
+
+# 依次返回 (输入文件, 统计信息, 错误信息)，同时在进程池中的任务不超过 max_in_flight 个；workers 为 1 时在本进程中处理
+def run_jobs(jobs, workers=None, max_in_flight=None):
+    if workers == 1:
+        for input_path, args in jobs:
+            try:
+                yield input_path, process_file(input_path, *args), None
+            except Exception as error:
+                yield input_path, None, f"{type(error).__name__}: {error}"
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        max_in_flight = max_in_flight or 2 * (workers or os.cpu_count() or 1)
+        pending = {}
+        jobs = iter(jobs)
+        while True:
+            for input_path, args in jobs:
+                pending[executor.submit(process_file, input_path, *args)] = input_path
+                if len(pending) >= max_in_flight:
+                    break
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                input_path = pending.pop(future)
+                error = future.exception()
+                if error is not None:
+                    yield input_path, None, f"{type(error).__name__}: {error}"
+                else:
+                    yield input_path, future.result(), None
+
+def main():
+    parser = argparse.ArgumentParser(description="Subdivide a folder of OBJ files in parallel.")
+    parser.add_argument("input", help="folder of .obj files or a glob pattern, e.g. 'models/**/*.obj'")
+    parser.add_argument("output", help="output folder")
+    parser.add_argument("--scheme", choices=SCHEMES, default="Catmull-Clark")
+    parser.add_argument("--levels", type=int, default=1, help="subdivision levels")
+    parser.add_argument("--format", default="obj", help="output extension: obj, ply, optionally compressed, e.g. obj.gz")
+    parser.add_argument("--normals", action="store_true", help="write vertex normals")
+    parser.add_argument("--limit", action="store_true", help="project the last level onto the limit surface")
+    parser.add_argument("--workers", type=int, default=0, help="number of worker processes (0 for all CPUs)")
+    parser.add_argument("--max-in-flight", type=int, help="files submitted to the pool at once (default 2 per worker)")
+    parser.add_argument("--force", action="store_true", help="rewrite outputs that are already up to date")
+    args = parser.parse_args()
+
+    inputs = find_inputs(args.input)
+    if not inputs:
+        print(f"no .obj files match {args.input}")
+        sys.exit(1)
+    os.makedirs(args.output, exist_ok=True)
+
+    jobs, skipped = [], []
+    root = common_root(inputs)
+    for input_path in inputs:
+        output_file = output_path(input_path, args.output, args.scheme, args.levels, args.limit, args.normals,
+                                  args.format, root)
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        if not args.force and is_up_to_date(input_path, output_file):
+            skipped.append(input_path)
+            continue
+        jobs.append((input_path, (output_file, args.scheme, args.levels, args.normals, args.limit)))
+
+    start = time.perf_counter()
+    results, failures = [], []
+    for input_path, stats, error in run_jobs(jobs, args.workers or None, args.max_in_flight):
+        name = os.path.basename(input_path)
+        if error is not None:
+            failures.append((input_path, error))
+            print(f"FAILED {name}: {error}")
+            continue
+        results.append(stats)
+        print(f"{name}: {stats['vertices']} vertices, {stats['faces']} faces in {stats['seconds']:.3f} s "
+              f"({stats['faces'] / max(stats['seconds'], 1e-9):.0f} faces/s)")
+    seconds = time.perf_counter() - start
+
+    faces = sum(stats["faces"] for stats in results)
+    print(f"{len(results)} written, {len(skipped)} up to date, {len(failures)} failed in {seconds:.2f} s"
+          + (f" ({len(results) / seconds:.2f} files/s, {faces / seconds:.0f} faces/s)" if results and seconds > 0 else ""))
+    for input_path, error in failures:
+        print(f"  {input_path}: {error}")
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+from procedural import SURFACES, load_mesh
+from subdivision_operator import OPERATOR_CACHE
+
+try:
+    from gpu_buffers import MeshBuffers
+except ImportError:  # 没有安装 PyOpenGL 时不测上传阶段
+    MeshBuffers = None
+
+# 无界面的性能测试：对 Object 文件夹中的每个模型和在内存中生成的参数曲面（procedural:// 地址，见 procedural.py），
+# 依次测量读取、法线计算、三角化、缓冲区上传以及 Loop、Catmull-Clark 各级细分的耗时、内存峰值和吞吐量，
+# 结果写成 JSON，可以与保存的基准结果比较，耗时或内存超出阈值时返回非零退出码
+OBJECT_FOLDER = "Object"
+SCHEMES = ("Loop", "Catmull-Clark")
+MIN_SECONDS = 0.01  # 基准耗时低于该值的阶段只比较内存，计时误差太大
+
+# 在内存中模拟 OpenGL 缓冲区的 gl 实现：数据复制到主机内存，用来在没有显卡和窗口的环境中测量上传前的数据准备和复制
+class HostGL:
+    GL_ARRAY_BUFFER = 0x8892
+    GL_ELEMENT_ARRAY_BUFFER = 0x8893
+    GL_STATIC_DRAW = 0x88E4
+    GL_FLOAT = 0x1406
+    GL_FALSE = 0
+
+    def __init__(self):
+        self.buffers = {}
+        self.bound = {}
+
+    def glGenVertexArrays(self, count):
+        return 1
+
+    def glGenBuffers(self, count):
+        return tuple(range(1, count + 1))
+
+    def glBindVertexArray(self, vao):
+        pass
+
+    def glBindBuffer(self, target, buffer):
+        self.bound[target] = buffer
+
+    def glBufferData(self, target, nbytes, data, usage):
+        self.buffers[self.bound[target]] = np.empty(nbytes, dtype=np.uint8)
+
+    def glBufferSubData(self, target, offset, nbytes, data):
+        self.buffers[self.bound[target]][offset:offset + nbytes] = np.frombuffer(data, dtype=np.uint8)
+
+    def glVertexAttribPointer(self, *args):
+        pass
+
+    def glEnableVertexAttribArray(self, index):
+        pass
+
+# 测量一个阶段：返回 (函数结果, 耗时秒数, 内存峰值字节数)；track_memory 为 False 时不启用 tracemalloc，峰值记为 None
+def measure(function, track_memory=True):
+    if track_memory:
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        result = function()
+        seconds = time.perf_counter() - start
+    finally:
+        peak = None
+        if track_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return result, seconds, peak
+
+def face_count(mesh):
+    return len(mesh.face_arrays()[0]) - 1
+
+# 一个模型的全部阶段，每个阶段记录一条结果
+def benchmark_mesh(name, location, levels, max_faces, track_memory=True):
+    records = []
+
+    def record(stage, scheme, level, mesh, seconds, peak):
+        faces = face_count(mesh)
+        records.append({
+            "mesh": name, "scheme": scheme, "level": level, "stage": stage,
+            "seconds": seconds, "peak_bytes": peak,
+            "vertices": len(mesh.vertices), "faces": faces,
+            "faces_per_second": faces / seconds if seconds > 0 else None,
+        })
+
+    # 每级网格上的法线计算、三角化和上传
+    def mesh_stages(mesh, scheme, level):
+        _, seconds, peak = measure(mesh.calculate_normals, track_memory)
+        record("normals", scheme, level, mesh, seconds, peak)
+        _, seconds, peak = measure(mesh.triangulate_face, track_memory)
+        record("triangulate", scheme, level, mesh, seconds, peak)
+        if MeshBuffers is not None:
+            buffers = MeshBuffers(gl=HostGL())
+            _, seconds, peak = measure(lambda: buffers.update(mesh), track_memory)
+            record("upload", scheme, level, mesh, seconds, peak)
+
+    OPERATOR_CACHE.clear()  # 细分算子从头构建，不受之前模型的影响
+    base_mesh, seconds, peak = measure(lambda: load_mesh(location), track_memory)
+    record("load", None, 0, base_mesh, seconds, peak)
+    mesh_stages(base_mesh, None, 0)
+
+    for scheme in SCHEMES:
+        mesh = base_mesh
+        for level in range(1, levels + 1):
+            if face_count(mesh) > max_faces:
+                break
+            mesh, seconds, peak = measure(lambda: mesh.subdivide(scheme), track_memory)
+            record("subdivide", scheme, level, mesh, seconds, peak)
+            mesh_stages(mesh, scheme, level)
+    return records
+
+# 运行全部模型（Object 文件夹中的 OBJ 文件、各曲面在各分辨率下的参数曲面以及 locations 中的其他地址），
+# repeat 次中每个阶段取最短耗时和最小内存峰值
+def run_benchmarks(object_folder, grid_resolutions, surfaces, levels, max_faces, repeat=1, track_memory=True, locations=()):
+    inputs = []
+    if object_folder:
+        for file_name in sorted(os.listdir(object_folder)):
+            if file_name.endswith(".obj"):
+                inputs.append((file_name, os.path.join(object_folder, file_name)))
+    for surface in surfaces:
+        for resolution in grid_resolutions:
+            location = f"procedural://{surface}?res={resolution}"
+            inputs.append((location, location))
+    inputs.extend((location, location) for location in locations)
+
+    best = {}
+    for _ in range(repeat):
+        for name, location in inputs:
+            for entry in benchmark_mesh(name, location, levels, max_faces, track_memory):
+                key = record_key(entry)
+                if key not in best:
+                    best[key] = entry
+                    continue
+                kept = best[key]
+                if entry["seconds"] < kept["seconds"]:
+                    kept.update(seconds=entry["seconds"], faces_per_second=entry["faces_per_second"])
+                if entry["peak_bytes"] is not None and entry["peak_bytes"] < kept["peak_bytes"]:
+                    kept["peak_bytes"] = entry["peak_bytes"]
+    return list(best.values())
+
+def record_key(entry):
+    return f"{entry['mesh']}|{entry['scheme'] or '-'}|{entry['level']}|{entry['stage']}"
+
+# 与基准结果比较，返回耗时或内存超过基准 (1 + threshold) 倍的阶段
+def compare(results, baseline, threshold, min_seconds=MIN_SECONDS):
+    baseline_entries = {record_key(entry): entry for entry in baseline["results"]}
+    regressions = []
+    for entry in results:
+        base = baseline_entries.get(record_key(entry))
+        if base is None:
+            continue
+        checks = [("peak_bytes", entry["peak_bytes"], base["peak_bytes"])]
+        if base["seconds"] >= min_seconds:
+            checks.append(("seconds", entry["seconds"], base["seconds"]))
+        for metric, value, base_value in checks:
+            if value is not None and base_value and value > base_value * (1 + threshold):
+                regressions.append({"key": record_key(entry), "metric": metric,
+                                    "baseline": base_value, "value": value, "ratio": value / base_value})
+    return regressions
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+def print_table(results):
+    print(f"{'mesh':32} {'scheme':14} {'lv':>2} {'stage':12} {'seconds':>9} {'peak MB':>9} {'vertices':>9} {'faces':>9} {'faces/s':>11}")
+    for entry in results:
+        peak = "-" if entry["peak_bytes"] is None else f"{entry['peak_bytes'] / 2**20:.1f}"
+        rate = "-" if entry["faces_per_second"] is None else f"{entry['faces_per_second']:.0f}"
+        print(f"{entry['mesh'][:32]:32} {entry['scheme'] or '-':14} {entry['level']:>2} {entry['stage']:12} "
+              f"{entry['seconds']:9.4f} {peak:>9} {entry['vertices']:>9} {entry['faces']:>9} {rate:>11}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmark of mesh loading, normals, triangulation, upload and subdivision.")
+    parser.add_argument("--objects", default=OBJECT_FOLDER, help="folder of .obj files (empty string to skip)")
+    parser.add_argument("--levels", type=int, default=2, help="subdivision levels per scheme")
+    parser.add_argument("--max-faces", type=int, default=2_000_000, help="stop subdividing once a level has more faces")
+    parser.add_argument("--grid", type=int, nargs="*", default=[], metavar="RESOLUTION",
+                        help="vertices per side of generated surfaces on [-10, 10]^2, e.g. 256 1024")
+    parser.add_argument("--surfaces", nargs="*", default=list(SURFACES), choices=list(SURFACES))
+    parser.add_argument("--procedural", nargs="*", default=[], metavar="URL",
+                        help="extra generated meshes, e.g. 'procedural://sphere?res=2048&faces=quad'")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per stage, the best one is kept")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (lower overhead, no peak memory)")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative slowdown or memory growth")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.objects, args.grid, args.surfaces, args.levels, args.max_faces,
+                             args.repeat, not args.no_memory, args.procedural)
+    print_table(results)
+    if MeshBuffers is None:
+        print("PyOpenGL is not installed, upload stage skipped")
+
+    report = {"environment": environment(), "levels": args.levels, "results": results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression['key']} {regression['metric']}: "
+                  f"{regression['baseline']:.6g} -> {regression['value']:.6g} ({regression['ratio']:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.threshold:.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -1,258 +1,747 @@
-import io
+import itertools
 import numpy as np
-import trimesh
+from half_edge import HalfEdgeMesh, index_dtype, unique_keys
+from laplacian import build_laplacian
+from mesh_cleanup import clean_mesh
+from mesh_export import export_mesh
+from obj_io import read_obj
+from precision import float_dtype, triangle_index_dtype
+from profiling import PROFILER, profiled
+from simplification import simplify as simplify_triangles
+from subdivision_operator import OPERATOR_CACHE, SubdivisionOperator, topology_key
+
+NORMAL_SMOOTHING_ITERATIONS = 1  # 法线平滑的默认迭代次数
 
 class CustomMesh:
     def __init__(self):
         self.vertices = [] # 顶点坐标列表
-        self.faces = [] # 面片列表，每个面片是一个顶点索引列表，面的顶点按照逆时针排列
+        self.faces = [] # 面片，以 CSR 形式的扁平数组保存（见 face_arrays），面的顶点按照逆时针排列
         self.normals = [] # 法向量列表
-        self.indices = []# 拆分三角形后的面片顶点索引列表
+        # obj 文件中的纹理坐标（vt）、法向量（vn）记录，以及每个面角点引用的 vt、vn 索引（按面的顺序展开，缺省为 -1）
+        self.texcoords = np.zeros((0, 2))
+        self.obj_normals = np.zeros((0, 3))
+        self.corner_texcoords = np.zeros(0, dtype=np.int64)
+        self.corner_normals = np.zeros(0, dtype=np.int64)
+
+    # 面片列表（每个面片是一个顶点索引列表），只用于兼容旧代码，在首次访问时才由扁平数组生成
+    @property
+    def faces(self):
+        if self._faces is None:
+            flat = self._face_flat.tolist()
+            bounds = self._face_offsets.tolist()
+            self._faces = [flat[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+        return self._faces
+
+    # 赋值面片列表时立即转为扁平数组，拓扑改变，清除缓存的半边结构和三角形索引（原地修改 faces 列表后需要重新赋值）
+    @faces.setter
+    def faces(self, faces):
+        face_sizes = np.fromiter((len(face) for face in faces), dtype=np.int64, count=len(faces))
+        face_offsets = np.zeros(len(face_sizes) + 1, dtype=np.int64)
+        np.cumsum(face_sizes, out=face_offsets[1:])
+        face_flat = np.fromiter(itertools.chain.from_iterable(faces), dtype=np.int64, count=int(face_offsets[-1]))
+        self.set_face_arrays(face_offsets, face_flat)
+        self._faces = faces
+
+    # 半边结构，首次使用时由面片列表批量构建并缓存，供法线、细分等算法共用
+    @property
+    def half_edges(self):
+        if self._half_edges is None or self._half_edges.num_vertices != len(self.vertices):
+            self._half_edges = HalfEdgeMesh(*self.face_arrays(), len(self.vertices))
+        return self._half_edges
 
     # 从obj文件读取网格数据，支持多种编码格式
+    # 文件只读取一次并批量解析（见 obj_io.read_obj），dtype 为坐标精度（np.float32 或 np.float64），None 时按 precision 中的默认精度；
+    # 之后的法线计算和细分都保持这一精度；clean 为 True 时先清理网格（见 clean），tolerance 为焊接容差
     @classmethod
-    def from_obj(cls, file_path):
+    def from_obj(cls, file_path, dtype=None, clean=False, tolerance=None):
         mesh = cls()
-        encodings = ['utf-8', 'gbk', 'iso-8859-1', 'ascii', 'gb2312']  # 尝试的编码列表
-        
-        for encoding in encodings:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    for line in f:
-                        if line.startswith('v '):
-                            vertex = list(map(float, line.split()[1:4]))
-                            mesh.vertices.append(vertex)
-                        elif line.startswith('f '):
-                            face = [int(v.split('/')[0]) - 1 for v in line.split()[1:]]
-                            mesh.faces.append(face)
-                break  # 如果成功读取，跳出循环
-            except UnicodeDecodeError:
-                continue  # 如果出现解码错误，尝试下一种编码
-            except Exception as e:
-                print(f"Error reading file with {encoding} encoding: {str(e)}")
-                continue
-        else:
-            raise ValueError(f"Unable to read the file {file_path} with any of the attempted encodings.")
-
-        mesh.vertices = np.array(mesh.vertices)
+        data = read_obj(file_path, float_dtype(dtype))
+
+        mesh.vertices = data["vertices"]
+        mesh.set_face_arrays(data["face_offsets"], data["face_flat"])
+        mesh.texcoords = data["texcoords"]
+        mesh.obj_normals = data["obj_normals"]
+        mesh.corner_texcoords = data["corner_texcoords"]
+        mesh.corner_normals = data["corner_normals"]
+
+        if clean:
+            mesh, _ = mesh.clean(tolerance)
+            return mesh
         mesh.calculate_normals()
-        mesh.triangulate_face()
         return mesh
 
-    # 计算网格的法向量，使用拉普拉斯算子平滑法线
-    def calculate_normals(self):
-        # 初始化法向量
+    # 由 CSR 形式的扁平面片数组设置面片，拓扑改变，清除缓存的半边结构和三角形索引；
+    # 半边结构、三角形索引与面片列表都在需要时才由数组生成，数组设置后不会被原地修改，可以在网格之间共用
+    def set_face_arrays(self, face_offsets, face_flat):
+        self._faces = None
+        self._face_offsets, self._face_flat = face_offsets, face_flat
+        self._half_edges = None
+        self._indices = None
+        self._edge_indices = None
+        self._laplacians = {}
+
+    # 面片的扁平数组（CSR 形式）：
+    # face_offsets[k]:face_offsets[k+1] 是第 k 个面在 face_flat 中的顶点索引区间，支持任意边数的多边形混合
+    def face_arrays(self):
+        return self._face_offsets, self._face_flat
+
+    # 拆分三角形后的扁平顶点索引数组，首次访问时批量三角化并缓存，面片改变时失效
+    @property
+    def indices(self):
+        if self._indices is None:
+            self.triangulate_face()
+        return self._indices
+
+    # 直接设置已知的三角形索引（如从缓存中读取），需与当前面片一致
+    @indices.setter
+    def indices(self, indices):
+        self._indices = indices
+
+    # 网格无向边的扁平顶点索引数组（每条边两个顶点，不含三角化产生的对角线），首次访问时生成并缓存，面片改变时失效
+    @property
+    def edge_indices(self):
+        if self._edge_indices is None:
+            self.extract_edges()
+        return self._edge_indices
+
+    # 直接设置已知的边索引（如从缓存中读取），需与当前面片一致
+    @edge_indices.setter
+    def edge_indices(self, edge_indices):
+        self._edge_indices = edge_indices
+
+    # 顶点邻接关系（CSR 形式），顶点 i 的邻居为 adjacency[adjacency_offsets[i]:adjacency_offsets[i+1]]
+    def vertex_adjacency(self):
+        return self.half_edges.adjacency()
+
+    # 计算网格的法向量，使用拉普拉斯算子平滑法线，smoothing_iterations 为平滑的迭代次数
+    @profiled("normals")
+    def calculate_normals(self, smoothing_iterations=NORMAL_SMOOTHING_ITERATIONS):
+        num_vertices = len(self.vertices)
+        half_edges = self.half_edges
+        face_offsets, face_flat = half_edges.face_offsets, half_edges.vertex
+        face_sizes = np.diff(face_offsets)
+
+        sections = PROFILER.sections()
+        sections.start("face_normals")
+        # 批量计算面法向量，每个面取前三个顶点
+        valid_faces = face_sizes >= 3
+        first_corner = face_offsets[:-1][valid_faces]
+        v0 = self.vertices[face_flat[first_corner]]
+        v1 = self.vertices[face_flat[first_corner + 1]]
+        v2 = self.vertices[face_flat[first_corner + 2]]
+        face_normals = np.cross(v1 - v0, v2 - v0)
+
+        # 将每个面的法向量累加到面上对应的顶点上（按面的顺序累加，与逐面累加结果一致）
+        corner_valid = np.repeat(valid_faces, face_sizes)
+        corner_vertex = face_flat[corner_valid]
+        corner_normals = np.repeat(face_normals, face_sizes[valid_faces], axis=0)
         self.normals = np.zeros_like(self.vertices)
-        
-        # 构建邻接列表，用于存储每个顶点的邻居
-        adjacency_list = {i: set() for i in range(len(self.vertices))}
-        
-        # 遍历每个面，计算面法向量并记录邻接关系
-        for face in self.faces:
-            if len(face) < 3:
-                continue
-            v0, v1, v2 = self.vertices[face[0]], self.vertices[face[1]], self.vertices[face[2]]
-            normal = np.cross(v1 - v0, v2 - v0)
-            
-            # 将每个面的法向量加到面上对应的顶点上
-            for vertex_index in face:
-                self.normals[vertex_index] += normal
-            
-            # 更新邻接列表，使用集合避免重复
-            for i in range(len(face)):
-                current_vertex = face[i]
-                next_vertex = face[(i + 1) % len(face)]
-                adjacency_list[current_vertex].add(next_vertex)
-                adjacency_list[next_vertex].add(current_vertex)
+        for axis in range(3):
+            self.normals[:, axis] = np.bincount(corner_vertex, weights=corner_normals[:, axis], minlength=num_vertices)
 
         # 归一化初步计算的法线
         lengths = np.linalg.norm(self.normals, axis=1)
         non_zero = lengths > 0
         self.normals[non_zero] = self.normals[non_zero] / lengths[non_zero, np.newaxis]
 
-        # 使用拉普拉斯算子平滑法线
-        smoothed_normals = np.zeros_like(self.normals)
-        for i, normal in enumerate(self.normals):
-            neighbors = adjacency_list[i]
-            if neighbors:
-                # 取相邻顶点的法向量平均值，与当前顶点法向量平滑
-                neighbor_normals = np.mean([self.normals[neighbor] for neighbor in neighbors], axis=0)
-                smoothed_normals[i] = (normal + neighbor_normals) / 2  # 平滑计算
-            else:
-                smoothed_normals[i] = normal
+        # 使用拉普拉斯算子平滑法线：每次迭代取当前法向量与相邻顶点法向量平均值的中点（缓存的均匀权重算子，一次稀疏矩阵乘法）
+        sections.start("normal_smoothing")
+        smoothed_normals = self.laplacian().smooth(self.normals, smoothing_iterations, 0.5)
 
         # 对平滑后的法线进行归一化
         lengths = np.linalg.norm(smoothed_normals, axis=1)
         non_zero = lengths > 0
         self.normals[non_zero] = smoothed_normals[non_zero] / lengths[non_zero, np.newaxis]
+        sections.stop()
 
+    # 复制网格：顶点等属性复制一份，面片数组、半边结构、三角形索引和拉普拉斯算子不会被原地修改，直接共用
     def copy(self):
         new_mesh = CustomMesh()
         new_mesh.vertices = np.copy(self.vertices)
-        new_mesh.faces = [face.copy() for face in self.faces]
+        new_mesh.set_face_arrays(self._face_offsets, self._face_flat)
+        new_mesh._half_edges = self._half_edges
+        new_mesh._indices = self._indices
+        new_mesh._edge_indices = self._edge_indices
+        new_mesh._laplacians = dict(self._laplacians)
         new_mesh.normals = np.copy(self.normals)
-        new_mesh.triangulate_face()
+        new_mesh.texcoords = np.copy(self.texcoords)
+        new_mesh.obj_normals = np.copy(self.obj_normals)
+        new_mesh.corner_texcoords = np.copy(self.corner_texcoords)
+        new_mesh.corner_normals = np.copy(self.corner_normals)
+        return new_mesh
+
+    # 拉普拉斯算子（见 laplacian.build_laplacian），weighting 为 "uniform" 或 "cotangent"，protect_boundary 为 True 时边界点固定；
+    # 按连接关系构建一次后缓存，面片改变时失效；余切权重由当前的顶点位置决定（网格的顶点不会被原地修改）
+    def laplacian(self, weighting="uniform", protect_boundary=False):
+        key = (weighting, protect_boundary)
+        operator = self._laplacians.get(key)
+        if operator is None:
+            fixed = self.half_edges.boundary_vertices() if protect_boundary else None
+            triangles = self.triangle_array() if weighting == "cotangent" else None
+            operator = build_laplacian(self.half_edges, self.vertices, triangles, weighting, fixed)
+            PROFILER.count("allocated_bytes", operator.nbytes)
+            self._laplacians[key] = operator
+        return operator
+
+    # 平滑顶点位置，返回新网格（面片、半边结构和三角形索引与原网格共用）：method 为 "laplacian"（每步 x ← x + factor·(Wx − x)）
+    # 或 "taubin"（每次迭代收缩、膨胀各一步，体积基本不变），weighting 和 protect_boundary 见 laplacian
+    @profiled("smooth")
+    def smooth(self, iterations=10, method="taubin", weighting="uniform", factor=0.5, protect_boundary=True):
+        operator = self.laplacian(weighting, protect_boundary)
+        if method == "laplacian":
+            vertices = operator.smooth(self.vertices, iterations, factor)
+        elif method == "taubin":
+            vertices = operator.taubin(self.vertices, iterations, factor)
+        else:
+            raise ValueError(f"unknown smoothing method: {method}")
+        new_mesh = CustomMesh()
+        new_mesh.vertices = vertices
+        new_mesh.set_face_arrays(*self.face_arrays())
+        new_mesh._half_edges = self._half_edges
+        new_mesh._indices = self._indices
+        new_mesh._edge_indices = self._edge_indices
+        # 非有限坐标的顶点保持不动，只由连接关系决定的均匀权重算子仍然适用
+        new_mesh._laplacians = {key: value for key, value in self._laplacians.items() if key[0] == "uniform"}
+        new_mesh.calculate_normals()
         return new_mesh
 
     # 判断网格是否为三角网格
     def judge_is_trimesh(self):
-        return 1 if all(len(face) == 3 for face in self.faces) else 0
+        return 1 if np.all(np.diff(self.face_arrays()[0]) == 3) else 0
 
-    # loop细分算法，直接调用trimesh库的subdivide_loop方法
-    def subdivide_loop(self):
-        # 模拟文件流，利用 trimesh.load 的读取自动转化机制，将 CustomMesh 转换为 trimesh.Trimesh 对象
-        obj_data = []
-        for v in self.vertices:
-            obj_data.append(f"v {v[0]} {v[1]} {v[2]}")
-        for f in self.faces:
-            face_str = "f " + " ".join(str(f[i] + 1) for i in range(len(f)))
-            obj_data.append(face_str)
-        obj_string = "\n".join(obj_data)
-        obj_stream = io.StringIO(obj_string)
-        trimesh_mesh = trimesh.load(obj_stream, file_type='obj')
-
-        # 使用 Loop 算法细分
-        subdivided_mesh = trimesh_mesh.subdivide_loop() 
+    # 细分网格：由缓存的细分算子一次稀疏矩阵乘法得到新顶点，细分后的面片和半边结构与连接关系相同的网格共用
+    @profiled("subdivide")
+    def subdivide(self, scheme):
+        operator = self.subdivision_operator(scheme)
         new_mesh = CustomMesh()
-        new_mesh.vertices = np.array(subdivided_mesh.vertices)
-        new_mesh.faces = np.array(subdivided_mesh.faces).tolist()
-        
+        new_mesh.vertices = operator.apply(self.vertices)
+        new_mesh.set_face_arrays(operator.face_offsets, operator.face_flat)
+        new_mesh._half_edges = operator.refined_half_edges
+
         # 重新计算法线
         new_mesh.calculate_normals()
-
-        # 返回新的网格对象
+        operator.refined_half_edges = new_mesh._half_edges
+        PROFILER.count("vertices", len(new_mesh.vertices))
+        PROFILER.count("faces", len(operator.face_offsets) - 1)
         return new_mesh
 
+    # loop细分算法
+    def subdivide_loop(self):
+        return self.subdivide("Loop")
+
     # Catmull-Clark细分算法，自行实现
     def subdivide_catmull_clark(self):
-        # 新网格
-        new_mesh = CustomMesh()
-
-        # 计算面心
-        face_points = []
-        for face in self.faces:
-            face_vertices = [self.vertices[i] for i in face]
-            face_point = np.mean(face_vertices, axis=0)  # 面片顶点的平均值
-            face_points.append(face_point)
+        return self.subdivide("Catmull-Clark")
+
+    # 用细分算子细分其他逐顶点属性（颜色、纹理坐标等），values 的第一维为顶点
+    def refine_attribute(self, values, scheme):
+        return self.subdivision_operator(scheme).apply(values)
+
+    # 取得细分算子：按连接关系在 OPERATOR_CACHE 中查找，没有时构建并放入缓存
+    # Loop 细分会丢弃引用了非有限坐标顶点的三角形，这些顶点的编号也是算子标识的一部分
+    def subdivision_operator(self, scheme):
+        face_offsets, face_flat = self.face_arrays()
+        num_vertices = len(self.vertices)
+        non_finite = b''
+        if scheme == "Loop":
+            non_finite = np.flatnonzero(~np.isfinite(self.vertices).all(axis=1)).tobytes()
+        key = (scheme, topology_key(face_offsets, face_flat, num_vertices, non_finite))
+        operator = OPERATOR_CACHE.get(key)
+        if operator is None:
+            if scheme == "Loop":
+                operator = self.loop_operator()
+            elif scheme == "Catmull-Clark":
+                operator = self.catmull_clark_operator()
+            else:
+                raise ValueError(f"unknown subdivision scheme: {scheme}")
+            PROFILER.count("allocated_bytes", operator.nbytes)
+            OPERATOR_CACHE.put(key, operator)
+        return operator
+
+    # loop细分算子，直接在顶点、面数组上批量构建，非三角形的面先批量扇形三角化
+    @profiled("loop_operator")
+    def loop_operator(self):
+        num_vertices = len(self.vertices)
+        sections = PROFILER.sections()
+        sections.start("topology")
+
+        # 丢弃引用了非有限坐标（如 nan）顶点的三角形，与原先经 trimesh 处理后的结果一致
+        triangles = self.triangle_array()
+        finite = np.isfinite(self.vertices).all(axis=1)
+        kept = finite[triangles].all(axis=1)
+        if kept.all() and len(triangles) == len(self.face_arrays()[0]) - 1:
+            # 已经是三角网格，直接使用缓存的半边结构
+            half_edges = self.half_edges
+        else:
+            triangles = triangles[kept]
+            half_edges = HalfEdgeMesh(np.arange(0, 3 * len(triangles) + 1, 3), triangles.ravel(), num_vertices)
+        edge_vertices = half_edges.edge_vertices().astype(np.int64)
+        edge_count = half_edges.edge_count
+        num_edges = half_edges.num_edges
+        first_half_edge = half_edges.edge_half_edge
+        second_half_edge = half_edges.twin[first_half_edge]
+        rows, cols, weights = [], [], []
+
+        # 计算奇顶点（边点）：
+        sections.start("edge_points")
+        # 只关联一个面或关联多于两个面的边视为折痕边，边点 = 两端点的平均值
+        # 内部边：边点 = 3/8 * (顶点1 + 顶点2) + 1/8 * (两侧面的对顶点之和)
+        interior = edge_count == 2
+        odd_rows = num_vertices + np.arange(num_edges)
+        end_weight = np.where(interior, 0.375, 0.5)
+        rows += [odd_rows, odd_rows]
+        cols += [edge_vertices[:, 0], edge_vertices[:, 1]]
+        weights += [end_weight, end_weight]
+        for half_edge in (first_half_edge[interior], second_half_edge[interior]):
+            rows.append(odd_rows[interior])
+            cols.append(half_edges.vertex[half_edges.prev[half_edge]])
+            weights.append(np.full(len(half_edge), 1 / 8.0))
+
+        # 计算偶顶点（原顶点的新位置），孤立顶点保持不变
+        sections.start("vertex_points")
+        self_weight = np.ones(num_vertices)
+        crease_edges = edge_vertices[~interior]
+        crease_count = np.bincount(crease_edges.ravel(), minlength=num_vertices)
+
+        # 内部点：新顶点 = (1 - k * beta) * 原顶点 + beta * 相邻顶点之和
+        adjacency_offsets, adjacency = half_edges.adjacency()
+        k = np.diff(adjacency_offsets)
+        inner = (crease_count == 0) & (k > 0)
+        k_inner = k[inner]
+        beta = np.zeros(num_vertices)
+        beta[inner] = (40.0 - (2.0 * np.cos(2 * np.pi / k_inner) + 3) ** 2) / (64 * k_inner)
+        self_weight[inner] = 1 - k_inner * beta[inner]
+        neighbor_owner = np.repeat(np.arange(num_vertices), k)
+        from_inner = inner[neighbor_owner]
+        rows.append(neighbor_owner[from_inner])
+        cols.append(adjacency[from_inner])
+        weights.append(beta[neighbor_owner[from_inner]])
+
+        # 边界（折痕）点：新顶点 = 3/4 * 原顶点 + 1/8 * 相邻两个折痕点之和
+        # 与一条或多于两条折痕边相连的角点保持不变
+        on_crease = crease_count == 2
+        self_weight[on_crease] = 3.0 / 4.0
+        crease_owner, crease_neighbor = crease_edges.ravel(), crease_edges[:, ::-1].ravel()
+        from_crease = on_crease[crease_owner]
+        rows.append(crease_owner[from_crease])
+        cols.append(crease_neighbor[from_crease])
+        weights.append(np.full(np.count_nonzero(from_crease), 1 / 8.0))
+
+        rows.append(np.arange(num_vertices))
+        cols.append(np.arange(num_vertices))
+        weights.append(self_weight)
+
+        # 每个三角形分成四个：三个角上的三角形和中间由三个边点组成的三角形
+        sections.start("faces")
+        a, b, c = triangles.T
+        odd_idx = num_vertices + half_edges.edge.reshape(-1, 3).astype(np.int64)
+        e0, e1, e2 = odd_idx.T  # 分别位于边 ab、bc、ca 上
+        new_faces = np.column_stack([a, e0, e2, e0, b, e1, e2, e1, c, e0, e1, e2]).ravel()
+
+        sections.stop()
+        return SubdivisionOperator(np.concatenate(rows), np.concatenate(cols), np.concatenate(weights),
+                                   num_vertices, num_vertices + num_edges,
+                                   np.arange(0, len(new_faces) + 1, 3), new_faces)
+
+    # 按组求和：返回 result[g] = sum(values[k] for k where groups[k] == g)，按输入顺序累加
+    @staticmethod
+    def group_sum(groups, values, num_groups):
+        result = np.empty((num_groups, values.shape[1]))
+        for axis in range(values.shape[1]):
+            result[:, axis] = np.bincount(groups, weights=values[:, axis], minlength=num_groups)
+        return result
+
+    # Catmull-Clark细分算子（基于边、面关联数组的批量构建），新顶点依次为 新的原顶点、边心、面心
+    @profiled("catmull_clark_operator")
+    def catmull_clark_operator(self):
+        num_vertices = len(self.vertices)
+        sections = PROFILER.sections()
+        sections.start("topology")
+        half_edges = self.half_edges
+        num_faces = half_edges.num_faces
+        face_offsets = half_edges.face_offsets.astype(np.int64)
+        face_sizes = np.diff(face_offsets)
+        face_flat = half_edges.vertex.astype(np.int64)
+        corner_face = half_edges.face.astype(np.int64)
+        corner_prev, corner_next = half_edges.prev, half_edges.next
+        corner_edge = half_edges.edge
+        num_edges = half_edges.num_edges
+        rows, cols, weights = [], [], []
+
+        # 面 faces 的全部角点：返回 (每个角点所属的项, 角点的顶点, 1 / 面的顶点数)
+        def face_corners(faces):
+            sizes = face_sizes[faces]
+            entry = np.repeat(np.arange(len(faces)), sizes)
+            corner = np.arange(int(sizes.sum())) - np.repeat(np.cumsum(sizes) - sizes, sizes) + face_offsets[faces][entry]
+            return entry, face_flat[corner], 1.0 / sizes[entry]
+
+        # 计算面心：面片顶点的平均值
+        sections.start("face_points")
+        face_rows = num_vertices + num_edges + np.arange(num_faces)
+        rows.append(face_rows[corner_face])
+        cols.append(face_flat)
+        weights.append(1.0 / face_sizes[corner_face])
 
         # 边类型的判断：
         # 如果有一个边只关联一个面，那么这个边就是边界边，并且这个边的两个顶点都是边界点
 
         # 计算边心
-        edge_map = {}
-        edge_points = []
-        for face_idx, face in enumerate(self.faces):
-            num_vertices = len(face)
-            for i in range(num_vertices):
-                v1, v2 = face[i], face[(i + 1) % num_vertices]
-                edge_key = tuple(sorted((v1, v2)))  # 保证边的顺序一致
-
-                if edge_key not in edge_map:
-                    v1_pos, v2_pos = self.vertices[v1], self.vertices[v2]
-                    face_point = face_points[face_idx]
-                    edge_map[edge_key] = {"count": 1, "face1_point": face_point, "v1_pos": v1_pos, "v2_pos": v2_pos}
-                else:
-                    # 只有内部边会进入这个分支，在这里处理内部边，计算内部边心
-                    edge_map[edge_key]["count"] += 1 # 记录边的出现次数，如果是1，说明是边界边，如果是2，说明是内部边
-                    face1_point = edge_map[edge_key]["face1_point"]
-                    v1_pos, v2_pos = edge_map[edge_key]["v1_pos"], edge_map[edge_key]["v2_pos"]
-                    face2_point = face_points[face_idx]
-
-                    edge_point = (v1_pos + v2_pos + face1_point + face2_point) / 4 # 内部边心 = （顶点1 + 顶点2 + 面心1 + 面心2）/ 4
-                    edge_points.append(edge_point)
-                    edge_map[edge_key]["idx"] = len(edge_points) - 1 # 更新 edge_map，记录边的顶点索引
-
-        # 遍历 edge_map 处理边界边
-        for edge_key, edge_data in edge_map.items():
-            if edge_data["count"] == 1:  # 边界边只出现一次
-                v1_pos, v2_pos = edge_data["v1_pos"], edge_data["v2_pos"]
-                # 计算边界边的边心 (v1_pos + v2_pos) / 2
-                edge_point = (v1_pos + v2_pos) / 2
-                edge_points.append(edge_point)
-
-                # 更新 edge_map，记录边的顶点索引
-                edge_map[edge_key]["idx"] = len(edge_points) - 1
+        sections.start("edge_points")
+        first_corner = half_edges.edge_half_edge
+        second_corner = half_edges.twin[first_corner]
+        interior = second_corner >= 0
+
+        # 边心的排列顺序：内部边按第二次出现的先后排在前面，边界边按首次出现的先后排在后面
+        interior_edges = np.flatnonzero(interior)
+        boundary_edges = np.flatnonzero(~interior)
+        edge_order = np.concatenate([
+            interior_edges[np.argsort(second_corner[interior_edges], kind='stable')],
+            boundary_edges[np.argsort(first_corner[boundary_edges], kind='stable')],
+        ])
+        edge_index = np.empty(num_edges, dtype=np.int64)  # 原边编号 -> 边心在 edge_points 中的索引
+        edge_index[edge_order] = np.arange(num_edges)
+        edge_rows = num_vertices + edge_index
+
+        # 边界边心 = (顶点1 + 顶点2) / 2
+        # 内部边心 = （顶点1 + 顶点2 + 面心1 + 面心2）/ 4
+        end_weight = np.where(interior, 0.25, 0.5)
+        rows += [edge_rows, edge_rows]
+        cols += [face_flat[first_corner], face_flat[corner_next[first_corner]]]
+        weights += [end_weight, end_weight]
+        for corner in (first_corner[interior], second_corner[interior]):
+            entry, vertex, weight = face_corners(corner_face[corner])
+            rows.append(edge_rows[interior][entry])
+            cols.append(vertex)
+            weights.append(weight / 4)
 
         # 顶点类型的判断：
         # 如果一个顶点关联的面和关联的边的数量相等，那么这个顶点是网格内部点，否则是网格边界点
 
-        # 计算新的顶点位置
-        new_vertices = []
-        for i, v in enumerate(self.vertices):
-            # adjacent_faces：该顶点关联的所有面
-            adjacent_faces = [face_idx for face_idx, face in enumerate(self.faces) if i in face]
-            # face_avg：关联的面心的平均值
-            face_avg = np.mean([face_points[face_idx] for face_idx in adjacent_faces], axis=0) 
-
-            # adjacent_points：该顶点关联的所有顶点
-            adjacent_points = []
-            for face_idx in adjacent_faces:
-                face = self.faces[face_idx]
-                for j in range(len(face)):
-                    if face[j] == i: # 找到当前顶点在面片中的索引
-                        vr, vl = face[(j - 1) % len(face)], face[(j + 1) % len(face)] # 右边和左边的顶点索引
-                        if vr not in adjacent_points:
-                            adjacent_points.append(vr)
-                        if vl not in adjacent_points:
-                            adjacent_points.append(vl)
-            # edge_avg：关联的边心的平均值
-            edge_avg = (1/2) * v + (1/2) * np.mean([self.vertices[point] for point in adjacent_points], axis=0)
-
-            # 处理网格内部点
-            if len(adjacent_faces) == len(adjacent_points):
-                n = len(adjacent_faces)
-                # 原始顶点的位置更新：新顶点 = (均面心 + 2 * 均边心 + (n - 3) * 原顶点) / n
-                vertex_point = (face_avg + 2 * edge_avg + (n - 3) * v) / n
-                new_vertices.append(vertex_point)
-            # 处理网格边界点
-            else:
-                # 寻找相邻的两个边界点
-                # 在edge_map中找到相邻的两个边界点
-                boundary_edges = [key for key in edge_map.keys() if i in key and edge_map[key]['count'] == 1]
-                boundary_vertices = []
-                for edge in boundary_edges:
-                    v1, v2 = edge
-                    boundary_vertices.append(v1 if v1 != i else v2)
-                n = len(boundary_edges)
-                vertex_point = (3/4) * v + (1/4) * np.mean([self.vertices[point] for point in boundary_vertices], axis=0)
-                new_vertices.append(vertex_point)
-
-        # 更新新网格的顶点
-        new_mesh.vertices = np.vstack([new_vertices, edge_points, face_points]) # 将 新顶点、边心、面心 按顺序放入新网格的顶点列表中
+        # adjacent_faces：该顶点关联的所有面（去重）
+        sections.start("vertex_points")
+        vertex_face = unique_keys(face_flat * num_faces + corner_face)
+        adjacent_vertex, adjacent_face = np.divmod(vertex_face, num_faces)
+        face_count = np.bincount(adjacent_vertex, minlength=num_vertices)
+
+        # adjacent_points：该顶点关联的所有顶点（去重）
+        pair_vertex = np.repeat(face_flat, 2)
+        pair_neighbor = np.stack([face_flat[corner_prev], face_flat[corner_next]], axis=1).ravel()
+        pair_keys = unique_keys(pair_vertex * num_vertices + pair_neighbor)
+        point_vertex, point_neighbor = np.divmod(pair_keys, num_vertices)
+        point_count = np.bincount(point_vertex, minlength=num_vertices)
+
+        # 边界点的相邻边界点
+        boundary_pairs = half_edges.edge_vertices()[boundary_edges].astype(np.int64)
+        boundary_count = np.bincount(boundary_pairs.ravel(), minlength=num_vertices)
+
+        # 计算新的顶点位置，孤立顶点保持不变
+        self_weight = np.ones(num_vertices)
+
+        # 处理网格内部点：新顶点 = (均面心 + 2 * 均边心 + (n - 3) * 原顶点) / n，均边心 = (原顶点 + 相邻点的平均值) / 2，
+        # 即 新顶点 = 均面心 / n + 相邻点的平均值 / n + (n - 2) / n * 原顶点
+        inner = (face_count == point_count) & (face_count > 0)
+        n = np.maximum(face_count, 1).astype(np.float64)
+        self_weight[inner] = (n[inner] - 2) / n[inner]
+        from_inner = inner[adjacent_vertex]
+        entry, vertex, weight = face_corners(adjacent_face[from_inner])
+        owner = adjacent_vertex[from_inner][entry]
+        rows.append(owner)
+        cols.append(vertex)
+        weights.append(weight / n[owner] ** 2)
+        from_inner = inner[point_vertex]
+        owner = point_vertex[from_inner]
+        rows.append(owner)
+        cols.append(point_neighbor[from_inner])
+        weights.append(1.0 / (n[owner] * point_count[owner]))
+
+        # 处理网格边界点：新顶点 = 3/4 * 原顶点 + 1/4 * 相邻两个边界点的平均值
+        outer = (face_count != point_count) & (boundary_count > 0)
+        self_weight[outer] = 3 / 4
+        boundary_owner, boundary_neighbor = boundary_pairs.ravel(), boundary_pairs[:, ::-1].ravel()
+        from_outer = outer[boundary_owner]
+        owner = boundary_owner[from_outer]
+        rows.append(owner)
+        cols.append(boundary_neighbor[from_outer])
+        weights.append(0.25 / boundary_count[owner])
+
+        rows.append(np.arange(num_vertices))
+        cols.append(np.arange(num_vertices))
+        weights.append(self_weight)
 
         # 一个面心可以对应多个新顶点，一个顶点在这个面中对应两个边心，
+        sections.start("faces")
         # 根据这个顶点在原来的面中的索引，找出它的上一个顶点，从而找出第一个边心记为 edge_point1，
         # 根据这个顶点在原来的面中的索引，找出它的下一个顶点，从而找出第二个边心记为 edge_point2，
         # 根据逆时针顺序，依次连接 新顶点、edge_point2、face_point、edge_point1，得到新的面片
-        for face_idx, face in enumerate(self.faces):
-            # face_points[face_idx]是面心的坐标数据
-            # len(new_vertices)+len(edge_points)+face_idx是面心在new_mesh.vertices中的索引
-            face_point = len(new_vertices) + len(edge_points) + face_idx
-            for i in range(len(face)):
-                num_vertices = len(face)
-                vr = face[(i - 1) % num_vertices]
-                v = face[i]
-                vl = face[(i + 1) % num_vertices]
-                edge_key1 = tuple(sorted((vr, v)))
-                edge_key2 = tuple(sorted((v, vl)))
-                edge_point1 = len(new_vertices) + edge_map[edge_key1]["idx"] # 边心1的索引
-                edge_point2 = len(new_vertices) + edge_map[edge_key2]["idx"] # 边心2的索引
-                new_mesh.faces.append([v, edge_point2, face_point, edge_point1])
-                
-        # 重新计算法线
+        edge_point1 = num_vertices + edge_index[corner_edge[corner_prev]]
+        edge_point2 = num_vertices + edge_index[corner_edge]
+        face_point = num_vertices + num_edges + corner_face
+        new_faces = np.stack([face_flat, edge_point2, face_point, edge_point1], axis=1).ravel()
+
+        sections.stop()
+        return SubdivisionOperator(np.concatenate(rows), np.concatenate(cols), np.concatenate(weights),
+                                   num_vertices, num_vertices + num_edges + num_faces,
+                                   np.arange(0, len(new_faces) + 1, 4), new_faces)
+
+    # 计算极限位置所需的一环数据（见 HalfEdgeMesh.vertex_fans），返回：
+    # 按绕顶点顺序排列的出半边 fan、每条出半边所属的顶点 owner 和在一环中的序号 position、每个顶点的一环大小 fan_sizes，
+    # 以及内部点、光滑边界点（恰好与两条折痕边相连）的标记；其余顶点（角点、非流形点、孤立点）视为角点，保持不变
+    def limit_fans(self):
+        half_edges = self.half_edges
+        num_vertices = len(self.vertices)
+        fan_offsets, fan, closed, regular = half_edges.vertex_fans()
+        crease_edges = half_edges.edge_vertices()[half_edges.edge_count != 2]
+        crease_count = np.bincount(crease_edges.ravel(), minlength=num_vertices)
+        interior = regular & closed & (crease_count == 0)
+        boundary = regular & ~closed & (crease_count == 2)
+
+        fan_sizes = np.diff(fan_offsets)
+        owner = np.repeat(np.arange(num_vertices), fan_sizes)
+        position = np.arange(len(fan)) - fan_offsets[owner]
+        return fan, owner, position, fan_sizes, interior, boundary
+
+    # 取出边界点及其一环数据，返回 (边界点编号, 一环中属于边界点的项, 这些项所属边界点的局部编号, 一环两端的边界邻点 q_0、q_k)，
+    # q_0 为第一条出半边指向的顶点，q_k 为最后一条出半边所在面中指向该点的顶点
+    def boundary_fans(self, fan, owner, fan_sizes, boundary):
+        half_edges = self.half_edges
+        boundary_vertices = np.flatnonzero(boundary)
+        entries = boundary[owner]
+        local_owner = (np.cumsum(boundary) - 1)[owner[entries]]
+        ends = np.cumsum(fan_sizes)[boundary_vertices]
+        first = half_edges.vertex[half_edges.next[fan[ends - fan_sizes[boundary_vertices]]]]
+        last = half_edges.vertex[half_edges.prev[fan[ends - 1]]]
+        return boundary_vertices, entries, local_owner, first, last
+
+    # 归一化极限法线：与原法线方向相反的翻转过来，长度为 0 的（以及 keep 标记的角点）保留原法线
+    def finish_limit_normals(self, limit_normals, keep):
+        normals = np.array(self.normals, dtype=np.float64)
+        lengths = np.linalg.norm(limit_normals, axis=1)
+        use = ~keep & (lengths > 0)
+        limit_normals = limit_normals[use] / lengths[use, np.newaxis]
+        flip = np.einsum('ij,ij->i', limit_normals, normals[use]) < 0
+        limit_normals[flip] = -limit_normals[flip]
+        normals[use] = limit_normals
+        return normals
+
+    # Loop 细分曲面的极限位置与极限法线，返回 (positions, normals)，对一环邻域批量应用模板：
+    # 内部点：极限位置 = (w * 原顶点 + 相邻顶点之和) / (w + n)，w = 3 / (8 * beta)，beta 与 subdivide_loop 相同；
+    # 切向量 t1 = sum(cos(2*pi*i/n) * q_i)，t2 = sum(sin(2*pi*i/n) * q_i)，法线 = t1 x t2；
+    # 边界点：极限位置 = (q_0 + 4 * 原顶点 + q_k) / 6，沿边界的切向量为 q_0 - q_k，
+    # 垂直边界的切向量取边界细分矩阵的次主左特征向量：a * 原顶点 + b * (q_0 + q_k) + sum(sin(i*pi/k) * q_i)
+    def loop_limit(self):
+        vertices = np.asarray(self.vertices, dtype=np.float64)
+        num_vertices = len(vertices)
+        half_edges = self.half_edges
+        fan, owner, position, fan_sizes, interior, boundary = self.limit_fans()
+        ring = vertices[half_edges.vertex[half_edges.next[fan]]]  # 一环邻点 q_i
+        positions = vertices.copy()
+        limit_normals = np.zeros_like(vertices)
+
+        # 内部点
+        n = np.maximum(fan_sizes, 1).astype(np.float64)
+        beta = (40.0 - (2.0 * np.cos(2 * np.pi / n) + 3) ** 2) / (64 * n)
+        weight = 3.0 / (8.0 * beta)
+        ring_sum = self.group_sum(owner, ring, num_vertices)
+        positions[interior] = ((weight[:, np.newaxis] * vertices + ring_sum) / (weight + n)[:, np.newaxis])[interior]
+
+        angle = 2 * np.pi * position / n[owner]
+        tangent1 = self.group_sum(owner, np.cos(angle)[:, np.newaxis] * ring, num_vertices)
+        tangent2 = self.group_sum(owner, np.sin(angle)[:, np.newaxis] * ring, num_vertices)
+        limit_normals[interior] = np.cross(tangent1[interior], tangent2[interior])
+
+        # 边界点：一环为 q_0, ..., q_k（k 为关联的面数），q_1 ... q_{k-1} 为内部邻点
+        boundary_vertices, entries, local_owner, first, last = self.boundary_fans(fan, owner, fan_sizes, boundary)
+        v, q_first, q_last = vertices[boundary_vertices], vertices[first], vertices[last]
+        positions[boundary_vertices] = (q_first + 4 * v + q_last) / 6
+
+        # 特征值 lam = 3/8 + cos(pi/k)/4，系数 a、b 由原顶点和 q_0 两列的特征方程解出（k = 3 时 lam = 1/2 单独处理）
+        k = n[boundary_vertices]
+        theta = np.pi / k
+        lam = 3 / 8 + np.cos(theta) / 4
+        sin1, cot_half = np.sin(theta), 1 / np.tan(theta / 2)
+        d = 8 * (lam - 0.5)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            a = (3 * cot_half / 8 + sin1 / d) / ((lam - 0.75) - 1 / d)
+        a = np.where(np.isclose(d, 0), -sin1, a)
+        b = a * (lam - 0.75) - 3 * cot_half / 8
+        inner = np.sin(position[entries] * theta[local_owner])  # 序号 0 的项 sin(0) = 0
+        across = self.group_sum(local_owner, inner[:, np.newaxis] * ring[entries], len(boundary_vertices))
+        across += a[:, np.newaxis] * v + b[:, np.newaxis] * (q_first + q_last)
+        single = k == 1  # 只关联一个面：两条边界边张成切平面
+        across[single] = ((q_first + q_last) / 2 - v)[single]
+        limit_normals[boundary_vertices] = np.cross(q_first - q_last, across)
+
+        return positions, self.finish_limit_normals(limit_normals, ~(interior | boundary))
+
+    # Catmull-Clark 细分曲面的极限位置与极限法线（要求四边形网格，细分一次后即满足），返回 (positions, normals)：
+    # 内部点：极限位置 = (n^2 * 原顶点 + 4 * 边邻点之和 + 对角点之和) / (n * (n + 5))；
+    # 切向量 t1 = sum(A * cos(2*pi*i/n) * e_i + (cos(2*pi*i/n) + cos(2*pi*(i+1)/n)) * f_i)，t2 将 cos 换成 sin，
+    # A = 1 + cos(2*pi/n) + cos(pi/n) * sqrt(2 * (9 + cos(2*pi/n)))；
+    # 边界点：极限位置 = (q_0 + 4 * 原顶点 + q_k) / 6，沿边界的切向量为 q_0 - q_k，垂直边界的切向量取边界细分矩阵的次主左特征向量：
+    # a * 原顶点 + b * (q_0 + q_k) + sum(sin(i*pi/k) * e_i) + c * sum((sin(i*pi/k) + sin((i+1)*pi/k)) * f_i)
+    def catmull_clark_limit(self):
+        if not np.all(np.diff(self.face_arrays()[0]) == 4):
+            raise ValueError("Catmull-Clark limit positions require a quad mesh")
+        vertices = np.asarray(self.vertices, dtype=np.float64)
+        num_vertices = len(vertices)
+        half_edges = self.half_edges
+        fan, owner, position, fan_sizes, interior, boundary = self.limit_fans()
+        edge_ring = vertices[half_edges.vertex[half_edges.next[fan]]]  # 边邻点 e_i
+        face_ring = vertices[half_edges.vertex[half_edges.next[half_edges.next[fan]]]]  # 面内的对角点 f_i
+        positions = vertices.copy()
+        limit_normals = np.zeros_like(vertices)
+
+        # 内部点
+        n = np.maximum(fan_sizes, 1).astype(np.float64)
+        edge_sum = self.group_sum(owner, edge_ring, num_vertices)
+        face_sum = self.group_sum(owner, face_ring, num_vertices)
+        limit = ((n ** 2)[:, np.newaxis] * vertices + 4 * edge_sum + face_sum) / (n * (n + 5))[:, np.newaxis]
+        positions[interior] = limit[interior]
+
+        a = 1 + np.cos(2 * np.pi / n) + np.cos(np.pi / n) * np.sqrt(2 * (9 + np.cos(2 * np.pi / n)))
+        # cos((i+1)*s)、sin((i+1)*s) 由和角公式得到，每项只需计算一次三角函数
+        angle = 2 * np.pi * position / n[owner]
+        cos_i, sin_i = np.cos(angle), np.sin(angle)
+        cos_s, sin_s = np.cos(2 * np.pi / n)[owner], np.sin(2 * np.pi / n)[owner]
+        cos_next, sin_next = cos_i * cos_s - sin_i * sin_s, sin_i * cos_s + cos_i * sin_s
+        a_ring = a[owner]
+        tangent1 = self.group_sum(owner, (a_ring * cos_i)[:, np.newaxis] * edge_ring + (cos_i + cos_next)[:, np.newaxis] * face_ring, num_vertices)
+        tangent2 = self.group_sum(owner, (a_ring * sin_i)[:, np.newaxis] * edge_ring + (sin_i + sin_next)[:, np.newaxis] * face_ring, num_vertices)
+        limit_normals[interior] = np.cross(tangent1[interior], tangent2[interior])
+
+        # 边界点：一环为边邻点 e_0 = q_0, e_1, ..., e_k = q_k 和对角点 f_0, ..., f_{k-1}
+        boundary_vertices, entries, local_owner, first, last = self.boundary_fans(fan, owner, fan_sizes, boundary)
+        v, q_first, q_last = vertices[boundary_vertices], vertices[first], vertices[last]
+        positions[boundary_vertices] = (q_first + 4 * v + q_last) / 6
+
+        # 特征值 lam = 1/4 + x，x 为 32x^2 - 4(1+cos)x - (1+cos) = 0 的正根，c = 1 / (16x)；
+        # 系数 a、b 由原顶点和 e_0 两列的特征方程解出（k = 2 时 lam = 1/2 单独处理）
+        k = n[boundary_vertices]
+        theta = np.pi / k
+        cos1, sin1, cot_half = np.cos(theta), np.sin(theta), 1 / np.tan(theta / 2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x = (4 * (1 + cos1) + np.sqrt(16 * (1 + cos1) ** 2 + 128 * (1 + cos1))) / 64
+            lam, c = x + 0.25, 1 / (16 * x)
+            g = sin1 * (1 / 16 + c / 4)
+            h = (3 / 8 + c / 2) * cot_half
+            d = 8 * (lam - 0.5)
+            a = (h + 8 * g / d) / ((lam - 0.75) - 1 / d)
+        a = np.where(np.isclose(d, 0), -8 * g, a)
+        b = a * (lam - 0.75) - h
+        c = np.where(k > 1, c, 0)  # 只关联一个面时 x = 0，该点另行处理
+
+        # 序号 0 的 sin(0) 和最后一项的 sin(k*pi/k) 都为 0
+        boundary_position = position[entries]
+        sin_i = np.sin(boundary_position * theta[local_owner])
+        sin_next = np.where(boundary_position + 1 < k[local_owner], np.sin((boundary_position + 1) * theta[local_owner]), 0)
+        inner = sin_i[:, np.newaxis] * edge_ring[entries] + (c[local_owner] * (sin_i + sin_next))[:, np.newaxis] * face_ring[entries]
+        across = self.group_sum(local_owner, inner, len(boundary_vertices))
+        across += a[:, np.newaxis] * v + b[:, np.newaxis] * (q_first + q_last)
+        single = k == 1  # 只关联一个面：两条边界边张成切平面
+        across[single] = ((q_first + q_last) / 2 - v)[single]
+        limit_normals[boundary_vertices] = np.cross(q_first - q_last, across)
+
+        return positions, self.finish_limit_normals(limit_normals, ~(interior | boundary))
+
+    # 将顶点投影到细分曲面的极限位置，scheme 为 "Loop" 或 "Catmull-Clark"，返回新网格（面片与原网格共用），法线为极限法线
+    def project_to_limit(self, scheme):
+        positions, normals = self.loop_limit() if scheme == "Loop" else self.catmull_clark_limit()
+        new_mesh = CustomMesh()
+        new_mesh.vertices = positions.astype(np.asarray(self.vertices).dtype, copy=False)
+        new_mesh.set_face_arrays(*self.face_arrays())
+        new_mesh._half_edges = self._half_edges
+        new_mesh._indices = self._indices
+        new_mesh._edge_indices = self._edge_indices
+        new_mesh.normals = normals.astype(new_mesh.vertices.dtype, copy=False)
+        return new_mesh
+
+    # 清理网格，返回 (新网格, 清理报告)：焊接距离不超过 tolerance 的重复顶点（None 时为包围盒对角线的 1e-6 倍），
+    # 去掉面内相邻的重复顶点、退化的面、面积为零的面和重复的面，报告中为各类被去掉的数量（见 mesh_cleanup.clean_mesh）
+    def clean(self, tolerance=None):
+        kept, face_offsets, face_flat, keep_corner, report = clean_mesh(self.vertices, *self.face_arrays(), tolerance)
+        new_mesh = CustomMesh()
+        new_mesh.vertices = np.asarray(self.vertices)[kept]
+        new_mesh.set_face_arrays(face_offsets, face_flat)
+        new_mesh.texcoords = self.texcoords
+        new_mesh.obj_normals = self.obj_normals
+        if len(self.corner_texcoords) == len(keep_corner):
+            new_mesh.corner_texcoords = self.corner_texcoords[keep_corner]
+            new_mesh.corner_normals = self.corner_normals[keep_corner]
         new_mesh.calculate_normals()
+        return new_mesh, report
+
+    # 二次误差度量（QEM）简化，返回新的三角网格：目标顶点数由 target_ratio（相对当前顶点数的比例）或 target_count 给出，
+    # protect_boundary 为 True 时边界点固定不动；非三角形的面先扇形三角化，引用非有限坐标顶点的三角形被丢弃
+    def simplify(self, target_ratio=None, target_count=None, protect_boundary=True):
+        if (target_ratio is None) == (target_count is None):
+            raise ValueError("exactly one of target_ratio and target_count must be given")
+        if target_count is None:
+            if not 0 <= target_ratio <= 1:
+                raise ValueError(f"target_ratio must be between 0 and 1, got {target_ratio}")
+            target_count = int(round(len(self.vertices) * target_ratio))
+
+        vertices = np.asarray(self.vertices, dtype=np.float64)
+        triangles = self.triangle_array().astype(np.int64)
+        triangles = triangles[np.isfinite(vertices).all(axis=1)[triangles].all(axis=1)]
+        simplified_vertices, simplified_triangles = simplify_triangles(vertices, triangles, target_count, protect_boundary)
 
+        new_mesh = CustomMesh()
+        new_mesh.vertices = simplified_vertices.astype(np.asarray(self.vertices).dtype, copy=False)
+        new_mesh.set_face_arrays(np.arange(0, simplified_triangles.size + 1, 3, dtype=np.int64), simplified_triangles.ravel())
+        new_mesh.calculate_normals()
         return new_mesh
 
-    #拆分三角形
+    # 批量扇形三角化：n 边形以首顶点为中心拆成 n-2 个三角形，返回 (T, 3) 的顶点索引数组，三角形按面的顺序排列；
+    # 所有面边数相同（纯三角形或四边形网格）时直接按 (面数, n) 的形状取列，否则按面展开
+    def triangle_array(self):
+        face_offsets, face_flat = self.face_arrays()
+        face_flat = np.asarray(face_flat).astype(index_dtype(len(self.vertices)), copy=False)
+        face_sizes = np.diff(face_offsets)
+        if len(face_sizes) and face_sizes.min() == face_sizes.max() >= 3:
+            corners = face_flat.reshape(len(face_sizes), int(face_sizes[0]))
+            local_index = np.arange(1, corners.shape[1] - 1)
+            return np.stack([
+                np.broadcast_to(corners[:, :1], (len(corners), len(local_index))),
+                corners[:, local_index],
+                corners[:, local_index + 1],
+            ], axis=2).reshape(-1, 3)
+        triangle_counts = np.maximum(face_sizes - 2, 0)
+        triangle_start = np.repeat(face_offsets[:-1], triangle_counts)  # 扇形中心点所在的角点
+        # 每个三角形在所属面中的序号 i（从 1 开始），三角形为 (v0, v_i, v_i+1)
+        local_index = np.arange(int(triangle_counts.sum())) - np.repeat(np.cumsum(triangle_counts) - triangle_counts, triangle_counts) + 1
+        return np.stack([
+            face_flat[triangle_start],
+            face_flat[triangle_start + local_index],
+            face_flat[triangle_start + local_index + 1],
+        ], axis=1)
+
+    # 拆分三角形，结果缓存在 indices 中，重复调用结果不变；indices 在首次访问时会自动调用，
+    # 显式调用可以在后台线程中提前完成三角化；索引类型按顶点数选择（见 precision.triangle_index_dtype），可以直接上传
+    @profiled("triangulate")
     def triangulate_face(self):
-        for face in self.faces:
-        # 假设 `face` 是一个包含 n 个顶点的多边形
-            v0 = face[0]  # 固定扇形中心点
-            for i in range(1, len(face) - 1):
-                v1 = face[i]     # 第 i 个顶点
-                v2 = face[i + 1] # 第 i+1 个顶点
-                self.indices.extend([v0, v1, v2])  # 生成一个三角形
+        self._indices = self.triangle_array().ravel().astype(triangle_index_dtype(len(self.vertices)), copy=False)
+
+    # 由半边结构生成边索引，结果缓存在 edge_indices 中；与 triangulate_face 一样，显式调用可以在后台线程中提前完成
+    # （上传时不需要在界面线程中构建半边结构），索引类型与三角形索引相同
+    @profiled("edges")
+    def extract_edges(self):
+        self._edge_indices = self.half_edges.edge_vertices().ravel().astype(triangle_index_dtype(len(self.vertices)), copy=False)
+
+    # 导出为 OBJ 或二进制 PLY 文件（按扩展名选择，可带 .gz/.bz2/.xz 压缩），见 mesh_export.export_mesh
+    def export(self, file, format=None, normals=False, **options):
+        return export_mesh(self, file, format, normals=normals, **options)
+
+    # 网格数据占用的字节数（顶点、法向量、面片数组、已计算的三角形索引和边索引、已构建的半边结构），用于缓存的内存统计
+    @property
+    def nbytes(self):
+        arrays = [self.vertices, self.normals, *self.face_arrays()]
+        for cached in (self._indices, self._edge_indices):
+            if cached is not None:
+                arrays.append(cached)
+        total = sum(np.asarray(array).nbytes for array in arrays)
+        if self._half_edges is not None:
+            total += self._half_edges.nbytes
+        return total
 
 
     # 弃用的 Catmull-Clark 算法，虽然这个算法答案不正确，但是细分效果很有趣，故保留
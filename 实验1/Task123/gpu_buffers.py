@@ -0,0 +1,117 @@
+import ctypes
+import numpy as np
+from OpenGL import GL
+from profiling import PROFILER, profiled
+
+# 网格的 GPU 缓冲区管理：
+# 顶点缓冲区存放顶点坐标和法向量，索引缓冲区依次存放三角形索引和网格的无向边（每条边只存一次，
+# 由多边形面片得到，不含三角化产生的对角线，取自网格的 edge_indices），点、线、面三种模式都只需一次绘制调用；
+# VAO、VBO、EBO 只创建一次，网格改变（加载、细分、重置）时才重新上传数据，之后每一帧只需绑定并绘制；
+# 数据大小不变时用 glBufferSubData 原地更新，大小改变时用 glBufferData 重新分配（旧的存储由驱动释放）；
+# 顶点数据以 float32 上传（float32 精度的网格不需要转换）；索引为 uint16 或 uint32，与网格的三角形索引类型一致（见 precision.triangle_index_dtype）；
+# upload_count、upload_bytes 记录上传次数和字节数，gl 参数可替换为其他实现以便在没有窗口的环境中检查
+class MeshBuffers:
+    def __init__(self, gl=GL):
+        self.gl = gl
+        self.vao = None
+        self.vbo = None
+        self.ebo = None
+        self.mesh = None  # 当前缓冲区中数据对应的网格
+        self.vertex_bytes = 0  # 顶点缓冲区中顶点坐标部分的字节数，法向量紧随其后
+        self.buffer_sizes = {}  # 每个缓冲区已分配的字节数
+        self.vertex_count = 0
+        self.index_count = 0  # 三角形索引数
+        self.edge_index_count = 0  # 边索引数，存放在三角形索引之后
+        self.index_dtype = np.dtype(np.uint32)
+        self.upload_count = 0
+        self.upload_bytes = 0
+
+    # 网格与缓冲区中的数据不一致时重新上传，返回是否进行了上传；
+    # 网格原地修改（顶点、法向量或面片）后需要先调用 invalidate
+    def update(self, mesh):
+        if mesh is self.mesh:
+            return False
+        return self.upload(mesh)
+
+    # 上传网格的顶点、法向量、三角形索引和边索引
+    @profiled("upload")
+    def upload(self, mesh):
+        if self.vao is None:
+            self.create()
+
+        vertices = np.ascontiguousarray(mesh.vertices, dtype=np.float32).reshape(-1)
+        normals = np.ascontiguousarray(mesh.normals, dtype=np.float32).reshape(-1)
+        index_dtype = np.dtype(np.uint16) if np.asarray(mesh.indices).dtype == np.uint16 else np.dtype(np.uint32)
+        indices = np.ascontiguousarray(mesh.indices, dtype=index_dtype).reshape(-1)
+        edges = np.ascontiguousarray(mesh.edge_indices, dtype=index_dtype).reshape(-1)
+        gl = self.gl
+
+        gl.glBindVertexArray(self.vao)
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self.vbo)
+        self.allocate(gl.GL_ARRAY_BUFFER, self.vbo, vertices.nbytes + normals.nbytes)
+        gl.glBufferSubData(gl.GL_ARRAY_BUFFER, 0, vertices.nbytes, vertices)
+        gl.glBufferSubData(gl.GL_ARRAY_BUFFER, vertices.nbytes, normals.nbytes, normals)
+
+        gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER, self.ebo)
+        self.allocate(gl.GL_ELEMENT_ARRAY_BUFFER, self.ebo, indices.nbytes + edges.nbytes)
+        gl.glBufferSubData(gl.GL_ELEMENT_ARRAY_BUFFER, 0, indices.nbytes, indices)
+        gl.glBufferSubData(gl.GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, edges.nbytes, edges)
+
+        # 法向量的偏移量随顶点数变化，每次上传后重新设置顶点属性
+        gl.glVertexAttribPointer(0, 3, gl.GL_FLOAT, gl.GL_FALSE, 3 * 4, ctypes.c_void_p(0))
+        gl.glEnableVertexAttribArray(0)
+        gl.glVertexAttribPointer(1, 3, gl.GL_FLOAT, gl.GL_FALSE, 3 * 4, ctypes.c_void_p(vertices.nbytes))
+        gl.glEnableVertexAttribArray(1)
+        gl.glBindVertexArray(0)
+
+        self.mesh = mesh
+        self.vertex_bytes = vertices.nbytes
+        self.vertex_count = len(vertices) // 3
+        self.index_count = len(indices)
+        self.edge_index_count = len(edges)
+        self.index_dtype = index_dtype
+        self.upload_count += 1
+        self.upload_bytes += vertices.nbytes + normals.nbytes + indices.nbytes + edges.nbytes
+        PROFILER.count("upload_bytes", vertices.nbytes + normals.nbytes + indices.nbytes + edges.nbytes)
+        return True
+
+    # 大小与已分配的存储不同时重新分配缓冲区
+    def allocate(self, target, buffer, nbytes):
+        if self.buffer_sizes.get(buffer) != nbytes:
+            self.gl.glBufferData(target, nbytes, None, self.gl.GL_STATIC_DRAW)
+            self.buffer_sizes[buffer] = nbytes
+
+    def create(self):
+        self.vao = self.gl.glGenVertexArrays(1)
+        self.vbo, self.ebo = self.gl.glGenBuffers(2)
+
+    # 标记缓冲区中的数据已过期，下一次 update 时重新上传
+    def invalidate(self):
+        self.mesh = None
+
+    # 绑定 VAO 并绘制，draw_mode 为 GL_POINT（顶点）、GL_LINE（无向边）或 GL_FILL（三角形）
+    def draw(self, draw_mode):
+        if self.vao is None:
+            return
+        gl = self.gl
+        index_type = gl.GL_UNSIGNED_SHORT if self.index_dtype == np.uint16 else gl.GL_UNSIGNED_INT
+        gl.glBindVertexArray(self.vao)
+        if draw_mode == gl.GL_POINT:
+            gl.glDrawArrays(gl.GL_POINTS, 0, self.vertex_count)
+        elif draw_mode == gl.GL_LINE:
+            offset = ctypes.c_void_p(self.index_count * self.index_dtype.itemsize)
+            gl.glDrawElements(gl.GL_LINES, self.edge_index_count, index_type, offset)
+        else:
+            gl.glDrawElements(gl.GL_TRIANGLES, self.index_count, index_type, None)
+        gl.glBindVertexArray(0)
+
+    # 删除缓冲区（需要在 OpenGL 上下文有效时调用）
+    def release(self):
+        if self.vao is None:
+            return
+        self.gl.glDeleteBuffers(2, [self.vbo, self.ebo])
+        self.gl.glDeleteVertexArrays(1, [self.vao])
+        self.vao = self.vbo = self.ebo = None
+        self.mesh = None
+        self.buffer_sizes = {}
+        self.vertex_count = self.index_count = self.edge_index_count = 0
@@ -0,0 +1,209 @@
+import numpy as np
+from profiling import PROFILER, profiled
+
+# 面内角点的循环链接：corner_prev[c]、corner_next[c] 分别是角点 c 在同一个面内的上一个、下一个角点
+def corner_links(face_offsets):
+    num_corners = int(face_offsets[-1])
+    face_sizes = np.diff(face_offsets)
+    non_empty = face_sizes > 0
+    face_start, face_end = face_offsets[:-1][non_empty], face_offsets[1:][non_empty] - 1
+
+    corner_next = np.arange(1, num_corners + 1)
+    corner_next[face_end] = face_start
+    corner_prev = np.arange(-1, num_corners - 1)
+    corner_prev[face_start] = face_end
+    return corner_prev, corner_next
+
+# 已排序数组中每段相同值的第一个位置标记为 True
+def unique_flags(sorted_keys):
+    flags = np.ones(len(sorted_keys), dtype=bool)
+    flags[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    return flags
+
+# 一维整数编码的排序去重，结果与 np.unique 相同，但始终使用排序实现（大数组上比哈希去重快得多）
+def unique_keys(keys):
+    keys = np.sort(keys)
+    return keys[unique_flags(keys)]
+
+# 根据元素数量选择紧凑的索引类型
+def index_dtype(count):
+    return np.int32 if count < 2**31 else np.int64
+
+# 数组形式的半边结构，所有数据保存在连续的整型 NumPy 数组中，由面片数组一次性批量构建
+# 第 h 条半边就是第 h 个角点：面 f 的半边为 face_offsets[f]:face_offsets[f+1]，按面的顶点顺序排列，
+# 半边 h 从 vertex[h] 指向 vertex[next[h]]，属于面 face[h]，对边为 twin[h]（边界边为 -1），所在的无向边为 edge[h]
+class HalfEdgeMesh:
+    @profiled("half_edges")
+    def __init__(self, face_offsets, face_flat, num_vertices):
+        num_faces = len(face_offsets) - 1
+        num_half_edges = int(face_offsets[-1])
+        dtype = index_dtype(max(num_half_edges, num_vertices) + 1)
+        face_sizes = np.diff(face_offsets)
+        self.num_vertices = num_vertices
+
+        # 面：每个面的半边区间，face_half_edge[f] 为面 f 的第一条半边
+        self.face_offsets = np.asarray(face_offsets, dtype=dtype)
+        self.face_half_edge = self.face_offsets[:-1]
+
+        # 半边：起点、所属面、面内的上一条和下一条半边
+        self.vertex = np.asarray(face_flat, dtype=dtype)
+        self.face = np.repeat(np.arange(num_faces, dtype=dtype), face_sizes)
+        corner_prev, corner_next = corner_links(face_offsets)
+        self.prev = corner_prev.astype(dtype)
+        self.next = corner_next.astype(dtype)
+
+        # 无向边：用一维编码稳定排序，相同的边相邻且保持出现的先后顺序
+        origin = self.vertex.astype(np.int64)
+        target = origin[corner_next]
+        keys = np.minimum(origin, target) * num_vertices + np.maximum(origin, target)
+        order = np.argsort(keys, kind='stable')
+        is_start = unique_flags(keys[order])
+        starts = np.flatnonzero(is_start)
+
+        self.edge = np.empty(num_half_edges, dtype=dtype)
+        self.edge[order] = np.cumsum(is_start) - 1
+        self.edge_half_edge = order[starts].astype(dtype)  # 每条边首次出现的半边
+        self.edge_count = np.diff(np.append(starts, num_half_edges)).astype(dtype)  # 每条边关联的面数
+
+        # 对边：每条边前两次出现的半边互为对边，只出现一次的边界边以及非流形边的其余半边为 -1
+        self.twin = np.full(num_half_edges, -1, dtype=dtype)
+        shared = starts[self.edge_count >= 2]
+        self.twin[order[shared]] = order[shared + 1]
+        self.twin[order[shared + 1]] = order[shared]
+
+        # 顶点：每个顶点的一条出半边，边界点优先取边界上的出半边，孤立顶点为 -1
+        self.vertex_half_edge = np.full(num_vertices, -1, dtype=dtype)
+        self.vertex_half_edge[self.vertex] = np.arange(num_half_edges, dtype=dtype)
+        boundary = np.flatnonzero(self.twin < 0)
+        self.vertex_half_edge[self.vertex[boundary]] = boundary
+
+        self._adjacency = None
+        PROFILER.count("half_edges", num_half_edges)
+        PROFILER.count("allocated_bytes", self.nbytes)
+
+    @property
+    def num_faces(self):
+        return len(self.face_half_edge)
+
+    @property
+    def num_edges(self):
+        return len(self.edge_half_edge)
+
+    # 结构占用的字节数
+    @property
+    def nbytes(self):
+        arrays = (self.face_offsets, self.vertex, self.face, self.prev, self.next,
+                  self.edge, self.edge_half_edge, self.edge_count, self.twin, self.vertex_half_edge)
+        return sum(array.nbytes for array in arrays)
+
+    # 每条无向边的两个端点（按首次出现时的方向），形状为 (E, 2)
+    def edge_vertices(self):
+        return np.stack([self.vertex[self.edge_half_edge], self.vertex[self.next[self.edge_half_edge]]], axis=1)
+
+    # 判断边是否为边界边（只关联一个面），支持单个编号或编号数组
+    def is_boundary_edge(self, edge):
+        return self.edge_count[edge] == 1
+
+    # 判断顶点是否为边界点，O(1)：边界点保存的出半边本身就是边界半边，支持单个编号或编号数组
+    def is_boundary_vertex(self, vertex):
+        half_edge = self.vertex_half_edge[vertex]
+        return (half_edge >= 0) & (self.twin[half_edge] < 0)
+
+    # 所有顶点的边界标记
+    def boundary_vertices(self):
+        return self.is_boundary_vertex(np.arange(self.num_vertices))
+
+    # 面 f 的顶点索引
+    def face_vertices(self, f):
+        return self.vertex[self.face_offsets[f]:self.face_offsets[f + 1]]
+
+    # 绕顶点 v 依次访问各关联面中从 v 出发的半边：每次跨过面内与 v 相连的另一条边进入相邻面，
+    # 遇到边界或回到起点时停止；相邻面朝向不一致（对边同向）时也能正确跨过
+    def outgoing_half_edges(self, v):
+        start = self.vertex_half_edge[v]
+        if start < 0:
+            return np.empty(0, dtype=self.vertex.dtype)
+        half_edges = [start]
+        exit_half_edge = self.prev[start]
+        if self.twin[exit_half_edge] < 0 and self.twin[start] >= 0:
+            exit_half_edge = start  # 入半边在边界上时，改为从出半边所在的边跨过去
+        while len(half_edges) <= len(self.vertex):
+            twin = self.twin[exit_half_edge]
+            if twin < 0:
+                break
+            if self.vertex[twin] == v:
+                # 对边从 v 出发，它本身就是相邻面的出半边，继续跨过该面中指向 v 的边
+                outgoing, exit_half_edge = twin, self.prev[twin]
+            else:
+                # 对边指向 v，相邻面的出半边是它的下一条，继续跨过这条出半边所在的边
+                outgoing = exit_half_edge = self.next[twin]
+            if outgoing == start:
+                break
+            half_edges.append(outgoing)
+        return np.array(half_edges, dtype=self.vertex.dtype)
+
+    # 顶点 v 关联的面
+    def vertex_faces(self, v):
+        return self.face[self.outgoing_half_edges(v)]
+
+    # 顶点 v 的一环邻域顶点，按绕顶点的顺序排列
+    def vertex_one_ring(self, v):
+        half_edges = self.outgoing_half_edges(v)
+        ring = np.stack([self.vertex[self.next[half_edges]], self.vertex[self.prev[half_edges]]], axis=1).ravel()
+        return np.array(list(dict.fromkeys(ring.tolist())), dtype=self.vertex.dtype)
+
+    # 所有顶点的出半边按绕顶点的顺序批量排列（CSR 形式）：所有顶点同时沿 twin[prev[h]] 旋转，每步处理一圈中的一条半边，
+    # 边界点从边界上的出半边开始，到另一条边界边结束；顶点 v 的出半边为 fan[fan_offsets[v]:fan_offsets[v+1]]，
+    # closed[v] 表示一环是否闭合（内部点），regular[v] 表示一环是否完整且相邻面朝向一致（非流形点、朝向不一致处为 False）
+    def vertex_fans(self):
+        num_vertices = self.num_vertices
+        vertex = self.vertex.astype(np.int64)
+        rotate = self.twin[self.prev].astype(np.int64)
+        out_degree = np.bincount(vertex, minlength=num_vertices)
+
+        start = self.vertex_half_edge.astype(np.int64)
+        active = np.flatnonzero(start >= 0)
+        current = start[active]
+        closed = np.zeros(num_vertices, dtype=bool)
+        consistent = np.ones(num_vertices, dtype=bool)
+        steps_owner, steps_half_edge = [], []
+        while len(active) > 0 and len(steps_owner) <= len(vertex):
+            steps_owner.append(active)
+            steps_half_edge.append(current)
+            following = rotate[current]
+            has_next = following >= 0
+            wrong_origin = has_next & (vertex[np.maximum(following, 0)] != active)
+            consistent[active[wrong_origin]] = False
+            closed[active[following == start[active]]] = True
+            going = has_next & ~wrong_origin & (following != start[active])
+            active, current = active[going], following[going]
+
+        owners = np.concatenate(steps_owner) if steps_owner else np.zeros(0, dtype=np.int64)
+        half_edges = np.concatenate(steps_half_edge) if steps_half_edge else np.zeros(0, dtype=np.int64)
+        order = np.argsort(owners, kind='stable')  # 按顶点分组，组内保持旋转顺序
+        fan_sizes = np.bincount(owners, minlength=num_vertices)
+        fan_offsets = np.zeros(num_vertices + 1, dtype=np.int64)
+        np.cumsum(fan_sizes, out=fan_offsets[1:])
+        regular = consistent & (fan_sizes == out_degree) & (fan_sizes > 0)
+        return fan_offsets, half_edges[order], closed, regular
+
+    # 顶点邻接关系（CSR 形式，首次调用时构建并缓存），相邻顶点按索引升序存放，且不重复：
+    # 顶点 i 的邻居为 adjacency[adjacency_offsets[i]:adjacency_offsets[i+1]]
+    def adjacency(self):
+        if self._adjacency is None:
+            self._adjacency = self.build_adjacency()
+        return self._adjacency
+
+    @profiled("adjacency")
+    def build_adjacency(self):
+        num_vertices = self.num_vertices
+        edge_vertices = self.edge_vertices().astype(np.int64)
+        v1, v2 = edge_vertices[:, 0], edge_vertices[:, 1]
+
+        # 双向记录每条边，使用一维编码去重并排序
+        keys = unique_keys(np.concatenate([v1 * num_vertices + v2, v2 * num_vertices + v1]))
+        rows, adjacency = np.divmod(keys, num_vertices)
+
+        adjacency_offsets = np.zeros(num_vertices + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=num_vertices), out=adjacency_offsets[1:])
+        return adjacency_offsets, adjacency
@@ -0,0 +1,104 @@
+import numpy as np
+from half_edge import unique_flags
+from profiling import profiled
+from subdivision_operator import SparseOperator
+
+# 拉普拉斯算子：
+# 平均算子 W 为按行归一化的邻居权重（每行之和为 1），一步平滑 x ← x + factor · (W x − x) 只需一次稀疏矩阵乘法；
+# 权重有两种：uniform 为相邻顶点等权，只由连接关系决定；cotangent 为余切权重 (cot α + cot β) / 2，由构建时的顶点位置决定，
+# 钝角处为负的权重截为 0，非三角形的面按扇形三角化后计算；
+# 固定的顶点（边界点、非有限坐标的顶点、没有邻居的顶点）在 W 中只有自身一项，平滑时保持不动，非有限坐标的顶点也不作为邻居
+WEIGHTINGS = ("uniform", "cotangent")
+SMOOTHING_METHODS = ("laplacian", "taubin")
+TAUBIN_PASS_BAND = 0.1  # Taubin 平滑的通带频率 k_pb，收缩系数 λ 与膨胀系数 μ 满足 1/λ + 1/μ = k_pb
+
+# 每个三角形三个角的余切值累加到对边上（每条边的两个方向各一半），返回 (rows, cols, weights)
+def cotangent_weights(vertices, triangles):
+    vertices = np.asarray(vertices, dtype=np.float64)
+    rows, cols, weights = [], [], []
+    for corner in range(3):
+        apex, first, second = triangles[:, corner], triangles[:, (corner + 1) % 3], triangles[:, (corner + 2) % 3]
+        u, v = vertices[first] - vertices[apex], vertices[second] - vertices[apex]
+        sine = np.linalg.norm(np.cross(u, v), axis=1)
+        cotangent = np.divide(np.einsum('ij,ij->i', u, v), sine, out=np.zeros(len(sine)), where=sine > 0)
+        rows += [first, second]
+        cols += [second, first]
+        weights += [cotangent / 2] * 2
+    return merge_pairs(np.concatenate(rows), np.concatenate(cols), np.concatenate(weights), len(vertices))
+
+# 同一对顶点的多项权重合并为一项：与 unique_keys 一样按排序去重，排序后每段相同的顶点对把权重相加；
+# 顶点对编码为 int64，大网格上 int32 的乘积会溢出
+def merge_pairs(rows, cols, weights, num_vertices):
+    keys = rows.astype(np.int64) * num_vertices + cols
+    order = np.argsort(keys)
+    keys = keys[order]
+    starts = unique_flags(keys)
+    merged = np.add.reduceat(np.asarray(weights, dtype=np.float64)[order], np.flatnonzero(starts)) if len(keys) else np.zeros(0)
+    pair_rows, pair_cols = np.divmod(keys[starts], num_vertices)
+    return pair_rows, pair_cols, merged
+
+# 平均算子 W：rows、cols、weights 为邻居权重（每对顶点至多一项），按行归一化后保存；fixed 为固定的顶点标记
+class LaplacianOperator(SparseOperator):
+    def __init__(self, rows, cols, weights, num_vertices, fixed=None):
+        rows, cols = np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.float64)
+        fixed = np.zeros(num_vertices, dtype=bool) if fixed is None else np.asarray(fixed, dtype=bool)
+        keep = (weights > 0) & (rows != cols) & ~fixed[rows]  # 截去非正的权重
+        rows, cols, weights = rows[keep], cols[keep], weights[keep]
+
+        row_sums = np.bincount(rows, weights=weights, minlength=num_vertices)
+        self.fixed = fixed | (row_sums <= 0)
+        identity = np.flatnonzero(self.fixed)
+        super().__init__(np.concatenate([rows, identity]), np.concatenate([cols, identity]),
+                         np.concatenate([weights / row_sums[rows], np.ones(len(identity))]), num_vertices, num_vertices)
+
+    @property
+    def nbytes(self):
+        return super().nbytes + self.fixed.nbytes
+
+    # 一步平滑
+    def step(self, values, factor):
+        values = self.typed(values)
+        return values + factor * (self.apply(values) - values)
+
+    # 拉普拉斯平滑：iterations 步，每步 x ← x + factor · (W x − x)
+    @profiled("laplacian_smooth")
+    def smooth(self, values, iterations, factor=0.5):
+        values = self.typed(values)
+        for _ in range(iterations):
+            values = self.step(values, factor)
+        return values
+
+    # Taubin 平滑：每次迭代先以 factor 收缩一步，再以负的系数 μ 膨胀一步，抵消拉普拉斯平滑带来的体积收缩
+    @profiled("taubin_smooth")
+    def taubin(self, values, iterations, factor=0.5, pass_band=TAUBIN_PASS_BAND):
+        inflate = 1 / (pass_band - 1 / factor)
+        values = self.typed(values)
+        for _ in range(iterations):
+            values = self.step(self.step(values, factor), inflate)
+        return values
+
+    # 与 apply 相同的精度规则：float32 保持 float32，其他按 float64
+    @staticmethod
+    def typed(values):
+        values = np.asarray(values)
+        return values.astype(values.dtype if values.dtype == np.float32 else np.float64, copy=False)
+
+# 构建拉普拉斯算子：half_edges 提供连接关系，vertices 用于余切权重和判断非有限坐标，fixed 为额外固定的顶点标记
+@profiled("laplacian")
+def build_laplacian(half_edges, vertices, triangles=None, weighting="uniform", fixed=None):
+    num_vertices = half_edges.num_vertices
+    if weighting == "uniform":
+        adjacency_offsets, adjacency = half_edges.adjacency()
+        rows = np.repeat(np.arange(num_vertices), np.diff(adjacency_offsets))
+        cols = np.asarray(adjacency, dtype=np.int64)
+        weights = np.ones(len(cols))
+    elif weighting == "cotangent":
+        rows, cols, weights = cotangent_weights(vertices, np.asarray(triangles, dtype=np.int64))
+    else:
+        raise ValueError(f"weighting must be one of {WEIGHTINGS}, got {weighting!r}")
+
+    non_finite = ~np.isfinite(np.asarray(vertices)).all(axis=1)
+    valid = ~non_finite[rows] & ~non_finite[cols]
+    fixed = non_finite if fixed is None else np.asarray(fixed, dtype=bool) | non_finite
+    return LaplacianOperator(rows[valid], cols[valid], weights[valid], num_vertices, fixed)
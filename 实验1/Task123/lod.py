@@ -0,0 +1,92 @@
+import math
+import threading
+import numpy as np
+
+# 细节层次（LOD）：
+# 保存同一网格的若干细分级别（细节层次金字塔），按模型在屏幕上的投影大小选择绘制的级别，
+# 使每个可见三角形在屏幕上大约占 MIN_TRIANGLE_PIXELS 个像素，模型很小时不必绘制最细的级别；
+# 级别切换带有滞后区间，缩放到阈值附近时不会来回跳变；金字塔占用的 GPU 内存不超过预算，超出预算的更细级别不保留
+LOD_MEMORY_BUDGET = 256 * 1024 * 1024  # 金字塔所有级别上传到 GPU 后的总字节数上限
+MIN_TRIANGLE_PIXELS = 4.0  # 每个可见三角形期望占用的像素数
+HYSTERESIS = 0.5  # 滞后区间的相对宽度：变细要求超过阈值的 1 + HYSTERESIS 倍，变粗要求低于 1 - HYSTERESIS 倍
+FIELD_OF_VIEW = 45.0  # 与 MeshViewer.resizeGL 中 gluPerspective 的视角一致
+
+# 网格上传到 GPU 后的字节数：float32 的顶点和法向量、与 indices 同类型（uint16 或 uint32）的三角形索引和边索引（边数约为角点数的一半）
+def gpu_bytes(mesh):
+    num_corners = len(mesh.face_arrays()[1])
+    index_size = 2 if np.asarray(mesh.indices).dtype == np.uint16 else 4
+    return len(mesh.vertices) * 6 * 4 + (len(mesh.indices) + num_corners) * index_size
+
+# 以原点为中心、半径为 radius 的模型在距离 distance 处投影到屏幕上的直径（像素），viewport_height 为视口高度（像素）
+def projected_diameter(radius, distance, viewport_height, field_of_view=FIELD_OF_VIEW):
+    if distance <= radius:
+        return math.inf  # 相机在模型包围球内
+    return viewport_height * radius / (distance * math.tan(math.radians(field_of_view) / 2))
+
+# 细节层次金字塔：levels[级数] 为对应细分级别的网格，radius 为第一个加入的网格相对原点的包围球半径（视图绕原点旋转）；
+# 细分线程与界面线程会同时访问，所有操作都加锁
+class LodPyramid:
+    def __init__(self, budget=LOD_MEMORY_BUDGET):
+        self.budget = budget
+        self.levels = {}
+        self.level_bytes = {}
+        self.radius = None
+        self.lock = threading.Lock()
+
+    # 加入一级网格，超出内存预算时不加入并返回 False（至少保留一级）
+    def add(self, level, mesh):
+        nbytes = gpu_bytes(mesh)
+        with self.lock:
+            total = sum(size for key, size in self.level_bytes.items() if key != level)
+            if self.levels and total + nbytes > self.budget:
+                return False
+            self.levels[level] = mesh
+            self.level_bytes[level] = nbytes
+            if self.radius is None:
+                vertices = np.asarray(mesh.vertices, dtype=np.float64)
+                finite = vertices[np.isfinite(vertices).all(axis=1)]
+                self.radius = float(np.linalg.norm(finite, axis=1).max()) if len(finite) else 1.0
+            return True
+
+    def clear(self):
+        with self.lock:
+            self.levels = {}
+            self.level_bytes = {}
+            self.radius = None
+
+    def get(self, level):
+        with self.lock:
+            return self.levels.get(level)
+
+    def __len__(self):
+        return len(self.levels)
+
+    @property
+    def total_bytes(self):
+        with self.lock:
+            return sum(self.level_bytes.values())
+
+    # 按投影直径选择绘制的级别：取每个可见三角形（约为总数的一半）不小于 min_triangle_pixels 像素的最细级别；
+    # current 为当前绘制的级别，只有越过滞后区间才切换；max_level 不为 None 时只在不超过该级的级别中选择
+    def select(self, diameter, current=None, min_triangle_pixels=MIN_TRIANGLE_PIXELS, hysteresis=HYSTERESIS, max_level=None):
+        with self.lock:
+            triangles = {level: max(len(mesh.indices) // 3, 1) for level, mesh in self.levels.items()
+                         if max_level is None or level <= max_level}
+        if not triangles:
+            return None
+        levels = sorted(triangles)
+        area = math.pi / 4 * diameter ** 2
+
+        def triangle_pixels(level):
+            return area / (triangles[level] / 2)
+
+        if current not in triangles:
+            fitting = [level for level in levels if triangle_pixels(level) >= min_triangle_pixels]
+            return fitting[-1] if fitting else levels[0]
+
+        index = levels.index(current)
+        while index + 1 < len(levels) and triangle_pixels(levels[index + 1]) >= min_triangle_pixels * (1 + hysteresis):
+            index += 1
+        while index > 0 and triangle_pixels(levels[index]) < min_triangle_pixels * (1 - hysteresis):
+            index -= 1
+        return levels[index]
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import numpy as np
+from custom_mesh import CustomMesh
+from precision import float_dtype
+
+# 缓存中保存的数组：读入的网格数据、法向量、拆分后的三角形索引和边索引
+CACHED_ARRAYS = ["vertices", "face_offsets", "face_flat", "normals", "indices", "edge_indices",
+                 "texcoords", "obj_normals", "corner_texcoords", "corner_normals"]
+INDEX_FILE = "index.json"
+CACHE_FORMAT = 3  # 缓存格式版本：解析、法向量或三角化的结果改变时加 1，旧版本的缓存项不再命中，之后按 LRU 淘汰
+
+# 计算文件内容的哈希值
+def file_hash(file_path, chunk_size=1 << 20):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# OBJ 文件的二进制网格缓存：
+# 每个模型的数组以 .npy 文件保存在 cache_dir/<key>/ 中，读取时使用 np.load(mmap_mode='r') 内存映射，不复制数据；
+# 缓存项以文件路径、读取精度和缓存格式版本为键，并记录文件大小、修改时间和内容哈希，文件改变后自动失效；
+# 缓存总大小超过 max_bytes 时按最近最少使用（LRU）的顺序淘汰；enabled=False 时直接解析 OBJ 文件；
+# 命中缓存时只在内存中更新使用时间，索引在写入新缓存项或调用 flush 时才写回磁盘
+class MeshCache:
+    def __init__(self, cache_dir, max_bytes=512 * 1024 * 1024, enabled=True):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.entries = {}
+        self.dirty = False  # 内存中的索引是否有尚未写回的改动
+        if enabled:
+            self.entries = self.read_index()
+
+    def read_index(self):
+        try:
+            with open(os.path.join(self.cache_dir, INDEX_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def write_index(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        index_path = os.path.join(self.cache_dir, INDEX_FILE)
+        with open(index_path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=1)
+        os.replace(index_path + ".tmp", index_path)
+        self.dirty = False
+
+    # 写回尚未保存的使用时间等改动，在程序退出前调用
+    def flush(self):
+        if self.dirty:
+            self.write_index()
+
+    # 缓存项的键：由文件的绝对路径、读取精度和缓存格式版本决定
+    @staticmethod
+    def cache_key(file_path, dtype):
+        key = f"{os.path.abspath(file_path)}|{np.dtype(dtype).name}|{CACHE_FORMAT}"
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    # 读取网格：缓存有效时内存映射缓存的数组，否则解析 OBJ 文件并写入缓存；dtype 为 None 时按默认精度
+    def load(self, file_path, dtype=None):
+        dtype = float_dtype(dtype)
+        if not self.enabled:
+            return CustomMesh.from_obj(file_path, dtype)
+
+        key = self.cache_key(file_path, dtype)
+        stat = os.stat(file_path)
+        entry = self.entries.get(key)
+        if entry is not None and self.is_valid(entry, file_path, stat):
+            try:
+                mesh = self.read_entry(key)
+                entry["last_used"] = time.time()
+                self.dirty = True
+                return mesh
+            except (OSError, ValueError):
+                self.remove(key)  # 缓存文件损坏，重新解析
+
+        mesh = CustomMesh.from_obj(file_path, dtype)
+        self.store(key, file_path, stat, mesh)
+        return mesh
+
+    # 判断缓存项是否仍然有效：大小和修改时间一致即有效；
+    # 只有修改时间变化时再比较内容哈希，内容没变则更新记录的修改时间后继续使用
+    def is_valid(self, entry, file_path, stat):
+        if entry["size"] != stat.st_size:
+            return False
+        if entry["mtime_ns"] == stat.st_mtime_ns:
+            return True
+        if entry["hash"] == file_hash(file_path):
+            entry["mtime_ns"] = stat.st_mtime_ns
+            self.dirty = True
+            return True
+        return False
+
+    def read_entry(self, key):
+        entry_dir = os.path.join(self.cache_dir, key)
+        arrays = {name: np.load(os.path.join(entry_dir, name + ".npy"), mmap_mode='r') for name in CACHED_ARRAYS}
+
+        mesh = CustomMesh()
+        mesh.vertices = arrays["vertices"]
+        mesh.set_face_arrays(arrays["face_offsets"], arrays["face_flat"])
+        mesh.normals = arrays["normals"]
+        mesh.indices = arrays["indices"]
+        mesh.edge_indices = arrays["edge_indices"]
+        mesh.texcoords = arrays["texcoords"]
+        mesh.obj_normals = arrays["obj_normals"]
+        mesh.corner_texcoords = arrays["corner_texcoords"]
+        mesh.corner_normals = arrays["corner_normals"]
+        return mesh
+
+    # 写入缓存项：先写到临时目录再整体替换，避免留下不完整的缓存
+    def store(self, key, file_path, stat, mesh):
+        face_offsets, face_flat = mesh.face_arrays()
+        arrays = {
+            "vertices": np.asarray(mesh.vertices),
+            "face_offsets": face_offsets,
+            "face_flat": face_flat,
+            "normals": np.asarray(mesh.normals),
+            "indices": np.asarray(mesh.indices),
+            "edge_indices": np.asarray(mesh.edge_indices),
+            "texcoords": mesh.texcoords,
+            "obj_normals": mesh.obj_normals,
+            "corner_texcoords": mesh.corner_texcoords,
+            "corner_normals": mesh.corner_normals,
+        }
+        nbytes = sum(array.nbytes for array in arrays.values())
+        if nbytes > self.max_bytes:
+            return
+
+        entry_dir = os.path.join(self.cache_dir, key)
+        temp_dir = entry_dir + ".tmp"
+        try:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            os.makedirs(temp_dir)
+            for name, array in arrays.items():
+                np.save(os.path.join(temp_dir, name + ".npy"), array)
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(temp_dir, entry_dir)
+        except OSError as e:
+            print(f"Error writing mesh cache for {file_path}: {str(e)}")
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            return
+
+        self.entries[key] = {
+            "path": os.path.abspath(file_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "hash": file_hash(file_path),
+            "nbytes": nbytes,
+            "last_used": time.time(),
+        }
+        self.evict(keep=key)
+        self.write_index()
+
+    # 按最近最少使用的顺序淘汰缓存项，直到总大小不超过上限
+    def evict(self, keep=None):
+        total = sum(entry["nbytes"] for entry in self.entries.values())
+        for key in sorted(self.entries, key=lambda k: self.entries[k]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= self.entries[key]["nbytes"]
+            self.remove(key, write=False)
+
+    def remove(self, key, write=True):
+        self.entries.pop(key, None)
+        shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+        if write:
+            self.write_index()
+
+    # 清空缓存
+    def clear(self):
+        for key in list(self.entries):
+            self.remove(key, write=False)
+        self.write_index()
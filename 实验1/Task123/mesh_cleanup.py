@@ -0,0 +1,173 @@
+import numpy as np
+from half_edge import corner_links, index_dtype
+from profiling import PROFILER, profiled
+from simplification import expand_ranges
+
+# 网格清理：
+# 焊接距离不超过容差的顶点（空间散列：只比较落在同一格中的顶点，用几套错开的格子保证不漏掉跨格的点对，整体为近线性时间），
+# 按焊接结果整体重新编号面片，再去掉面内相邻的重复顶点、顶点数不足 3 的面、面积为零的面和重复的面（顶点集合相同）；
+# 未被引用的顶点保留，非有限坐标的顶点不参与焊接
+RELATIVE_TOLERANCE = 1e-6  # 默认焊接容差：包围盒对角线长度的倍数
+HASH_PRIMES = np.array([73856093, 19349663, 83492791], dtype=np.int64)  # 格子坐标的散列系数
+# 格子边长为 2 倍容差，共 8 套格子，各轴分别错开 0 或 1 倍容差：每个轴上两套格子的分界线合起来每隔一个容差出现一次，
+# 距离小于容差的两点之间至多隔着其中一套的分界线，因此在 8 套格子中至少有一套把它们分在同一格
+GRID_SHIFTS = np.array(list(np.ndindex(2, 2, 2)), dtype=np.float64)
+
+# 格子坐标的散列值：不同格子可能冲突，冲突只会多出一些候选点对，由距离判断排除，不影响结果
+def cell_hash(cells):
+    return cells @ HASH_PRIMES
+
+# 默认焊接容差：有限坐标部分包围盒对角线的 RELATIVE_TOLERANCE 倍
+def default_tolerance(vertices):
+    finite = vertices[np.isfinite(vertices).all(axis=1)]
+    if not len(finite):
+        return 0.0
+    return RELATIVE_TOLERANCE * float(np.linalg.norm(finite.max(axis=0) - finite.min(axis=0)))
+
+# 坐标完全相同的顶点分组：返回每个顶点所在组的代表（组内序号最小的顶点）
+def exact_duplicates(vertices):
+    order = np.lexsort(vertices.T[::-1])
+    ordered = vertices[order]
+    starts = np.ones(len(order), dtype=bool)
+    starts[1:] = (ordered[1:] != ordered[:-1]).any(axis=1)
+    group = np.cumsum(starts) - 1
+    representative = np.full(int(starts.sum()), len(vertices), dtype=np.int64)
+    np.minimum.at(representative, group, order)
+    labels = np.empty(len(vertices), dtype=np.int64)
+    labels[order] = representative[group]
+    return labels
+
+# 距离不超过 tolerance 的点对 (i, j)，i < j：在每套格子中按散列值排序，只比较散列值相同的一段中的点
+def close_pairs(points, tolerance):
+    firsts, seconds = [], []
+    for shift in GRID_SHIFTS:
+        keys = cell_hash(np.floor(points / (2 * tolerance) + shift / 2).astype(np.int64))
+        order = np.argsort(keys)
+        sorted_keys = keys[order]
+        run_starts = np.flatnonzero(np.concatenate([[True], sorted_keys[1:] != sorted_keys[:-1]]))
+        run_sizes = np.diff(np.append(run_starts, len(keys)))
+        shared = run_sizes > 1
+        if not shared.any():
+            continue
+        # 一段中的每个点与段内排在它后面的点组成点对
+        members, _ = expand_ranges(run_starts[shared], run_sizes[shared])
+        run_ends = np.repeat(run_starts[shared] + run_sizes[shared], run_sizes[shared])
+        partners, owners = expand_ranges(members + 1, run_ends - members - 1)
+        first, second = order[members[owners]], order[partners]
+        firsts.append(np.minimum(first, second))
+        seconds.append(np.maximum(first, second))
+    if not firsts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    first, second = np.concatenate(firsts), np.concatenate(seconds)
+    close = np.linalg.norm(points[first] - points[second], axis=1) <= tolerance
+    return first[close], second[close]
+
+# 连通分量：每个点的标签为所在分量中最小的序号（标签沿点对取最小值传播，再用指针跳跃压缩路径，直到不再变化）
+def component_labels(count, first, second):
+    labels = np.arange(count)
+    while True:
+        previous = labels
+        smaller = np.minimum(labels[first], labels[second])
+        labels = labels.copy()
+        np.minimum.at(labels, first, smaller)
+        np.minimum.at(labels, second, smaller)
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+        if np.array_equal(labels, previous):
+            return labels
+
+# 焊接顶点：距离不超过 tolerance 的顶点（连同经由它们传递相连的顶点）合并为序号最小的那个顶点，位置取该顶点的位置；
+# 返回 (每个原顶点对应的新序号, 保留的原顶点序号)，保留的顶点保持原来的相对顺序
+@profiled("weld_vertices")
+def weld_vertices(vertices, tolerance):
+    vertices = np.asarray(vertices)
+    labels = np.arange(len(vertices))
+    finite = np.flatnonzero(np.isfinite(vertices).all(axis=1))
+    if len(finite):
+        exact = exact_duplicates(vertices[finite])
+        unique = np.flatnonzero(exact == np.arange(len(finite)))
+        if tolerance > 0 and len(unique) > 1:
+            first, second = close_pairs(vertices[finite[unique]].astype(np.float64), tolerance)
+            merged = unique[component_labels(len(unique), first, second)]
+            position = np.empty(len(finite), dtype=np.int64)
+            position[unique] = np.arange(len(unique))
+            exact = merged[position[exact]]
+        labels[finite] = finite[exact]
+
+    kept = np.flatnonzero(labels == np.arange(len(vertices)))
+    new_index = np.empty(len(vertices), dtype=np.int64)
+    new_index[kept] = np.arange(len(kept))
+    return new_index[labels], kept
+
+# 每个面的面积：以面的首顶点为原点，把相邻角点的叉积累加（Newell 方法），适用于任意多边形
+def face_areas(vertices, face_offsets, face_flat):
+    face_sizes = np.diff(face_offsets)
+    _, corner_next = corner_links(face_offsets)
+    owner = np.repeat(np.arange(len(face_sizes)), face_sizes)
+    origin = vertices[face_flat[np.repeat(face_offsets[:-1], face_sizes)]]
+    crosses = np.cross(vertices[face_flat] - origin, vertices[face_flat[corner_next]] - origin)
+    sums = np.stack([np.bincount(owner, weights=crosses[:, axis], minlength=len(face_sizes)) for axis in range(3)], axis=1)
+    return np.linalg.norm(sums, axis=1) / 2
+
+# 顶点集合相同的面中，除第一个以外的标记为重复；按边数分组，每组把排好序的顶点行整体去重
+def duplicate_faces(face_offsets, face_flat):
+    face_sizes = np.diff(face_offsets)
+    duplicate = np.zeros(len(face_sizes), dtype=bool)
+    for size in np.unique(face_sizes).tolist():
+        faces = np.flatnonzero(face_sizes == size)
+        rows = np.sort(face_flat[face_offsets[faces][:, np.newaxis] + np.arange(size)], axis=1)
+        order = np.lexsort(rows.T[::-1])
+        ordered = rows[order]
+        repeated = np.zeros(len(faces), dtype=bool)
+        repeated[1:] = (ordered[1:] == ordered[:-1]).all(axis=1)
+        duplicate[faces[order[repeated]]] = True  # 稳定排序，每组相同的行中保留序号最小的面
+    return duplicate
+
+# 清理面片（顶点已重新编号）：去掉面内与下一个角点相同的角点，再去掉边数不足 3、面积不超过 min_area 和重复的面；
+# 返回 (新的 face_offsets, 新的 face_flat, 保留的角点标记, 各类被去掉的数量)
+def clean_faces(vertices, face_offsets, face_flat, min_area=0.0):
+    face_sizes = np.diff(face_offsets)
+    owner = np.repeat(np.arange(len(face_sizes)), face_sizes)
+    _, corner_next = corner_links(face_offsets)
+    keep_corner = face_flat != face_flat[corner_next]
+    # 所有角点都相同的面只剩下 0 个角点；交替重复（a b a b）的面由面积判断去掉
+    sizes = np.bincount(owner[keep_corner], minlength=len(face_sizes))
+    keep_face = sizes >= 3
+    stats = {"repeated_corners": int(len(face_flat) - keep_corner.sum()), "degenerate_faces": int((~keep_face).sum())}
+
+    # 角点按面的顺序排列，按标记取出角点即得到所选面的扁平数组
+    def selected(keep):
+        offsets = np.zeros(int(keep.sum()) + 1, dtype=np.int64)
+        np.cumsum(sizes[keep], out=offsets[1:])
+        return offsets, face_flat[keep_corner & keep[owner]]
+
+    zero_area = np.zeros(len(face_sizes), dtype=bool)
+    zero_area[keep_face] = face_areas(vertices, *selected(keep_face)) <= min_area
+    keep_face &= ~zero_area
+    stats["zero_area_faces"] = int(zero_area.sum())
+
+    duplicate = np.zeros(len(face_sizes), dtype=bool)
+    duplicate[keep_face] = duplicate_faces(*selected(keep_face))
+    keep_face &= ~duplicate
+    stats["duplicate_faces"] = int(duplicate.sum())
+
+    keep_corner &= keep_face[owner]
+    return (*selected(keep_face), keep_corner, stats)
+
+# 清理网格：焊接顶点、重新编号面片并清理面片，tolerance 为 None 时取默认容差，面积不超过 tolerance² 的面视为面积为零；
+# 返回 (保留的原顶点序号, 新的 face_offsets, 新的 face_flat, 保留的原角点标记, 清理报告)
+@profiled("clean_mesh")
+def clean_mesh(vertices, face_offsets, face_flat, tolerance=None):
+    vertices = np.asarray(vertices)
+    tolerance = default_tolerance(vertices) if tolerance is None else float(tolerance)
+    new_index, kept = weld_vertices(vertices, tolerance)
+    face_flat = new_index[np.asarray(face_flat)]
+    with PROFILER.span("clean_faces"):
+        offsets, flat, keep_corner, stats = clean_faces(vertices[kept], np.asarray(face_offsets), face_flat, tolerance ** 2)
+    report = {"welded_vertices": int(len(vertices) - len(kept)), **stats}
+    for name, value in report.items():
+        PROFILER.count(name, value)
+    return kept, offsets, flat.astype(index_dtype(len(kept)), copy=False), keep_corner, report
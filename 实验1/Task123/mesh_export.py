@@ -0,0 +1,133 @@
+import bz2
+import contextlib
+import gzip
+import lzma
+import os
+import numpy as np
+from profiling import PROFILER, profiled
+
+# 网格导出：OBJ（可选 vn）和二进制 PLY，按块写出，每块由 NumPy 数组整体格式化（文本用一次 % 格式化整块，
+# PLY 直接写数组的字节），不逐个顶点循环，内存占用只与块大小有关；
+# file 可以是文件路径（按扩展名 .gz/.bz2/.xz 压缩）或以二进制方式打开的文件对象
+CHUNK_SIZE = 1 << 16  # 每块的顶点数或面数
+COMPRESSORS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+FLOAT_FORMAT = "%.9g"  # 足以精确表示 float32 的有效数字
+
+# 打开输出：路径按扩展名选择压缩方式，先写临时文件再替换；文件对象直接使用，不关闭
+@contextlib.contextmanager
+def open_output(file):
+    if not isinstance(file, (str, os.PathLike)):
+        yield file
+        return
+    file = os.fspath(file)
+    opener = COMPRESSORS.get(os.path.splitext(file)[1].lower(), open)
+    temp_path = file + ".tmp"
+    try:
+        with opener(temp_path, 'wb') as f:
+            yield f
+        os.replace(temp_path, file)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
+
+# 去掉压缩扩展名后的格式扩展名
+def format_of(file):
+    root, extension = os.path.splitext(os.fspath(file).lower())
+    if extension in COMPRESSORS:
+        extension = os.path.splitext(root)[1]
+    return extension.lstrip(".")
+
+def export_arrays(mesh, normals):
+    face_offsets, face_flat = mesh.face_arrays()
+    vertices = np.asarray(mesh.vertices)
+    vertex_normals = np.asarray(mesh.normals) if normals else None
+    if normals and vertex_normals.shape != vertices.shape:
+        raise ValueError("mesh normals do not match its vertices, call calculate_normals() first")
+    return vertices, vertex_normals, np.asarray(face_offsets), np.asarray(face_flat)
+
+# 把 count 行相同格式的数值行整体格式化：一行的模板重复 count 次后用一次 % 运算填入全部数值
+def format_rows(line, values, count=None):
+    count = len(values) if count is None else count
+    return ((line * count) % tuple(values.ravel().tolist())).encode('ascii')
+
+# 一块面片的文本：values 为每个角点依次填入的数值（每个角点 per_corner 个），相同边数的相邻面合并成一段，每段整体格式化
+def format_faces(sizes, values, corner_format, per_corner=1):
+    chunks = []
+    run_starts = np.concatenate([[0], np.flatnonzero(np.diff(sizes)) + 1, [len(sizes)]])
+    value_starts = np.concatenate([[0], np.cumsum(sizes)]) * per_corner
+    for start, end in zip(run_starts[:-1].tolist(), run_starts[1:].tolist()):
+        line = "f" + corner_format * int(sizes[start]) + "\n"
+        chunks.append(format_rows(line, values[value_starts[start]:value_starts[end]], end - start))
+    return b"".join(chunks)
+
+# 写出 OBJ 文件，normals 为 True 时写出每个顶点的 vn，面片以 v//vn 引用
+@profiled("export_obj")
+def export_obj(mesh, file, normals=False, chunk_size=CHUNK_SIZE, float_format=FLOAT_FORMAT):
+    vertices, vertex_normals, face_offsets, face_flat = export_arrays(mesh, normals)
+    face_sizes = np.diff(face_offsets)
+    written = 0
+    with open_output(file) as f:
+        for start in range(0, len(vertices), chunk_size):
+            written += f.write(format_rows(f"v {float_format} {float_format} {float_format}\n", vertices[start:start + chunk_size]))
+        if normals:
+            for start in range(0, len(vertex_normals), chunk_size):
+                written += f.write(format_rows(f"vn {float_format} {float_format} {float_format}\n",
+                                               vertex_normals[start:start + chunk_size]))
+        corner_format = " %d//%d" if normals else " %d"
+        for start in range(0, len(face_sizes), chunk_size):
+            end = min(start + chunk_size, len(face_sizes))
+            corners = face_flat[face_offsets[start]:face_offsets[end]].astype(np.int64) + 1  # OBJ 索引从 1 开始
+            if normals:
+                corners = np.repeat(corners, 2)
+            written += f.write(format_faces(face_sizes[start:end], corners, corner_format, 2 if normals else 1))
+    PROFILER.count("export_bytes", written)
+    return written
+
+# 写出二进制（小端）PLY 文件：顶点为 float32（dtype 可改为 np.float64），normals 为 True 时带 nx ny nz，
+# 面片为 uchar 顶点数加 int 顶点索引的列表
+@profiled("export_ply")
+def export_ply(mesh, file, normals=False, chunk_size=CHUNK_SIZE, dtype=np.float32):
+    vertices, vertex_normals, face_offsets, face_flat = export_arrays(mesh, normals)
+    face_sizes = np.diff(face_offsets)
+    if len(face_sizes) and face_sizes.max() > 255:
+        raise ValueError("PLY face lists are limited to 255 vertices")
+    scalar = {np.dtype(np.float32): "float", np.dtype(np.float64): "double"}[np.dtype(dtype)]
+    fields = ["x", "y", "z"] + (["nx", "ny", "nz"] if normals else [])
+    header = ["ply", "format binary_little_endian 1.0", f"element vertex {len(vertices)}"]
+    header += [f"property {scalar} {field}" for field in fields]
+    header += [f"element face {len(face_sizes)}", "property list uchar int vertex_indices", "end_header"]
+
+    written = 0
+    with open_output(file) as f:
+        written += f.write(("\n".join(header) + "\n").encode('ascii'))
+        for start in range(0, len(vertices), chunk_size):
+            rows = vertices[start:start + chunk_size]
+            if normals:
+                rows = np.concatenate([rows, vertex_normals[start:start + chunk_size]], axis=1)
+            written += f.write(np.ascontiguousarray(rows, dtype=np.dtype(dtype).newbyteorder('<')).tobytes())
+        for start in range(0, len(face_sizes), chunk_size):
+            end = min(start + chunk_size, len(face_sizes))
+            written += f.write(face_list_bytes(face_sizes[start:end], face_flat[face_offsets[start]:face_offsets[end]]))
+    PROFILER.count("export_bytes", written)
+    return written
+
+# 一块面片的 PLY 列表字节：每个面为 1 字节的顶点数后接 4 字节的索引，用散射赋值一次填好
+def face_list_bytes(sizes, corners):
+    count_positions = (np.cumsum(sizes) - sizes) * 4 + np.arange(len(sizes))
+    out = np.empty(len(sizes) + 4 * len(corners), dtype=np.uint8)
+    out[count_positions] = sizes
+    corner_offsets = np.arange(len(corners)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    corner_positions = np.repeat(count_positions + 1, sizes) + 4 * corner_offsets
+    corner_bytes = np.ascontiguousarray(corners, dtype='<i4').view(np.uint8).reshape(-1, 4)
+    out[corner_positions[:, np.newaxis] + np.arange(4)] = corner_bytes
+    return out.tobytes()
+
+EXPORTERS = {"obj": export_obj, "ply": export_ply}
+
+# 按扩展名（可带压缩扩展名，如 .obj.gz）选择格式导出；文件对象需要用 format 指定格式
+def export_mesh(mesh, file, format=None, **options):
+    format = format or format_of(file)
+    if format not in EXPORTERS:
+        raise ValueError(f"unsupported export format: {format!r}")
+    return EXPORTERS[format](mesh, file, **options)
@@ -0,0 +1,213 @@
+import warnings
+import numpy as np
+from profiling import PROFILER, profiled
+
+OBJ_ENCODINGS = ['utf-8', 'gbk', 'iso-8859-1', 'ascii', 'gb2312']  # 尝试的编码列表
+CHUNK_SIZE = 1 << 24  # 分块解析的字节数，限制解析过程中临时数组的大小
+
+# 行类型编号，其余行（注释、o、g、usemtl 等）忽略
+LINE_V, LINE_VT, LINE_VN, LINE_F = 1, 2, 3, 4
+WHITESPACE = np.array([ord(' '), ord('\t')], dtype=np.uint8)
+
+# 检测文件编码：OBJ 的数据记录都是 ASCII，只需要解码含非 ASCII 字节的行（通常是注释）
+def detect_encoding(data, encodings=OBJ_ENCODINGS):
+    if data.isascii():
+        return 'ascii'
+    buf = np.frombuffer(data, dtype=np.uint8)
+    newlines = np.flatnonzero(buf == ord('\n'))
+    line_ids = np.unique(np.searchsorted(newlines, np.flatnonzero(buf >= 0x80)))
+    line_starts = np.concatenate([[0], newlines + 1])[line_ids]
+    line_ends = np.append(newlines, len(buf))[line_ids]
+    sample = b'\n'.join(data[start:end] for start, end in zip(line_starts.tolist(), line_ends.tolist()))
+
+    for encoding in encodings:
+        try:
+            sample.decode(encoding)
+            return encoding
+        except UnicodeDecodeError:
+            continue  # 如果出现解码错误，尝试下一种编码
+    return None
+
+# 去掉行内注释：把每行从 '#' 到行尾（不含换行符）的字节改为空格，没有注释时直接返回原数据
+def strip_comments(buf):
+    hashes = np.flatnonzero(buf == ord('#'))
+    if not len(hashes):
+        return buf
+    newlines = np.flatnonzero(buf == ord('\n'))
+    ends = np.append(newlines, len(buf))[np.searchsorted(newlines, hashes)]
+    first = np.concatenate([[True], ends[1:] != ends[:-1]])  # 同一行中只取第一个 '#'
+    delta = np.zeros(len(buf) + 1, dtype=np.int8)
+    delta[hashes[first]] = 1
+    delta[ends[first]] = -1
+    buf = buf.copy()
+    buf[np.cumsum(delta[:-1], dtype=np.int8) > 0] = ord(' ')
+    return buf
+
+# 将一块数据按行分类，返回每行的类型和长度（包含换行符）
+def classify_lines(buf):
+    newlines = np.flatnonzero(buf == ord('\n'))
+    starts = np.concatenate([[0], newlines + 1])
+    if starts[-1] == len(buf):
+        starts = starts[:-1]
+    lengths = np.diff(np.append(starts, len(buf)))
+
+    # 行首的前三个字符，超出行尾的部分视为换行
+    def char_at(offset):
+        chars = buf[np.minimum(starts + offset, len(buf) - 1)]
+        return np.where(offset < lengths, chars, ord('\n'))
+
+    c0, c1, c2 = char_at(0), char_at(1), char_at(2)
+    types = np.zeros(len(starts), dtype=np.uint8)
+    types[(c0 == ord('v')) & np.isin(c1, WHITESPACE)] = LINE_V
+    types[(c0 == ord('v')) & (c1 == ord('t')) & np.isin(c2, WHITESPACE)] = LINE_VT
+    types[(c0 == ord('v')) & (c1 == ord('n')) & np.isin(c2, WHITESPACE)] = LINE_VN
+    types[(c0 == ord('f')) & np.isin(c1, WHITESPACE)] = LINE_F
+    return types, lengths
+
+# 取出某一类记录的全部数据，去掉行首标签后返回 (数据字节串, 记录条数)
+def record_region(buf, byte_types, line_type, tag):
+    region = buf[byte_types == line_type].tobytes()
+    num_records = region.count(b'\n') + (not region.endswith(b'\n'))
+    return region[len(tag):].replace(b'\n' + tag, b'\n'), num_records
+
+# 统计每条记录（每行）中以空白分隔的字段数
+def field_counts(region, num_records):
+    chars = np.frombuffer(region, dtype=np.uint8)
+    is_space = chars <= ord(' ')  # 空格、制表符、换行、回车等空白字符
+    field_starts = np.flatnonzero(~is_space & np.concatenate([[True], is_space[:-1]]))
+    record_ids = np.searchsorted(np.flatnonzero(chars == ord('\n')), field_starts)
+    return np.bincount(record_ids, minlength=num_records)
+
+# 批量解析以空白分隔的数值，数据中有无法解析的内容时报错
+def parse_numbers(region, dtype, expected_count, name):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        numbers = np.fromstring(region, dtype=dtype, sep=' ')
+    if len(numbers) != expected_count:
+        raise ValueError(f"malformed '{name}' record")
+    return numbers
+
+# 解析一类坐标记录（v、vt、vn），取每条记录的前 width 个数值，不足 min_width 个时报错，不足 width 个时补 0
+def parse_records(buf, byte_types, line_type, tag, width, min_width, dtype):
+    region, num_records = record_region(buf, byte_types, line_type, tag)
+    counts = field_counts(region, num_records)
+    name = tag.decode()
+    if np.any(counts < min_width):
+        raise ValueError(f"'{name}' record with fewer than {min_width} values")
+    numbers = parse_numbers(region, dtype, int(counts.sum()), name)
+    if np.all(counts == width):
+        return numbers.reshape(-1, width)
+
+    record_starts = np.cumsum(counts) - counts
+    columns = np.arange(width)
+    present = columns < counts[:, np.newaxis]
+    values = numbers[np.where(present, record_starts[:, np.newaxis] + columns, 0)]
+    return np.where(present, values, 0).astype(dtype)
+
+# 将 OBJ 索引（从 1 开始，负数表示相对于当前已定义元素的倒数）转换为从 0 开始的绝对索引，缺省（0）为 -1
+def resolve_indices(indices, count_before):
+    if indices is None:
+        return np.full(len(count_before), -1, dtype=np.int64)
+    return np.where(indices > 0, indices - 1, np.where(indices < 0, count_before + indices, -1))
+
+# 解析面记录，返回 (每个面的顶点数, 每个角点的 v、vt、vn 索引，缺省的项为 None 或 0)
+def parse_faces(buf, byte_types):
+    region, num_records = record_region(buf, byte_types, LINE_F, b'f')
+    sizes = field_counts(region, num_records)
+    num_corners = int(sizes.sum())
+    slashes = region.count(b'/')
+    double_slashes = region.count(b'//')
+
+    # 所有角点使用相同的索引形式时，整块替换分隔符后一次解析
+    if slashes == 0:
+        return sizes, parse_numbers(region, np.int64, num_corners, 'f'), None, None
+    if slashes == 2 * num_corners and double_slashes == 0:  # v/vt/vn
+        corners = parse_numbers(region.replace(b'/', b' '), np.int64, 3 * num_corners, 'f').reshape(-1, 3)
+        return sizes, corners[:, 0], corners[:, 1], corners[:, 2]
+    if slashes == 2 * num_corners and double_slashes == num_corners:  # v//vn
+        corners = parse_numbers(region.replace(b'//', b' '), np.int64, 2 * num_corners, 'f').reshape(-1, 2)
+        return sizes, corners[:, 0], None, corners[:, 1]
+    if slashes == num_corners and double_slashes == 0:  # v/vt
+        corners = parse_numbers(region.replace(b'/', b' '), np.int64, 2 * num_corners, 'f').reshape(-1, 2)
+        return sizes, corners[:, 0], corners[:, 1], None
+
+    # 混合形式：逐个字段拆分
+    tokens = np.array(region.split())
+    vertex_part, _, rest = np.char.partition(tokens, b'/').T
+    texcoord_part, _, normal_part = np.char.partition(rest, b'/').T
+    parts = [np.where(part == b'', b'0', part).astype(np.int64) for part in (vertex_part, texcoord_part, normal_part)]
+    return sizes, parts[0], parts[1], parts[2]
+
+# 从 OBJ 文件中一次性读取全部数据：
+# 整个文件只读一次（二进制），按块批量解析 v/vt/vn/f 记录，面片以 CSR 形式的扁平数组返回，
+# 支持 v、v/vt、v//vn、v/vt/vn 四种面索引形式、负数（相对）索引和行内注释
+@profiled("parse")
+def read_obj(file_path, dtype=np.float64):
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    PROFILER.count("parsed_bytes", len(data))
+    if detect_encoding(data) is None:
+        raise ValueError(f"Unable to read the file {file_path} with any of the attempted encodings.")
+
+    vertices, texcoords, normals = [], [], []
+    face_sizes, corner_vertices, corner_texcoords, corner_normals = [], [], [], []
+    counts = np.zeros(4, dtype=np.int64)  # 已读取的 v、vt、vn 数量（下标与行类型编号一致）
+
+    position = 0
+    while position < len(data):
+        # 在换行处切分数据块
+        end = min(position + CHUNK_SIZE, len(data))
+        if end < len(data):
+            newline = data.rfind(b'\n', position, end)
+            end = newline + 1 if newline >= 0 else (data.find(b'\n', end) + 1 or len(data))
+        buf = strip_comments(np.frombuffer(data, dtype=np.uint8, count=end - position, offset=position))
+        position = end
+
+        line_types, line_lengths = classify_lines(buf)
+        byte_types = np.repeat(line_types, line_lengths)
+
+        # 每个面记录之前已经定义的 v、vt、vn 数量，用于解析负数索引
+        face_lines = line_types == LINE_F
+        before = {}
+        for line_type in (LINE_V, LINE_VT, LINE_VN):
+            is_type = line_types == line_type
+            before[line_type] = counts[line_type] + (np.cumsum(is_type) - is_type)[face_lines]
+            counts[line_type] += np.count_nonzero(is_type)
+
+        if np.any(line_types == LINE_V):
+            vertices.append(parse_records(buf, byte_types, LINE_V, b'v', 3, 3, dtype))
+        if np.any(line_types == LINE_VT):
+            texcoords.append(parse_records(buf, byte_types, LINE_VT, b'vt', 2, 1, dtype))
+        if np.any(line_types == LINE_VN):
+            normals.append(parse_records(buf, byte_types, LINE_VN, b'vn', 3, 3, dtype))
+
+        if np.any(face_lines):
+            sizes, vertex_part, texcoord_part, normal_part = parse_faces(buf, byte_types)
+            if np.any(vertex_part == 0):
+                raise ValueError("invalid vertex index 0 in face record")
+            face_sizes.append(sizes)
+            corner_vertices.append(resolve_indices(vertex_part, np.repeat(before[LINE_V], sizes)))
+            corner_texcoords.append(resolve_indices(texcoord_part, np.repeat(before[LINE_VT], sizes)))
+            corner_normals.append(resolve_indices(normal_part, np.repeat(before[LINE_VN], sizes)))
+
+    def concatenate(arrays, shape, array_dtype):
+        return np.concatenate(arrays) if arrays else np.zeros(shape, dtype=array_dtype)
+
+    face_sizes = concatenate(face_sizes, 0, np.int64)
+    face_offsets = np.zeros(len(face_sizes) + 1, dtype=np.int64)
+    np.cumsum(face_sizes, out=face_offsets[1:])
+    face_flat = concatenate(corner_vertices, 0, np.int64)
+    if np.any((face_flat < 0) | (face_flat >= counts[LINE_V])):
+        raise ValueError(f"Face vertex index out of range in {file_path}")
+    PROFILER.count("vertices", int(counts[LINE_V]))
+    PROFILER.count("faces", len(face_sizes))
+
+    return {
+        "vertices": concatenate(vertices, (0, 3), dtype),
+        "face_offsets": face_offsets,
+        "face_flat": face_flat,
+        "texcoords": concatenate(texcoords, (0, 2), dtype),
+        "obj_normals": concatenate(normals, (0, 3), dtype),
+        "corner_texcoords": concatenate(corner_texcoords, 0, np.int64),
+        "corner_normals": concatenate(corner_normals, 0, np.int64),
+    }
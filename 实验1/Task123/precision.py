@@ -0,0 +1,88 @@
+import argparse
+import os
+import sys
+import numpy as np
+
+# 精度策略：
+# 坐标和法向量统一使用 float32 或 float64（环境变量 MESH_PRECISION=float32 切换默认精度），读取、法线、两种细分和上传都保持该精度；
+# 三角形索引按顶点数自动选择 uint16、uint32 或 int64，上传时不必再转换；
+# 运行本模块会比较 float32 与 float64 两条路径的结果，给出顶点误差、法线夹角误差和内存占用
+FLOAT_DTYPES = (np.dtype(np.float32), np.dtype(np.float64))
+DEFAULT_FLOAT_DTYPE = np.dtype(os.environ.get("MESH_PRECISION", "float64"))
+if DEFAULT_FLOAT_DTYPE not in FLOAT_DTYPES:
+    raise ValueError(f"MESH_PRECISION must be float32 or float64, got {DEFAULT_FLOAT_DTYPE}")
+
+# 坐标精度：None 表示默认精度
+def float_dtype(dtype=None):
+    dtype = DEFAULT_FLOAT_DTYPE if dtype is None else np.dtype(dtype)
+    if dtype not in FLOAT_DTYPES:
+        raise ValueError(f"coordinates must be float32 or float64, got {dtype}")
+    return dtype
+
+# 三角形索引的类型：能表示全部顶点编号的最小无符号类型，超出 uint32 时为 int64
+def triangle_index_dtype(num_vertices):
+    if num_vertices <= 1 << 16:
+        return np.dtype(np.uint16)
+    if num_vertices <= 1 << 32:
+        return np.dtype(np.uint32)
+    return np.dtype(np.int64)
+
+# 有限值部分的包围盒对角线长度，作为误差的尺度
+def diagonal(vertices):
+    finite = vertices[np.isfinite(vertices).all(axis=1)]
+    return float(np.linalg.norm(finite.max(axis=0) - finite.min(axis=0))) if len(finite) else 1.0
+
+# 比较 float32 与 float64 两条路径：mesh64 为 float64 路径的网格，mesh32 为 float32 路径的网格，
+# 返回相对包围盒对角线的最大顶点误差、法线的最大夹角（度）和两者占用的字节数
+def compare_meshes(mesh64, mesh32):
+    vertices64 = np.asarray(mesh64.vertices, dtype=np.float64)
+    vertices32 = np.asarray(mesh32.vertices, dtype=np.float64)
+    finite = np.isfinite(vertices64).all(axis=1) & np.isfinite(vertices32).all(axis=1)
+    error = np.abs(vertices32[finite] - vertices64[finite]).max() if finite.any() else 0.0
+
+    normals64 = np.asarray(mesh64.normals, dtype=np.float64)[finite]
+    normals32 = np.asarray(mesh32.normals, dtype=np.float64)[finite]
+    lengths = np.linalg.norm(normals64, axis=1) * np.linalg.norm(normals32, axis=1)
+    valid = lengths > 0
+    cosines = np.einsum('ij,ij->i', normals64[valid], normals32[valid]) / lengths[valid]
+    angle = np.degrees(np.arccos(np.clip(cosines, -1, 1))).max() if valid.any() else 0.0
+    return {"relative_error": float(error) / diagonal(vertices64), "normal_degrees": float(angle),
+            "bytes64": mesh64.nbytes, "bytes32": mesh32.nbytes}
+
+# 对一个模型分别以 float64 和 float32 读取并细分 levels 级，逐级比较
+def check_accuracy(location, scheme, levels):
+    from procedural import load_mesh  # procedural 依赖 custom_mesh，custom_mesh 又依赖本模块，在这里导入以免循环导入
+    mesh64, mesh32 = load_mesh(location, np.float64), load_mesh(location, np.float32)
+    reports = []
+    for level in range(levels + 1):
+        if level > 0:
+            mesh64, mesh32 = mesh64.subdivide(scheme), mesh32.subdivide(scheme)
+        if np.asarray(mesh32.vertices).dtype != np.float32 or np.asarray(mesh32.normals).dtype != np.float32:
+            raise AssertionError(f"{location} level {level}: float32 path was upcast")
+        reports.append({"level": level, **compare_meshes(mesh64, mesh32)})
+    return reports
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the float32 mesh pipeline against float64.")
+    parser.add_argument("inputs", nargs="*", help="OBJ files or procedural:// locations (default: Object/*.obj)")
+    parser.add_argument("--levels", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=1e-5, help="allowed vertex error relative to the bounding box")
+    parser.add_argument("--normal-tolerance", type=float, default=0.5, help="allowed normal deviation in degrees")
+    args = parser.parse_args()
+
+    inputs = args.inputs or sorted(os.path.join("Object", name) for name in os.listdir("Object") if name.endswith(".obj"))
+    failures = 0
+    print(f"{'mesh':40} {'scheme':14} {'lv':>2} {'rel error':>10} {'normal deg':>10} {'MB f64':>8} {'MB f32':>8}")
+    for location in inputs:
+        for scheme in ("Loop", "Catmull-Clark"):
+            for report in check_accuracy(location, scheme, args.levels):
+                ok = report["relative_error"] <= args.tolerance and report["normal_degrees"] <= args.normal_tolerance
+                failures += not ok
+                print(f"{os.path.basename(location)[:40]:40} {scheme:14} {report['level']:>2} {report['relative_error']:10.2e} "
+                      f"{report['normal_degrees']:10.4f} {report['bytes64'] / 2**20:8.2f} {report['bytes32'] / 2**20:8.2f}"
+                      + ("" if ok else "  EXCEEDS TOLERANCE"))
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
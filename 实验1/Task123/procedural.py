@@ -0,0 +1,109 @@
+import urllib.parse
+import numpy as np
+from custom_mesh import CustomMesh
+from half_edge import index_dtype
+from precision import float_dtype
+
+# 参数曲面生成器：在内存中直接生成 obj-generator.c 中的曲面 z = f(x, y) 以及 Object/马鞍.obj 的马鞍面，不经过 OBJ 文件；
+# 顶点由 meshgrid 整体求值，面片由格子编号整体生成，分辨率任意；
+# sqrt 类曲面（球面、椭球面）在定义域外没有实数值，mask 模式丢弃定义域外的顶点和引用它们的面，clip 模式把根号内的负值截为 0
+PROCEDURAL_SCHEME = "procedural"
+EXTENT = 10.0  # 定义域为 [-EXTENT, EXTENT]^2，与 obj-generator.c 一致
+SURFACE_EXTENTS = {"saddle": 1.0}  # 定义域不同的曲面，马鞍面与 Object/马鞍.obj 一致
+DEFAULT_RESOLUTION = 128  # 每边的顶点数
+
+# 曲面：名称 -> (根号内的表达式或 None, z 的表达式)；有根号的曲面 z = sqrt(radicand)
+SURFACES = {
+    "square": (None, lambda x, y: np.ones_like(x)),
+    "cone": (None, lambda x, y: np.sqrt(x ** 2 + y ** 2)),
+    "sphere": (lambda x, y: 10 ** 2 - x ** 2 - y ** 2, np.sqrt),
+    "ellipsoid": (lambda x, y: (1 - x ** 2 / 6 ** 2 - y ** 2 / 8 ** 2) * 10 ** 2, np.sqrt),
+    "paraboloid": (None, lambda x, y: x ** 2 / 4 ** 2 + y ** 2 / 3 ** 2),
+    "hyperbolic_paraboloid": (None, lambda x, y: x ** 2 / 4 ** 2 - y ** 2 / 3 ** 2),
+    "saddle": (None, lambda x, y: x ** 2 - y ** 2),
+}
+DOMAIN_MODES = ("mask", "clip")
+
+# 在 resolution × resolution 的网格点上求曲面的 z 值，返回 (x, y, z, 有效点的标记)；extent 为 None 时取该曲面的定义域
+def evaluate_surface(surface, resolution, extent=None, domain="mask", dtype=None):
+    if surface not in SURFACES:
+        raise ValueError(f"unknown surface {surface!r}, expected one of {', '.join(SURFACES)}")
+    if domain not in DOMAIN_MODES:
+        raise ValueError(f"domain must be one of {DOMAIN_MODES}, got {domain!r}")
+    if extent is None:
+        extent = SURFACE_EXTENTS.get(surface, EXTENT)
+    coordinates = np.linspace(-extent, extent, resolution, dtype=float_dtype(dtype))
+    x, y = np.meshgrid(coordinates, coordinates)
+    radicand, function = SURFACES[surface]
+    if radicand is None:
+        z = function(x, y)
+        return x, y, z, np.isfinite(z)
+    values = radicand(x, y)
+    valid = values >= 0
+    if domain == "clip":
+        np.maximum(values, 0, out=values)
+        valid[:] = True
+    else:
+        values[~valid] = 0
+    return x, y, function(values), valid
+
+# 网格的面片：每个格子为一个四边形 (c, c+1, c+n+1, c+n)，triangles 为 True 时按 obj-generator.c 的方式拆成两个三角形
+def grid_faces(resolution, triangles=True):
+    corner = (np.arange(resolution - 1)[:, np.newaxis] * resolution + np.arange(resolution - 1)).ravel()
+    if triangles:
+        return np.stack([
+            np.stack([corner, corner + 1, corner + resolution], axis=1),
+            np.stack([corner + 1, corner + resolution + 1, corner + resolution], axis=1),
+        ], axis=1).reshape(-1, 3)
+    return np.stack([corner, corner + 1, corner + resolution + 1, corner + resolution], axis=1)
+
+# 生成参数曲面网格：resolution 为每边的顶点数，faces 为 "tri" 或 "quad"；
+# mask 模式下丢弃含定义域外顶点的面以及不再被引用的顶点，顶点索引整体重新编号
+def generate_surface(surface, resolution=DEFAULT_RESOLUTION, extent=None, domain="mask", faces="tri", dtype=None):
+    if resolution < 2:
+        raise ValueError(f"resolution must be at least 2, got {resolution}")
+    if faces not in ("tri", "quad"):
+        raise ValueError(f"faces must be 'tri' or 'quad', got {faces!r}")
+    x, y, z, valid = evaluate_surface(surface, resolution, extent, domain, dtype)
+    vertices = np.stack([x.ravel(), y.ravel(), z.ravel()], axis=1)
+    polygons = grid_faces(resolution, faces == "tri")
+
+    if not valid.all():
+        polygons = polygons[valid.ravel()[polygons].all(axis=1)]
+        used = np.zeros(len(vertices), dtype=bool)
+        used[polygons] = True
+        remap = np.cumsum(used) - 1
+        vertices = vertices[used]
+        polygons = remap[polygons]
+
+    polygons = polygons.astype(index_dtype(len(vertices)), copy=False)
+    mesh = CustomMesh()
+    mesh.vertices = vertices
+    mesh.set_face_arrays(np.arange(0, polygons.size + 1, polygons.shape[1], dtype=np.int64), polygons.ravel())
+    mesh.calculate_normals()
+    return mesh
+
+def is_procedural(location):
+    return location.startswith(PROCEDURAL_SCHEME + "://")
+
+# 解析 "procedural://sphere?res=2048&domain=clip&faces=quad&extent=10" 形式的地址，返回 generate_surface 的参数
+def parse_location(location):
+    parts = urllib.parse.urlsplit(location)
+    if parts.scheme != PROCEDURAL_SCHEME:
+        raise ValueError(f"not a procedural location: {location!r}")
+    query = dict(urllib.parse.parse_qsl(parts.query))
+    options = {"surface": parts.netloc or parts.path.strip("/")}
+    if "res" in query:
+        options["resolution"] = int(query.pop("res"))
+    if "extent" in query:
+        options["extent"] = float(query.pop("extent"))
+    options.update({key: query.pop(key) for key in ("domain", "faces") if key in query})
+    if query:
+        raise ValueError(f"unknown procedural parameters: {', '.join(query)}")
+    return options
+
+# 读取网格：procedural:// 地址在内存中生成，其余按 OBJ 文件读取；dtype 为 None 时按默认精度
+def load_mesh(location, dtype=None):
+    if is_procedural(location):
+        return generate_surface(**parse_location(location), dtype=dtype)
+    return CustomMesh.from_obj(location, dtype)
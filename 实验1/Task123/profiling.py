@@ -0,0 +1,247 @@
+import cProfile
+import functools
+import json
+import pstats
+import threading
+import time
+from collections import defaultdict
+
+# 性能分析钩子：
+# 代码中用 PROFILER.span(name) 包住一个阶段（或用 profiled(name) 装饰整个函数），用 PROFILER.sections() 依次划分一个函数中的各步，
+# 用 PROFILER.count(name, value) 累加计数（元素个数、分配的字节数等）；阶段按调用关系嵌套，路径形如 "subdivide/loop_operator/edge_points"；
+# 事件交给已注册的接收器（内存汇总、JSON Lines 文件、cProfile），没有接收器时所有钩子直接返回，几乎没有开销；
+# 各线程分别记录自己的阶段栈，细分线程与界面线程可以同时使用
+
+# 关闭时返回的空阶段
+class NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def start(self, name):
+        pass
+
+    def stop(self):
+        pass
+
+NULL_SPAN = NullSpan()
+
+# 一个计时阶段：进入时压入当前线程的阶段栈，退出时弹出并把耗时交给各接收器
+class Span:
+    def __init__(self, profiler, name, fields):
+        self.profiler = profiler
+        self.name = name
+        self.fields = fields
+        self.path = None
+        self.depth = 0
+        self.start_time = 0.0
+
+    def __enter__(self):
+        stack = self.profiler.stack()
+        self.depth = len(stack)
+        self.path = f"{stack[-1].path}/{self.name}" if stack else self.name
+        stack.append(self)
+        self.start_time = time.perf_counter()
+        self.profiler.emit('start', {"type": "span", "name": self.name, "path": self.path})
+        return self
+
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self.start_time
+        del self.profiler.stack()[self.depth:]  # 同时结束未关闭的子阶段（异常时可能留下）
+        event = {"type": "span", "name": self.name, "path": self.path, "seconds": seconds,
+                 "thread": threading.get_ident(), **self.fields}
+        self.profiler.emit('record', event)
+        return False
+
+# 依次划分的若干步：start(name) 结束上一步并开始下一步，stop() 结束最后一步，
+# 各步是当前阶段的子阶段，适合把一个较长的函数按步骤计时，而不必把每一步的代码都缩进到 with 语句中
+class Sections:
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.current = None
+
+    def start(self, name):
+        self.stop()
+        self.current = Span(self.profiler, name, {})
+        self.current.__enter__()
+
+    def stop(self):
+        if self.current is not None:
+            self.current.__exit__(None, None, None)
+            self.current = None
+
+class Profiler:
+    def __init__(self):
+        self.sinks = []
+        self.enabled = False
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    def add_sink(self, sink):
+        with self.lock:
+            self.sinks = self.sinks + [sink]
+            self.enabled = True
+
+    def remove_sink(self, sink):
+        with self.lock:
+            self.sinks = [s for s in self.sinks if s is not sink]
+            self.enabled = bool(self.sinks)
+
+    # 当前线程的阶段栈
+    def stack(self):
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+
+    def span(self, name, **fields):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, fields)
+
+    def sections(self):
+        if not self.enabled:
+            return NULL_SPAN
+        return Sections(self)
+
+    def count(self, name, value=1):
+        if not self.enabled:
+            return
+        stack = self.stack()
+        self.emit('record', {"type": "count", "name": name, "value": value,
+                             "path": stack[-1].path if stack else "", "thread": threading.get_ident()})
+
+    def emit(self, method, event):
+        for sink in self.sinks:
+            getattr(sink, method)(event)
+
+PROFILER = Profiler()
+
+# 把整个函数作为一个阶段计时的装饰器
+def profiled(name):
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return function(*args, **kwargs)
+            with Span(PROFILER, name, {}):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# 接收器的基类：start 在阶段开始时调用，record 在阶段结束或计数时调用
+class Sink:
+    def start(self, event):
+        pass
+
+    def record(self, event):
+        pass
+
+    def close(self):
+        pass
+
+# 内存汇总：按阶段路径统计调用次数、总耗时、最短和最长耗时，计数按名称累加；thread 不为 None 时只记录该线程的事件
+class MemorySink(Sink):
+    def __init__(self, thread=None):
+        self.thread = thread
+        self.spans = defaultdict(lambda: {"calls": 0, "seconds": 0.0, "min": float('inf'), "max": 0.0})
+        self.counters = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def record(self, event):
+        if self.thread is not None and event["thread"] != self.thread:
+            return
+        with self.lock:
+            if event["type"] == "count":
+                self.counters[event["name"]] += event["value"]
+                return
+            entry = self.spans[event["path"]]
+            entry["calls"] += 1
+            entry["seconds"] += event["seconds"]
+            entry["min"] = min(entry["min"], event["seconds"])
+            entry["max"] = max(entry["max"], event["seconds"])
+
+    # 按总耗时从大到小排列的 (路径, 统计) 列表
+    def top(self, limit=None):
+        with self.lock:
+            items = sorted(self.spans.items(), key=lambda item: item[1]["seconds"], reverse=True)
+        return items[:limit]
+
+    def summary(self):
+        with self.lock:
+            return {"spans": {path: dict(entry) for path, entry in self.spans.items()}, "counters": dict(self.counters)}
+
+    def reset(self):
+        with self.lock:
+            self.spans.clear()
+            self.counters.clear()
+
+# 每个事件写成 JSON 文件中的一行，file 为路径或已打开的文本文件
+class JsonLinesSink(Sink):
+    def __init__(self, file):
+        self.owns_file = isinstance(file, str)
+        self.file = open(file, 'a', encoding='utf-8') if self.owns_file else file
+        self.lock = threading.Lock()
+
+    def record(self, event):
+        line = json.dumps({"time": time.time(), **event}, ensure_ascii=False, default=str)
+        with self.lock:
+            self.file.write(line + "\n")
+            self.file.flush()
+
+    def close(self):
+        with self.lock:
+            if self.owns_file:
+                self.file.close()
+            else:
+                self.file.flush()
+
+# 在指定名称的阶段（names 为 None 时为每个线程的最外层阶段）期间开启 cProfile，得到函数级的耗时；
+# cProfile 只统计调用 enable 的线程，每个线程各用一个 cProfile.Profile
+class CProfileSink(Sink):
+    def __init__(self, names=None):
+        self.names = set(names) if names is not None else None
+        self.profiles = {}
+        self.active = {}  # 线程 -> 开启 cProfile 的阶段路径
+        self.lock = threading.Lock()
+
+    def matches(self, event):
+        if self.names is None:
+            return "/" not in event["path"]
+        return event["name"] in self.names
+
+    def start(self, event):
+        thread = threading.get_ident()
+        if thread in self.active or not self.matches(event):
+            return
+        with self.lock:
+            profile = self.profiles.setdefault(thread, cProfile.Profile())
+        try:
+            profile.enable()
+        except ValueError:
+            return  # 其他分析工具（或其他线程的 cProfile，Python 3.12 起）正在运行
+        self.active[thread] = event["path"]
+
+    def record(self, event):
+        thread = event["thread"]
+        if event["type"] == "span" and self.active.get(thread) == event["path"]:
+            self.profiles[thread].disable()
+            del self.active[thread]
+
+    # 合并各线程的统计结果，没有数据时返回 None
+    def stats(self):
+        with self.lock:
+            profiles = [profile for profile in self.profiles.values() if profile.getstats()]
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    def dump(self, file_path):
+        stats = self.stats()
+        if stats is not None:
+            stats.dump_stats(file_path)
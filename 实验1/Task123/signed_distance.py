@@ -0,0 +1,424 @@
+import argparse
+import os
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from custom_mesh import CustomMesh
+from half_edge import index_dtype, unique_flags
+
+# 三角网格的有符号距离查询（任务 5，DeepSDF 训练数据）：
+# 三角形按重心逐层做中位数划分，组成完全二叉树形式的 BVH（层次包围盒），所有节点的包围盒保存在扁平数组中，整层批量构建；
+# 查询时一批点同时逐层遍历 BVH（每层用包围盒的最近、最远距离剪枝），叶子层批量计算点到三角形的距离；
+# 内外由射线奇偶性判断：沿三个固定方向各发一条射线，统计与网格的交点个数，多数为奇数时在内部；
+# 有符号距离内部为负、外部为正（与 DeepSDF 一致），只对封闭网格有意义
+LEAF_SIZE = 8  # 每个叶子最多包含的三角形数
+CHUNK_SIZE = 8192  # 每批查询的点数，多进程时也是分给每个进程的任务大小
+PAIR_BATCH = 1 << 18  # 叶子层每次计算的（点, 三角形）对数，限制临时数组的内存
+# 判断内外用的射线方向，取分量均不为零的无理方向，避免射线恰好经过网格的边或顶点
+RAY_DIRECTIONS = np.array([
+    [0.5773502691896258, 0.5773502691896257, 0.5773502691896259],
+    [-0.4472135954999579, 0.7745966692414834, 0.4472135954999579],
+    [0.2672612419124244, -0.5345224838248488, 0.8017837257372732],
+]) + np.array([1e-3, -2e-3, 3e-3])
+RAY_DIRECTIONS /= np.linalg.norm(RAY_DIRECTIONS, axis=1, keepdims=True)
+
+# 批量计算点 p 到三角形 (a, b, c) 的最近点，所有参数均为 (N, 3)，返回最近点 (N, 3)
+# 按 Voronoi 区域分情况（Ericson, Real-Time Collision Detection 5.1.5），用向量化的条件选择代替分支
+def closest_points_on_triangles(p, a, b, c):
+    ab, ac = b - a, c - a
+    d1, d2 = np.einsum('ij,ij->i', ab, p - a), np.einsum('ij,ij->i', ac, p - a)
+    d3, d4 = np.einsum('ij,ij->i', ab, p - b), np.einsum('ij,ij->i', ac, p - b)
+    d5, d6 = np.einsum('ij,ij->i', ab, p - c), np.einsum('ij,ij->i', ac, p - c)
+    va, vb, vc = d3 * d6 - d5 * d4, d5 * d2 - d1 * d6, d1 * d4 - d3 * d2
+
+    # 最近点为 a + v·ab + w·ac，先按面内计算，再依优先级从低到高用边、顶点区域覆盖
+    with np.errstate(divide='ignore', invalid='ignore'):
+        denom = va + vb + vc
+        v, w = vb / denom, vc / denom
+        region = (va <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0)  # 边 bc
+        t = (d4 - d3) / ((d4 - d3) + (d5 - d6))
+        v, w = np.where(region, 1 - t, v), np.where(region, t, w)
+        region = (vb <= 0) & (d2 >= 0) & (d6 <= 0)  # 边 ac
+        v, w = np.where(region, 0, v), np.where(region, d2 / (d2 - d6), w)
+        region = (d6 >= 0) & (d5 <= d6)  # 顶点 c
+        v, w = np.where(region, 0, v), np.where(region, 1, w)
+        region = (vc <= 0) & (d1 >= 0) & (d3 <= 0)  # 边 ab
+        v, w = np.where(region, d1 / (d1 - d3), v), np.where(region, 0, w)
+        region = (d3 >= 0) & (d4 <= d3)  # 顶点 b
+        v, w = np.where(region, 1, v), np.where(region, 0, w)
+        region = (d1 <= 0) & (d2 <= 0)  # 顶点 a
+        v, w = np.where(region, 0, v), np.where(region, 0, w)
+    return a + v[:, np.newaxis] * ab + w[:, np.newaxis] * ac
+
+# 三角形的 BVH：自顶向下按中位数划分，叶子数补齐为 2 的幂，节点按堆的顺序编号（根为 1，节点 i 的子节点为 2i 和 2i+1），
+# 叶子 k 为节点 2^depth + k，包含 leaf_triangles[k] 中的三角形（-1 为空位）；空节点的包围盒为 (inf, -inf)
+class TriangleBVH:
+    def __init__(self, vertices, triangles, leaf_size=LEAF_SIZE):
+        vertices = np.asarray(vertices, dtype=np.float64)
+        triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+        corners = vertices[triangles]
+        # 面积为零的三角形不影响距离（它的边被相邻三角形覆盖）和内外判断，直接去掉
+        areas = np.linalg.norm(np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]), axis=1)
+        keep = np.isfinite(corners).all(axis=(1, 2)) & (areas > 0)
+        if not keep.any():
+            raise ValueError("mesh has no non-degenerate triangles")
+        triangle_ids = np.flatnonzero(keep)
+        corners = corners[keep]
+        num_triangles = len(triangle_ids)
+        self.depth = int(np.ceil(np.log2(max(1, -(-num_triangles // leaf_size)))))
+        num_leaves = 1 << self.depth
+
+        # 自顶向下逐层划分：第 l 层的节点 k 包含排序后第 floor(k·T/2^l) 到 floor((k+1)·T/2^l) 个三角形，
+        # 每层把所有节点的三角形一起按节点内重心分布最长的坐标轴排序，前一半、后一半即为两个子节点
+        centroids = corners.mean(axis=1)
+        for level in range(self.depth):
+            bounds = np.arange(1 << level) * num_triangles >> level
+            node = np.repeat(np.arange(1 << level), np.diff(np.append(bounds, num_triangles)))
+            extent = np.maximum.reduceat(centroids, bounds) - np.minimum.reduceat(centroids, bounds)
+            keys = centroids[np.arange(num_triangles), np.argmax(extent, axis=1)[node]]
+            order = np.lexsort((keys, node))
+            triangle_ids, corners, centroids = triangle_ids[order], corners[order], centroids[order]
+        self.triangle_ids = triangle_ids  # 排序后的第 i 个三角形在原三角形数组中的序号
+        self.corners = corners
+
+        # 叶子 k 包含的三角形，不足 leaf_size 个时用 -1 补齐
+        leaf_start = np.arange(num_leaves + 1) * num_triangles >> self.depth
+        self.leaf_size = int(np.diff(leaf_start).max())
+        slots = leaf_start[:-1, np.newaxis] + np.arange(self.leaf_size)
+        self.leaf_triangles = np.where(slots < leaf_start[1:, np.newaxis], slots, -1).astype(index_dtype(num_triangles))
+
+        # 自底向上逐层合并包围盒
+        self.lower = np.full((2 * num_leaves, 3), np.inf)
+        self.upper = np.full((2 * num_leaves, 3), -np.inf)
+        leaf_sizes = np.diff(leaf_start)
+        first = np.minimum(leaf_start[:-1, np.newaxis], num_triangles - 1)
+        padded = self.corners[np.where(slots < leaf_start[1:, np.newaxis], slots, first)].reshape(num_leaves, -1, 3)
+        self.lower[num_leaves:][leaf_sizes > 0] = padded.min(axis=1)[leaf_sizes > 0]
+        self.upper[num_leaves:][leaf_sizes > 0] = padded.max(axis=1)[leaf_sizes > 0]
+        for level in range(self.depth - 1, -1, -1):
+            start, end = 1 << level, 2 << level
+            self.lower[start:end] = np.minimum(self.lower[2 * start:2 * end:2], self.lower[2 * start + 1:2 * end:2])
+            self.upper[start:end] = np.maximum(self.upper[2 * start:2 * end:2], self.upper[2 * start + 1:2 * end:2])
+        self.non_empty = self.lower[:, 0] <= self.upper[:, 0]
+
+    @property
+    def num_leaves(self):
+        return len(self.leaf_triangles)
+
+    @property
+    def nbytes(self):
+        arrays = (self.triangle_ids, self.corners, self.leaf_triangles, self.lower, self.upper, self.non_empty)
+        return sum(array.nbytes for array in arrays)
+
+    # 点到节点包围盒的最近距离平方（下界）和最远距离平方（包围盒非空时，到盒内最近三角形的距离不超过它）
+    def box_distances(self, points, nodes):
+        lower, upper = self.lower[nodes], self.upper[nodes]
+        nearest = np.maximum(np.maximum(lower - points, points - upper), 0)
+        farthest = np.maximum(np.abs(points - lower), np.abs(points - upper))
+        return np.einsum('ij,ij->i', nearest, nearest), np.einsum('ij,ij->i', farthest, farthest)
+
+    # 展开（点, 叶子）对为（点, 三角形）对，去掉空位
+    def leaf_pairs(self, pair_point, pair_leaf):
+        triangles = self.leaf_triangles[pair_leaf].ravel()
+        points = np.repeat(pair_point, self.leaf_size)
+        valid = triangles >= 0
+        return points[valid], triangles[valid].astype(np.int64)
+
+    # 用（点, 三角形）对的距离更新每个点的最近距离平方、最近三角形和最近点
+    def update_nearest(self, points, pair_point, pair_triangle, best, best_triangle, best_point):
+        for start in range(0, len(pair_point), PAIR_BATCH):
+            p, t = pair_point[start:start + PAIR_BATCH], pair_triangle[start:start + PAIR_BATCH]
+            corners = self.corners[t]
+            nearest = closest_points_on_triangles(points[p], corners[:, 0], corners[:, 1], corners[:, 2])
+            offset = nearest - points[p]
+            distances = np.einsum('ij,ij->i', offset, offset)
+            np.minimum.at(best, p, distances)
+            hit = distances == best[p]
+            best_triangle[p[hit]] = t[hit]
+            best_point[p[hit]] = nearest[hit]
+
+    # 批量求点到网格的最近距离，返回 (距离, 最近三角形在原三角形数组中的序号, 最近点)
+    def nearest(self, points):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        num_points = len(points)
+        all_points = np.arange(num_points)
+        best = np.full(num_points, np.inf)
+        best_triangle = np.zeros(num_points, dtype=np.int64)
+        best_point = np.zeros((num_points, 3))
+
+        # 先沿包围盒更近的子节点下降到一个叶子，用其中三角形的距离作为剪枝的初始上界
+        node = np.ones(num_points, dtype=np.int64)
+        for _ in range(self.depth):
+            left, right = 2 * node, 2 * node + 1
+            go_right = ~self.non_empty[left] | (self.non_empty[right] & (self.box_distances(points, right)[0] < self.box_distances(points, left)[0]))
+            node = np.where(go_right, right, left)
+        greedy_leaf = node - self.num_leaves
+        self.update_nearest(points, *self.leaf_pairs(all_points, greedy_leaf), best, best_triangle, best_point)
+
+        # 逐层遍历：包围盒最近距离超过上界的节点被剪掉，上界同时用已访问包围盒最远距离的最小值收紧
+        bound = best.copy()
+        pair_point, pair_node = all_points, np.ones(num_points, dtype=np.int64)
+        lower_bound = np.zeros(num_points)
+        for _ in range(self.depth):
+            pair_point = np.repeat(pair_point, 2)
+            pair_node = (2 * pair_node[:, np.newaxis] + np.array([0, 1])).ravel()
+            keep = self.non_empty[pair_node]
+            pair_point, pair_node = pair_point[keep], pair_node[keep]
+            lower_bound, upper_bound = self.box_distances(points[pair_point], pair_node)
+            np.minimum.at(bound, pair_point, upper_bound)
+            keep = lower_bound <= bound[pair_point]
+            pair_point, pair_node, lower_bound = pair_point[keep], pair_node[keep], lower_bound[keep]
+
+        # 叶子层按包围盒最近距离从小到大分轮计算：第 r 轮计算每个点排名在 [2^r - 1, 2^(r+1) - 1) 的叶子，
+        # 每轮之后用已求得的最近距离剪掉更远的叶子，轮数与剩余的叶子数都很快减少
+        keep = pair_node - self.num_leaves != greedy_leaf[pair_point]
+        pair_point, pair_node, lower_bound = pair_point[keep], pair_node[keep], lower_bound[keep]
+        order = np.lexsort((lower_bound, pair_point))
+        pair_point, pair_leaf, lower_bound = pair_point[order], pair_node[order] - self.num_leaves, lower_bound[order]
+        group_start = np.flatnonzero(unique_flags(pair_point))
+        rank = np.arange(len(pair_point)) - np.repeat(group_start, np.diff(np.append(group_start, len(pair_point))))
+        first = 0
+        while True:
+            remaining = (rank >= first) & (lower_bound <= best[pair_point])
+            if not remaining.any():
+                break
+            pair_point, pair_leaf, lower_bound, rank = pair_point[remaining], pair_leaf[remaining], lower_bound[remaining], rank[remaining]
+            current = rank <= 2 * first
+            self.update_nearest(points, *self.leaf_pairs(pair_point[current], pair_leaf[current]), best, best_triangle, best_point)
+            first = 2 * first + 1
+        return np.sqrt(best), self.triangle_ids[best_triangle], best_point
+
+    # 统计从各点出发沿 direction 的射线与网格的交点个数（Möller–Trumbore 求交）
+    def ray_crossings(self, points, direction):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        inverse = 1 / direction
+        # 射线进入、离开包围盒时穿过的面，方向固定，每个坐标轴取哪一侧的面是确定的；空节点的进入时间为 inf，不会相交
+        near = (np.where(direction > 0, self.lower, self.upper) * inverse).T.copy()
+        far = (np.where(direction > 0, self.upper, self.lower) * inverse).T.copy()
+        start = (points * inverse).T.copy()
+        pair_point, pair_node = np.arange(len(points)), np.ones(len(points), dtype=np.int64)
+        for level in range(self.depth + 1):
+            # 射线与包围盒的相交测试（slab 方法），逐坐标轴计算，只保留相交的节点
+            t_enter = np.zeros(len(pair_point))
+            t_exit = np.full(len(pair_point), np.inf)
+            for axis in range(3):
+                origin = start[axis][pair_point]
+                np.maximum(t_enter, near[axis][pair_node] - origin, out=t_enter)
+                np.minimum(t_exit, far[axis][pair_node] - origin, out=t_exit)
+            keep = t_exit >= t_enter
+            pair_point, pair_node = pair_point[keep], pair_node[keep]
+            if level < self.depth:
+                pair_point = np.repeat(pair_point, 2)
+                pair_node = (2 * pair_node[:, np.newaxis] + np.array([0, 1])).ravel()
+
+        pair_point, pair_triangle = self.leaf_pairs(pair_point, pair_node - self.num_leaves)
+        crossings = np.zeros(len(points), dtype=np.int64)
+        for start in range(0, len(pair_point), PAIR_BATCH):
+            p, t = pair_point[start:start + PAIR_BATCH], pair_triangle[start:start + PAIR_BATCH]
+            corners = self.corners[t]
+            edge1, edge2 = corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]
+            h = np.cross(direction, edge2)
+            a = np.einsum('ij,ij->i', edge1, h)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                f = 1 / a
+                s = points[p] - corners[:, 0]
+                u = f * np.einsum('ij,ij->i', s, h)
+                q = np.cross(s, edge1)
+                v = f * (q @ direction)
+                distance = f * np.einsum('ij,ij->i', edge2, q)
+                hit = (a != 0) & (u >= 0) & (v >= 0) & (u + v <= 1) & (distance > 0)
+            crossings += np.bincount(p[hit], minlength=len(points))
+        return crossings
+
+    # 判断点是否在网格内部：三条射线中多数与网格相交奇数次
+    def contains(self, points):
+        votes = sum(self.ray_crossings(points, direction) % 2 for direction in RAY_DIRECTIONS)
+        return votes >= 2
+
+# 进程池中每个工作进程持有的 BVH，由 init_worker 在进程启动时设置一次，各批查询共用
+worker_bvh = None
+
+def init_worker(bvh):
+    global worker_bvh
+    worker_bvh = bvh
+
+def query_chunk(points):
+    return signed_distances(worker_bvh, points)
+
+# 一批点的有符号距离：内部为负，外部为正
+def signed_distances(bvh, points):
+    distances = bvh.nearest(points)[0]
+    return np.where(bvh.contains(points), -distances, distances)
+
+# 有符号距离查询服务：点被分成 chunk_size 大小的批，executor 为 process_pool() 创建的进程池时由多个进程并行计算
+class SignedDistanceField:
+    def __init__(self, vertices, triangles, leaf_size=LEAF_SIZE):
+        self.bvh = TriangleBVH(vertices, triangles, leaf_size)
+
+    # 由网格拆分后的三角形（CustomMesh.indices）构建
+    @classmethod
+    def from_mesh(cls, mesh, leaf_size=LEAF_SIZE):
+        return cls(mesh.vertices, np.asarray(mesh.indices).reshape(-1, 3), leaf_size)
+
+    # 创建进程池，每个进程在启动时收到一份 BVH；workers 为 None 时使用全部 CPU
+    def process_pool(self, workers=None):
+        return ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(self.bvh,))
+
+    # 点到网格的距离（无符号）、最近三角形序号和最近点
+    def nearest(self, points):
+        return self.bvh.nearest(points)
+
+    def contains(self, points):
+        return self.bvh.contains(points)
+
+    def signed_distance(self, points, chunk_size=CHUNK_SIZE, executor=None):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        chunks = [points[start:start + chunk_size] for start in range(0, len(points), chunk_size)]
+        if executor is None:
+            results = [signed_distances(self.bvh, chunk) for chunk in chunks]
+        else:
+            results = list(executor.map(query_chunk, chunks))
+        return np.concatenate(results) if results else np.zeros(0)
+
+    # 按顺序计算一串点批次的有符号距离，逐批返回 (点, 距离)；使用进程池时同时提交的批次不超过 max_in_flight，
+    # 点批次由生成器按需产生，内存占用与总点数无关
+    def stream(self, chunks, executor=None, max_in_flight=None):
+        if executor is None:
+            for points in chunks:
+                yield points, signed_distances(self.bvh, points)
+            return
+        max_in_flight = max_in_flight or 2 * (os.cpu_count() or 1)
+        pending = deque()
+        for points in chunks:
+            pending.append((points, executor.submit(query_chunk, points)))
+            if len(pending) >= max_in_flight:
+                points, future = pending.popleft()
+                yield points, future.result()
+        while pending:
+            points, future = pending.popleft()
+            yield points, future.result()
+
+# 流式写入 .npz 文件：每个数组以 .npy 格式写入 zip 中的一项，形状预先给定，数据分块追加，
+# 不需要把整个数组放在内存中；np.load 可以直接读取
+class NpzStreamWriter:
+    def __init__(self, file_path, compress=True):
+        self.archive = zipfile.ZipFile(file_path, 'w', zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED, allowZip64=True)
+
+    # 一次写入整个数组
+    def write(self, name, array):
+        with self.archive.open(name + ".npy", 'w', force_zip64=True) as f:
+            np.lib.format.write_array(f, np.asanyarray(array))
+
+    # 逐块写入形状为 shape 的数组，chunks 中的各块沿第一维拼接后应正好是 shape
+    def write_chunks(self, name, shape, dtype, chunks):
+        dtype = np.dtype(dtype)
+        header = {'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False, 'shape': tuple(shape)}
+        written = 0
+        with self.archive.open(name + ".npy", 'w', force_zip64=True) as f:
+            np.lib.format.write_array_header_2_0(f, header)
+            for chunk in chunks:
+                chunk = np.ascontiguousarray(chunk, dtype=dtype)
+                f.write(chunk.tobytes())
+                written += len(chunk)
+        if written != shape[0]:
+            raise ValueError(f"expected {shape[0]} rows for {name}, got {written}")
+
+    def close(self):
+        self.archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+# 按面积加权在三角形上均匀采样 count 个表面点，corners 为 (T, 3, 3) 的三角形顶点，cumulative_areas 为面积的前缀和
+def sample_surface(corners, cumulative_areas, count, rng):
+    chosen = np.searchsorted(cumulative_areas, rng.random(count) * cumulative_areas[-1], side='right')
+    chosen = np.minimum(chosen, len(corners) - 1)
+    u, v = rng.random(count), rng.random(count)
+    flip = u + v > 1
+    u[flip], v[flip] = 1 - u[flip], 1 - v[flip]
+    a, b, c = corners[chosen, 0], corners[chosen, 1], corners[chosen, 2]
+    return a + u[:, np.newaxis] * (b - a) + v[:, np.newaxis] * (c - a)
+
+# 生成 DeepSDF 形式的训练样本并流式写入 .npz：
+# 网格先平移缩放到单位球内（包围盒中心移到原点，最远顶点距离缩放为 1 / buffer），
+# 近表面样本为表面点加上方差分别为 variances 的高斯扰动（各占一半），均匀样本在 [-1, 1]^3 中均匀分布；
+# 文件中 near、uniform 为 (N, 4) 的 float32 数组（前三列为归一化后的坐标，最后一列为有符号距离），
+# offset、scale 为归一化参数（归一化坐标 = (原坐标 - offset) * scale）；返回包含吞吐量（点/秒）的统计信息
+def write_sdf_samples(mesh, file_path, num_near=500000, num_uniform=25000, variances=(0.0025, 0.00025),
+                      buffer=1.03, chunk_size=CHUNK_SIZE, workers=1, seed=0, compress=True):
+    vertices = np.asarray(mesh.vertices, dtype=np.float64)
+    triangles = np.asarray(mesh.indices, dtype=np.int64).reshape(-1, 3)
+    finite = np.isfinite(vertices).all(axis=1)
+    lower, upper = vertices[finite].min(axis=0), vertices[finite].max(axis=0)
+    offset = (lower + upper) / 2
+    scale = 1 / (np.linalg.norm(vertices[finite] - offset, axis=1).max() * buffer)
+    normalized = (vertices - offset) * scale
+
+    start_time = time.perf_counter()
+    field = SignedDistanceField(normalized, triangles)
+    build_seconds = time.perf_counter() - start_time
+    rng = np.random.default_rng(seed)
+    corners = field.bvh.corners
+    cumulative_areas = np.cumsum(np.linalg.norm(np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]), axis=1))
+
+    def near_chunks():
+        for start in range(0, num_near, chunk_size):
+            count = min(chunk_size, num_near - start)
+            points = sample_surface(corners, cumulative_areas, count, rng)
+            sigma = np.sqrt(np.where(np.arange(start, start + count) % 2 == 0, variances[0], variances[1]))
+            yield points + rng.normal(size=(count, 3)) * sigma[:, np.newaxis]
+
+    def uniform_chunks():
+        for start in range(0, num_uniform, chunk_size):
+            yield rng.uniform(-1, 1, size=(min(chunk_size, num_uniform - start), 3))
+
+    def rows(results):
+        for points, distances in results:
+            yield np.column_stack([points, distances])
+
+    executor = field.process_pool(workers) if workers != 1 else None
+    try:
+        with NpzStreamWriter(file_path, compress) as writer:
+            writer.write_chunks("near", (num_near, 4), np.float32, rows(field.stream(near_chunks(), executor)))
+            writer.write_chunks("uniform", (num_uniform, 4), np.float32, rows(field.stream(uniform_chunks(), executor)))
+            writer.write("offset", offset)
+            writer.write("scale", np.float64(scale))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    seconds = time.perf_counter() - start_time
+    num_points = num_near + num_uniform
+    return {
+        "points": num_points,
+        "triangles": len(field.bvh.corners),
+        "build_seconds": build_seconds,
+        "seconds": seconds,
+        "points_per_second": num_points / seconds if seconds > 0 else float('inf'),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate DeepSDF-style signed distance samples for an OBJ mesh.")
+    parser.add_argument("input", help="OBJ file")
+    parser.add_argument("output", help="output .npz file")
+    parser.add_argument("--near", type=int, default=500000, help="number of near-surface samples")
+    parser.add_argument("--uniform", type=int, default=25000, help="number of uniform samples")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes (0 for all CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="points per batch")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-compress", action="store_true", help="store arrays without deflate compression")
+    args = parser.parse_args()
+
+    mesh = CustomMesh.from_obj(args.input)
+    stats = write_sdf_samples(mesh, args.output, args.near, args.uniform, chunk_size=args.chunk_size,
+                              workers=args.workers or None, seed=args.seed, compress=not args.no_compress)
+    print(f"{stats['points']} points, {stats['triangles']} triangles: BVH {stats['build_seconds']:.2f} s, "
+          f"total {stats['seconds']:.2f} s, {stats['points_per_second']:.0f} points/s")
+
+if __name__ == "__main__":
+    main()
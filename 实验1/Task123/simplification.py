@@ -0,0 +1,381 @@
+import numpy as np
+from half_edge import HalfEdgeMesh, index_dtype, unique_flags, unique_keys
+
+# 二次误差度量（QEM，Garland–Heckbert）网格简化
+# 每个顶点的误差二次型 Q 用对称 4x4 矩阵的 10 个独立元素表示：
+# (a2, ab, ac, ad, b2, bc, bd, c2, cd, d2)，对应平面 ax + by + cz + d = 0 的 [a b c d]^T [a b c d]
+QUADRIC_SIZE = 10
+DEGENERATE_DET = 1e-12  # 行列式绝对值低于该值（相对于二次型的尺度）时不求最优点，改为在端点和中点中选取
+FLIP_THRESHOLD = 0.0  # 折叠后面法向量与原法向量夹角的余弦低于该值视为翻转，拒绝这次折叠
+MIN_BATCH = 256  # 每批从队列中取出的最少候选数
+DELETED = np.iinfo(np.int64).max  # 已删除顶点的修改时间戳，使关联的候选全部失效
+BATCH_FRACTION = 1 / 16  # 每批取出的候选数占剩余顶点数的比例
+
+# 批量计算每个三角形所在平面的二次型（按面积加权），返回 (F, 10)
+def face_quadrics(vertices, triangles):
+    v0, v1, v2 = vertices[triangles[:, 0]], vertices[triangles[:, 1]], vertices[triangles[:, 2]]
+    normals = np.cross(v1 - v0, v2 - v0)
+    double_areas = np.linalg.norm(normals, axis=1)
+    valid = double_areas > 0
+    normals[valid] /= double_areas[valid, np.newaxis]
+    normals[~valid] = 0
+    a, b, c = normals.T
+    d = -np.einsum('ij,ij->i', normals, v0)
+    weights = double_areas / 2
+    return weights[:, np.newaxis] * np.stack([a * a, a * b, a * c, a * d, b * b, b * c, b * d, c * c, c * d, d * d], axis=1)
+
+# 将每个面的二次型累加到它的三个顶点上，返回 (V, 10)
+def vertex_quadrics(vertices, triangles):
+    quadrics = np.repeat(face_quadrics(vertices, triangles), 3, axis=0)
+    corner_vertex = triangles.ravel()
+    result = np.empty((len(vertices), QUADRIC_SIZE))
+    for column in range(QUADRIC_SIZE):
+        result[:, column] = np.bincount(corner_vertex, weights=quadrics[:, column], minlength=len(vertices))
+    return result
+
+# 二次型在各点处的误差 v^T Q v，q 为 (N, 10)，points 为 (N, 3)
+def quadric_error(q, points):
+    a2, ab, ac, ad, b2, bc, bd, c2, cd, d2 = q.T
+    x, y, z = points.T
+    error = (a2 * x * x + 2 * ab * x * y + 2 * ac * x * z + 2 * ad * x
+             + b2 * y * y + 2 * bc * y * z + 2 * bd * y + c2 * z * z + 2 * cd * z + d2)
+    return np.maximum(error, 0)
+
+# 批量计算边折叠的位置和误差：q 为两端点二次型之和 (E, 10)，p1、p2 为端点坐标 (E, 3)
+# 二次型的 3x3 部分可逆时取误差最小的点，否则在中点和两个端点中选误差最小的
+def collapse_costs(q, p1, p2):
+    a2, ab, ac, ad, b2, bc, bd, c2, cd, d2 = q.T
+    det = a2 * (b2 * c2 - bc * bc) - ab * (ab * c2 - bc * ac) + ac * (ab * bc - b2 * ac)
+    scale = np.maximum(np.abs(a2) + np.abs(b2) + np.abs(c2), 1e-300) ** 3
+    solvable = np.abs(det) > DEGENERATE_DET * scale
+
+    # 克拉默法则求解 A p = -b
+    safe_det = np.where(solvable, det, 1.0)
+    optimal = -np.stack([
+        ad * (b2 * c2 - bc * bc) - ab * (bd * c2 - bc * cd) + ac * (bd * bc - b2 * cd),
+        a2 * (bd * c2 - cd * bc) - ad * (ab * c2 - bc * ac) + ac * (ab * cd - bd * ac),
+        a2 * (b2 * cd - bc * bd) - ab * (ab * cd - bd * ac) + ad * (ab * bc - b2 * ac),
+    ], axis=1) / safe_det[:, np.newaxis]
+
+    positions = np.where(solvable[:, np.newaxis], optimal, (p1 + p2) / 2)
+    costs = quadric_error(q, positions)
+    for candidate in (p1, p2):
+        candidate_costs = quadric_error(q, candidate)
+        better = ~solvable & (candidate_costs < costs)
+        costs[better] = candidate_costs[better]
+        positions[better] = candidate[better]
+    return costs, positions
+
+# 展开 CSR 区间：返回各区间元素的位置，以及每个元素所属区间的序号
+def expand_ranges(starts, counts):
+    total = int(counts.sum())
+    owner = np.repeat(np.arange(len(counts)), counts)
+    index = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(starts, counts)
+    return index, owner
+
+# 边的散列值，用于打乱同一批候选的顺序
+def spread_hash(edges):
+    return (edges[:, 0].astype(np.int64) * 2654435761 + edges[:, 1].astype(np.int64) * 40503) % 1000003
+
+# 候选边的优先队列：候选 (误差, 边, 时间戳) 按误差排好序分段保存（类似二项堆，长度相近的段合并，段数为对数级），
+# 放入和取出都是整批的数组操作；取出时只看各段开头的一小部分，不需要遍历整个队列；
+# is_valid(edges, stamps) 判断候选是否仍然有效，失效的候选在取出或合并时才丢弃（惰性失效）
+class CandidateQueue:
+    def __init__(self, is_valid):
+        self.is_valid = is_valid
+        self.runs = []  # 每段为 [误差, 边, 时间戳, 开头位置]
+
+    def __len__(self):
+        return sum(len(run[0]) - run[3] for run in self.runs)
+
+    # 放入一批候选：排序后作为新的一段，与末尾长度相近的段合并
+    def push(self, costs, edges, stamps):
+        if len(costs) == 0:
+            return
+        order = np.argsort(costs, kind='stable')
+        run = [costs[order], edges[order], stamps[order], 0]
+        while self.runs and len(self.runs[-1][0]) - self.runs[-1][3] <= 2 * len(run[0]):
+            run = self.merge(self.runs.pop(), run)
+        self.runs.append(run)
+
+    # 合并两段，同时丢弃失效的候选
+    def merge(self, first, second):
+        costs = np.concatenate([first[0][first[3]:], second[0][second[3]:]])
+        edges = np.concatenate([first[1][first[3]:], second[1][second[3]:]])
+        stamps = np.concatenate([first[2][first[3]:], second[2][second[3]:]])
+        valid = self.is_valid(edges, stamps)
+        costs, edges, stamps = costs[valid], edges[valid], stamps[valid]
+        order = np.argsort(costs, kind='stable')
+        return [costs[order], edges[order], stamps[order], 0]
+
+    # 取出误差最小的 count 个有效候选，按误差从小到大返回 (误差, 边, 时间戳)
+    def pop(self, count):
+        results = []
+        while count > 0 and self.runs:
+            # 每段取开头的 count 个，合起来选出最小的 count 个；各段内已排序且按稳定排序选取，每段被取走的总是开头的一部分
+            heads = [(run[0][run[3]:run[3] + count], run) for run in self.runs]
+            pool = np.concatenate([head for head, _ in heads])
+            taken = np.zeros(len(pool), dtype=bool)
+            taken[np.argsort(pool, kind='stable')[:count]] = True
+            parts, offset = [], 0
+            for head, run in heads:
+                number = int(taken[offset:offset + len(head)].sum())
+                offset += len(head)
+                start = run[3]
+                parts.append((run[0][start:start + number], run[1][start:start + number], run[2][start:start + number]))
+                run[3] += number
+            self.runs = [run for run in self.runs if run[3] < len(run[0])]
+
+            costs, edges, stamps = (np.concatenate(column) for column in zip(*parts))
+            order = np.argsort(costs, kind='stable')
+            costs, edges, stamps = costs[order], edges[order], stamps[order]
+            valid = self.is_valid(edges, stamps)
+            results.append((costs[valid], edges[valid], stamps[valid]))
+            count -= int(valid.sum())
+        if not results:
+            return np.zeros(0), np.zeros((0, 2), dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return tuple(np.concatenate(column) for column in zip(*results))
+
+# 在候选（按优先级编号）中贪心地选出占用的资源（面或顶点）互不相交的一组：每轮选出在自己占用的所有资源上优先级都最高的候选，
+# 再去掉与已选候选共用资源的候选，最多重复 rounds 轮；faces、owners 为各候选占用的资源及其所属候选，只在 pending 的候选中选择
+def select_independent(faces, owners, pending, count, rounds=8):
+    order = np.argsort(faces * count + owners)
+    owner = owners[order]
+    group = np.cumsum(unique_flags(faces[order])) - 1  # 同一个面的记录相邻，按候选的优先级排列
+    num_groups = int(group[-1]) + 1 if len(group) else 0
+    pending = pending.copy()
+    chosen = np.zeros(count, dtype=bool)
+    for _ in range(rounds):
+        if not pending.any():
+            break
+        index = np.flatnonzero(pending[owner])
+        current_group, current_owner = group[index], owner[index]
+        first = current_owner[np.maximum.accumulate(np.where(unique_flags(current_group), np.arange(len(index)), 0))]
+        losers = np.bincount(current_owner[first != current_owner], minlength=count) > 0
+        winners = pending & ~losers
+        chosen |= winners
+        taken = np.bincount(current_group[winners[current_owner]], minlength=num_groups) > 0
+        conflicting = np.bincount(current_owner[taken[current_group]], minlength=count) > 0
+        pending &= ~(winners | conflicting)
+    return chosen
+
+# 三角网格的 QEM 简化引擎：
+# 初始的二次型和所有边的折叠误差用 NumPy 批量计算，候选边放入优先队列（CandidateQueue）；
+# 候选记录计算时的时间戳，端点之后被修改或删除的候选在取出时直接丢弃（惰性失效），不需要在队列中查找删除；
+# 每批从队列中取出误差最小的一组候选，其中关联面互不相交的候选互不影响，可以一起检查并折叠，其余的放回队列；
+# 连接关系增量更新：面片数组中被删除顶点的编号原地替换为保留的顶点，同一个顶点合并过的原始顶点用链表串起来，
+# 一个顶点的关联面是链表上各原始顶点的初始关联面中仍然有效的那些，不需要重建邻接关系；
+# protect_boundary 为 True 时边界点（以及非流形边上的点）固定不动：两端都是固定点的边不折叠，一端是固定点时折叠到该点
+class QuadricSimplifier:
+    def __init__(self, vertices, triangles, protect_boundary=True):
+        self.positions = np.array(vertices, dtype=np.float64)
+        triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+        num_vertices = len(self.positions)
+
+        # 去掉退化（有重复顶点）的三角形
+        distinct = (triangles[:, 0] != triangles[:, 1]) & (triangles[:, 1] != triangles[:, 2]) & (triangles[:, 0] != triangles[:, 2])
+        self.faces = triangles[distinct].copy()
+        num_faces = len(self.faces)
+        half_edges = HalfEdgeMesh(np.arange(0, 3 * num_faces + 1, 3), self.faces.ravel(), num_vertices)
+        edges = half_edges.edge_vertices().astype(np.int64)
+
+        self.locked = np.zeros(num_vertices, dtype=bool)
+        if protect_boundary:
+            self.locked[edges[half_edges.edge_count != 2].ravel()] = True
+
+        self.quadrics = vertex_quadrics(self.positions, self.faces)
+        self.face_alive = np.ones(num_faces, dtype=bool)
+
+        # 初始关联面（CSR 形式）和合并链表：next_member[v] 为链表中的下一个原始顶点，last_member 为链表尾
+        corner_vertex = self.faces.ravel()
+        self.incident_faces = np.argsort(corner_vertex, kind='stable') // 3
+        self.incident_offsets = np.zeros(num_vertices + 1, dtype=np.int64)
+        np.cumsum(np.bincount(corner_vertex, minlength=num_vertices), out=self.incident_offsets[1:])
+        self.next_member = np.full(num_vertices, -1, dtype=np.int64)
+        self.last_member = np.arange(num_vertices, dtype=np.int64)
+
+        self.vertex_alive = np.diff(self.incident_offsets) > 0
+        self.num_alive = int(self.vertex_alive.sum())
+        # 时间戳：modified[v] 为顶点最后一次被修改时的批次（已删除的顶点为 DELETED），候选记录计算时的批次，
+        # 端点在候选计算之后被修改过的候选即已失效
+        self.clock = 0
+        self.modified = np.full(num_vertices, -1, dtype=np.int64)
+        self.modified[~self.vertex_alive] = DELETED
+        self.collapses = 0
+
+        self.index_dtype = index_dtype(num_vertices)
+        self.queue = CandidateQueue(self.is_valid)
+        self.push_edges(edges[:, 0], edges[:, 1])
+
+    # 候选是否仍然有效：两个端点在候选计算之后都没有被修改或删除
+    def is_valid(self, edges, stamps):
+        return np.maximum(self.modified[edges[:, 0]], self.modified[edges[:, 1]]) < stamps
+
+    # 计算一组边的折叠误差并放入队列，两端都固定的边跳过
+    def push_edges(self, u, v):
+        movable = ~(self.locked[u] & self.locked[v])
+        u, v = u[movable], v[movable]
+        costs = self.collapse_targets(u, v)[0]
+        self.queue.push(costs, np.stack([u, v], axis=1).astype(self.index_dtype), np.full(len(u), self.clock, dtype=np.int64))
+
+    # 一组边折叠后的误差和位置：一端固定时位置取固定点
+    def collapse_targets(self, u, v):
+        q = self.quadrics[u] + self.quadrics[v]
+        p1, p2 = self.positions[u], self.positions[v]
+        costs, positions = collapse_costs(q, p1, p2)
+        for end, point in ((u, p1), (v, p2)):
+            fixed = self.locked[end]
+            if fixed.any():
+                positions[fixed] = point[fixed]
+                costs[fixed] = quadric_error(q[fixed], point[fixed])
+        return costs, positions
+
+    # 一组顶点当前的关联面，返回 (面, 所属顶点在输入中的序号)：沿合并链表批量收集各原始顶点的初始关联面，再去掉已删除的面
+    def gather_faces(self, vertices):
+        faces, owners = [], []
+        active = np.arange(len(vertices))
+        member = np.asarray(vertices, dtype=np.int64)
+        while len(active) > 0:
+            starts = self.incident_offsets[member]
+            index, local = expand_ranges(starts, self.incident_offsets[member + 1] - starts)
+            faces.append(self.incident_faces[index])
+            owners.append(active[local])
+            member = self.next_member[member]
+            going = member >= 0
+            active, member = active[going], member[going]
+        faces = np.concatenate(faces)
+        owners = np.concatenate(owners)
+        alive = self.face_alive[faces]
+        return faces[alive], owners[alive]
+
+    # 检查一批互不相交的折叠：两端点的公共邻点数必须等于公共面数加 2（否则折叠后变成非流形），折叠后还要剩下有效的面，
+    # 且其余关联面折叠后不能翻转；faces、owners、moved 为各折叠的关联面、所属折叠和面中被移动的端点，返回每个折叠是否可行
+    def check_collapses(self, u, v, targets, faces, owners, moved):
+        count = len(u)
+        num_vertices = len(self.positions)
+        corners = self.faces[faces]
+        other = np.where(moved == u[owners], v[owners], u[owners])
+        shared = (corners == other[:, np.newaxis]).any(axis=1)
+        shared_count = np.bincount(owners[shared], minlength=count) // 2  # 公共面在 u、v 两侧各出现一次
+
+        # 邻点：u 侧和 v 侧各自去重，再统计公共邻点数和邻点总数
+        keys = owners[:, np.newaxis] * num_vertices + corners
+        side = (moved == v[owners]).astype(np.int64)
+        side_keys = unique_keys((keys * 2 + side[:, np.newaxis]).ravel())
+        neighbor_keys = side_keys // 2
+        common_flags = np.zeros(len(neighbor_keys), dtype=bool)
+        common_flags[1:] = neighbor_keys[1:] == neighbor_keys[:-1]
+        neighbor_owner = neighbor_keys // num_vertices
+        common = np.bincount(neighbor_owner[common_flags], minlength=count)
+        union = np.bincount(neighbor_owner, minlength=count) - common
+        ok = (common - 2 == shared_count) & (union - 2 > shared_count)
+
+        # 翻转检查
+        kept = ~shared
+        corners, owners, moved = corners[kept], owners[kept], moved[kept]
+        old = self.positions[corners]
+        new = old.copy()
+        rows, columns = np.nonzero(corners == moved[:, np.newaxis])
+        new[rows, columns] = targets[owners[rows]]
+        old_normals = np.cross(old[:, 1] - old[:, 0], old[:, 2] - old[:, 0])
+        new_normals = np.cross(new[:, 1] - new[:, 0], new[:, 2] - new[:, 0])
+        old_lengths = np.linalg.norm(old_normals, axis=1)
+        dots = np.einsum('ij,ij->i', old_normals, new_normals)
+        limit = FLIP_THRESHOLD * old_lengths * np.linalg.norm(new_normals, axis=1)
+        flipped = (dots <= limit) & (old_lengths > 0)  # 原本就退化的面不做检查
+        flipped = np.bincount(owners[flipped], minlength=count) > 0
+        return ok & ~flipped
+
+    # 从队列中取出一批候选，折叠其中可行且互不相交的边，返回是否还有候选
+    def step(self, target_vertices):
+        excess = self.num_alive - target_vertices
+        costs, edges, stamps = self.queue.pop(max(MIN_BATCH, min(excess, int(self.num_alive * BATCH_FRACTION))))
+        if len(costs) == 0:
+            return False
+        # 同一批候选的误差都在最小的一部分之内，视为同等优先，按散列值打乱顺序（序号即优先级）后再选互不相交的一组：
+        # 误差在网格上连续变化，按误差排序时局部最小的候选很少，每批只能选出很少的候选
+        order = np.argsort(spread_hash(edges), kind='stable')
+        costs, edges, stamps = costs[order], edges[order], stamps[order]
+        u, v = edges[:, 0].astype(np.int64), edges[:, 1].astype(np.int64)
+        swap = self.locked[u] & ~self.locked[v]  # 保留被固定的端点 v，u 折叠到 v
+        u[swap], v[swap] = v[swap], u[swap]
+
+        # 选出关联面互不相交的一组候选，其余候选放回队列，选中的候选再检查是否可行，不可行的直接丢弃；
+        # 关联面互不相交的候选端点也互不相同，先按端点筛选，只为剩下的候选收集关联面
+        count = len(u)
+        chosen = select_independent(np.concatenate([u, v]), np.tile(np.arange(count), 2), np.ones(count, dtype=bool), count)
+        chosen_index = np.flatnonzero(chosen)
+        endpoints = np.concatenate([u[chosen_index], v[chosen_index]])
+        faces, owners = self.gather_faces(endpoints)
+        moved = endpoints[owners]
+        owners = chosen_index[owners % len(chosen_index)]
+        chosen = select_independent(faces, owners, chosen, count)
+        chosen_index = np.flatnonzero(chosen)
+        self.queue.push(costs[~chosen], edges[~chosen], stamps[~chosen])
+
+        local = np.full(count, -1, dtype=np.int64)
+        local[chosen_index] = np.arange(len(chosen_index))
+        in_chosen = chosen[owners]
+        u, v = u[chosen_index], v[chosen_index]
+        faces, owners, moved = faces[in_chosen], local[owners[in_chosen]], moved[in_chosen]
+        targets = self.collapse_targets(u, v)[1]
+        ok = self.check_collapses(u, v, targets, faces, owners, moved)
+        ok[np.flatnonzero(ok)[max(excess, 0):]] = False  # 剩余顶点数不能低于目标
+        if ok.any():
+            self.apply_collapses(u[ok], v[ok], targets[ok], faces, owners, moved, ok)
+        return True
+
+    # 执行一批互不相交的折叠：u 合并到 v，v 移动到目标位置
+    def apply_collapses(self, u, v, targets, faces, owners, moved, ok):
+        in_ok = ok[owners]
+        faces, owners, moved = faces[in_ok], owners[in_ok], moved[in_ok]
+        local = np.cumsum(ok) - 1
+        owners = local[owners]
+
+        corners = self.faces[faces]
+        shared = (corners == u[owners][:, np.newaxis]).any(axis=1) & (corners == v[owners][:, np.newaxis]).any(axis=1)
+        self.face_alive[faces[shared]] = False
+        from_u = ~shared & (moved == u[owners])
+        relabel = faces[from_u]
+        self.faces[relabel] = np.where(self.faces[relabel] == u[owners[from_u]][:, np.newaxis],
+                                       v[owners[from_u]][:, np.newaxis], self.faces[relabel])
+
+        self.next_member[self.last_member[v]] = u
+        self.last_member[v] = self.last_member[u]
+        self.quadrics[v] += self.quadrics[u]
+        self.positions[v] = targets
+        self.locked[v] |= self.locked[u]
+        self.vertex_alive[u] = False
+        self.modified[u] = DELETED
+        self.modified[v] = self.clock
+        self.clock += 1
+        self.num_alive -= len(u)
+        self.collapses += len(u)
+
+        # 保留顶点与其新的邻点组成的边重新放入队列
+        kept = ~shared
+        corners, owners = self.faces[faces[kept]], owners[kept]
+        pairs = unique_keys((owners[:, np.newaxis] * len(self.positions) + corners).ravel())
+        pair_owner, neighbor = np.divmod(pairs, len(self.positions))
+        center = v[pair_owner]
+        not_self = neighbor != center
+        self.push_edges(center[not_self], neighbor[not_self])
+
+    # 折叠误差最小的边，直到剩余顶点数不超过 target_vertices 或没有可折叠的边
+    def run(self, target_vertices):
+        while self.num_alive > target_vertices and self.step(target_vertices):
+            pass
+
+    # 返回简化后的 (顶点, 三角形)，删除不再被引用的顶点并重新编号
+    def result(self):
+        faces = self.faces[self.face_alive]
+        used = np.zeros(len(self.positions), dtype=bool)
+        used[faces.ravel()] = True
+        new_index = np.cumsum(used) - 1
+        return self.positions[used], new_index[faces]
+
+# 简化三角网格到 target_vertices 个顶点，返回 (顶点, 三角形)
+def simplify(vertices, triangles, target_vertices, protect_boundary=True):
+    simplifier = QuadricSimplifier(vertices, triangles, protect_boundary)
+    simplifier.run(target_vertices)
+    return simplifier.result()
@@ -0,0 +1,428 @@
+import argparse
+import math
+import os
+import struct
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from half_edge import unique_flags
+from mesh_export import open_output
+from procedural import load_mesh
+from simplification import expand_ranges
+
+# 无显卡、无窗口的软件光栅化：
+# 用与 MeshViewer 相同的相机（glTranslatef(0, 0, zoom)、绕 x 轴和 y 轴旋转、gluPerspective(45, w/h, 1, 100)）、
+# 光源和材质（见 setup_lighting）把 CustomMesh 绘制成点、线框或 Phong 光照的面图像，全部为 NumPy 数组运算：
+# 三角形按包围盒与 TILE_SIZE 大小的格子切成若干块，每批处理的候选像素数不超过 BATCH_FRAGMENTS，
+# 片元按深度与 z 缓冲比较，同一像素只保留最近的片元（延迟着色：先记下三角形和透视校正的重心坐标，最后逐像素计算一次光照）；
+# 运行本模块可以并行生成 Object 文件夹中模型的缩略图，与基准图像比较，并报告大网格的绘制吞吐量
+DRAW_MODES = ("point", "line", "fill")
+FIELD_OF_VIEW = 45.0  # 与 MeshViewer.resizeGL 一致
+NEAR, FAR = 1.0, 100.0
+DEFAULT_ZOOM = -5.0  # MeshViewer 的初始缩放
+POINT_SIZE = 5  # 与 MeshViewer.initializeGL 中的 glPointSize、glLineWidth 一致
+LINE_WIDTH = 3
+TILE_SIZE = 16
+BATCH_FRAGMENTS = 1 << 20  # 每批处理的候选像素数上限，限制临时数组的大小
+
+# 光照参数，与 MeshViewer.setup_lighting 一致；GL_COLOR_MATERIAL 下材质的环境光和漫反射取当前颜色（白色）；
+# 背景为默认的清屏颜色黑色，点和线框为白色，不受光照影响
+LIGHT_POSITION = np.array([0.0, 10.0, 10.0, 1.0])  # 在设置光源时的模型视图变换下
+GLOBAL_AMBIENT = 0.2  # OpenGL 默认的全局环境光
+LIGHT_AMBIENT, LIGHT_DIFFUSE, LIGHT_SPECULAR = 0.2, 0.8, 1.0
+SHININESS = 50.0
+
+# 绕坐标轴旋转 angle 度的 4x4 矩阵，与 glRotatef 一致
+def rotation_matrix(angle, axis):
+    c, s = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+    i, j = [(1, 2), (2, 0), (0, 1)][axis]
+    matrix = np.eye(4)
+    matrix[i, i], matrix[i, j], matrix[j, i], matrix[j, j] = c, -s, s, c
+    return matrix
+
+# 相机：参数与 MeshViewer 的 rotation_x、rotation_y、zoom 和窗口大小相同
+class Camera:
+    def __init__(self, rotation_x=0.0, rotation_y=0.0, zoom=DEFAULT_ZOOM, width=256, height=256, field_of_view=FIELD_OF_VIEW):
+        self.rotation_x = rotation_x
+        self.rotation_y = rotation_y
+        self.zoom = zoom
+        self.width = width
+        self.height = height
+        self.field_of_view = field_of_view
+
+    # 让以原点为中心、包含整个模型的球正好占满视野的相机（视图绕原点旋转，与 lod.LodPyramid 的包围球一致）
+    @classmethod
+    def fit(cls, mesh, rotation_x=0.0, rotation_y=0.0, width=256, height=256, margin=1.1):
+        vertices = np.asarray(mesh.vertices, dtype=np.float64)
+        finite = vertices[np.isfinite(vertices).all(axis=1)]
+        radius = float(np.linalg.norm(finite, axis=1).max()) if len(finite) else 1.0
+        half_angle = math.radians(FIELD_OF_VIEW) / 2
+        if width < height:
+            half_angle = math.atan(math.tan(half_angle) * width / height)
+        zoom = -max(radius * margin / math.sin(half_angle), NEAR + radius)
+        return cls(rotation_x, rotation_y, zoom, width, height)
+
+    # 模型视图矩阵：glTranslatef(0, 0, zoom)、glRotatef(rotation_x, 1, 0, 0)、glRotatef(rotation_y, 0, 1, 0)
+    def model_view(self):
+        translation = np.eye(4)
+        translation[2, 3] = self.zoom
+        return translation @ rotation_matrix(self.rotation_x, 0) @ rotation_matrix(self.rotation_y, 1)
+
+    # 投影矩阵，与 gluPerspective(field_of_view, width / height, NEAR, FAR) 一致
+    def projection(self):
+        f = 1 / math.tan(math.radians(self.field_of_view) / 2)
+        return np.array([
+            [f * self.height / self.width, 0, 0, 0],
+            [0, f, 0, 0],
+            [0, 0, (FAR + NEAR) / (NEAR - FAR), 2 * FAR * NEAR / (NEAR - FAR)],
+            [0, 0, -1, 0],
+        ])
+
+    # 相机空间坐标和屏幕坐标：返回 (相机空间坐标 (N, 3), 屏幕坐标 (N, 3)：x、y 为像素、z 为 [0, 1] 的深度, 1/w, 是否可见)；
+    # 位于近平面之前或坐标非有限的顶点不可见
+    def project(self, vertices, scale=1):
+        vertices = np.asarray(vertices, dtype=np.float64)
+        eye = vertices @ self.model_view()[:3, :3].T + self.model_view()[:3, 3]
+        clip = np.concatenate([eye, np.ones((len(eye), 1))], axis=1) @ self.projection().T
+        visible = np.isfinite(eye).all(axis=1) & (clip[:, 3] > NEAR * (1 - 1e-9))
+        inverse_w = np.divide(1.0, clip[:, 3], out=np.zeros(len(clip)), where=visible)
+        ndc = clip[:, :3] * inverse_w[:, np.newaxis]
+        width, height = self.width * scale, self.height * scale
+        screen = np.stack([(ndc[:, 0] + 1) * width / 2, (1 - ndc[:, 1]) * height / 2, (ndc[:, 2] + 1) / 2], axis=1)
+        return eye, screen, inverse_w, visible
+
+# 帧缓冲：深度缓冲初始为 1（远平面），片元深度小于缓冲中的值才通过（GL_LESS）
+class FrameBuffer:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.depth = np.ones(width * height)
+
+    # 深度测试：返回通过测试且在本批中离相机最近的片元的序号（每个像素至多一个），并更新深度缓冲
+    def resolve(self, pixels, depths):
+        candidates = np.flatnonzero((depths >= 0) & (depths < self.depth[pixels]))
+        candidates = candidates[np.lexsort((depths[candidates], pixels[candidates]))]
+        winners = candidates[unique_flags(pixels[candidates])]
+        self.depth[pixels[winners]] = depths[winners]
+        return winners
+
+# 把总量为 sizes 的工作项分成若干批，每批的总量不超过 budget（单项超出时单独成批），返回各批的 (起点, 终点)
+def batches(sizes, budget=BATCH_FRAGMENTS):
+    ends = np.cumsum(sizes)
+    start = 0
+    while start < len(sizes):
+        base = ends[start - 1] if start else 0
+        end = max(int(np.searchsorted(ends, base + budget, 'right')), start + 1)
+        yield start, end
+        start = end
+
+# 按矩形 [x0, x1] × [y0, y1]（像素，含两端）展开像素：返回每个像素的 (所属矩形, x, y)
+def rectangle_pixels(x0, x1, y0, y1):
+    widths = x1 - x0 + 1
+    counts = widths * (y1 - y0 + 1)
+    local, owner = expand_ranges(np.zeros(len(counts), dtype=np.int64), counts)
+    return owner, x0[owner] + local % widths[owner], y0[owner] + local // widths[owner]
+
+# 光栅化三角形：screen 为顶点的屏幕坐标，返回每个像素所属的三角形（没有为 -1）和透视校正的重心坐标
+def rasterize_triangles(frame, screen, inverse_w, visible, triangles):
+    triangles = triangles[visible[triangles].all(axis=1)]
+    x, y, z = screen[triangles, 0], screen[triangles, 1], screen[triangles, 2]
+    area = (x[:, 1] - x[:, 0]) * (y[:, 2] - y[:, 0]) - (x[:, 2] - x[:, 0]) * (y[:, 1] - y[:, 0])
+    # 覆盖的像素中心 (i + 0.5, j + 0.5) 所在的包围盒，裁剪到屏幕内
+    x0 = np.maximum(np.ceil(x.min(axis=1) - 0.5), 0).astype(np.int64)
+    x1 = np.minimum(np.floor(x.max(axis=1) - 0.5), frame.width - 1).astype(np.int64)
+    y0 = np.maximum(np.ceil(y.min(axis=1) - 0.5), 0).astype(np.int64)
+    y1 = np.minimum(np.floor(y.max(axis=1) - 0.5), frame.height - 1).astype(np.int64)
+    keep = (area != 0) & (x0 <= x1) & (y0 <= y1)
+    triangles, x, y, z, area = triangles[keep], x[keep], y[keep], z[keep], area[keep]
+    x0, x1, y0, y1 = x0[keep], x1[keep], y0[keep], y1[keep]
+
+    # 屏幕空间的重心坐标是像素坐标的线性函数 b_k = a_k x + c_k y + d_k（边函数除以有向面积，两种朝向都适用）
+    a = np.stack([y[:, 1] - y[:, 2], y[:, 2] - y[:, 0], y[:, 0] - y[:, 1]], axis=1) / area[:, np.newaxis]
+    c = np.stack([x[:, 2] - x[:, 1], x[:, 0] - x[:, 2], x[:, 1] - x[:, 0]], axis=1) / area[:, np.newaxis]
+    d = np.stack([(x[:, 1] * y[:, 2] - x[:, 2] * y[:, 1]), (x[:, 2] * y[:, 0] - x[:, 0] * y[:, 2]),
+                  (x[:, 0] * y[:, 1] - x[:, 1] * y[:, 0])], axis=1) / area[:, np.newaxis]
+
+    # 包围盒按格子切块：每块为一个三角形在一个格子中的部分
+    tile_x0, tile_x1, tile_y0, tile_y1 = x0 // TILE_SIZE, x1 // TILE_SIZE, y0 // TILE_SIZE, y1 // TILE_SIZE
+    tiles_x = tile_x1 - tile_x0 + 1
+    local, owner = expand_ranges(np.zeros(len(triangles), dtype=np.int64), tiles_x * (tile_y1 - tile_y0 + 1))
+    tile_x = tile_x0[owner] + local % tiles_x[owner]
+    tile_y = tile_y0[owner] + local // tiles_x[owner]
+    block_x0 = np.maximum(x0[owner], tile_x * TILE_SIZE)
+    block_x1 = np.minimum(x1[owner], tile_x * TILE_SIZE + TILE_SIZE - 1)
+    block_y0 = np.maximum(y0[owner], tile_y * TILE_SIZE)
+    block_y1 = np.minimum(y1[owner], tile_y * TILE_SIZE + TILE_SIZE - 1)
+    block_sizes = (block_x1 - block_x0 + 1) * (block_y1 - block_y0 + 1)
+
+    triangle_ids = np.full(frame.width * frame.height, -1, dtype=np.int64)
+    weights = np.zeros((frame.width * frame.height, 3))
+    for start, end in batches(block_sizes):
+        block, px, py = rectangle_pixels(block_x0[start:end], block_x1[start:end], block_y0[start:end], block_y1[start:end])
+        triangle = owner[start:end][block]
+        center_x, center_y = px + 0.5, py + 0.5
+        barycentric = a[triangle] * center_x[:, np.newaxis] + c[triangle] * center_y[:, np.newaxis] + d[triangle]
+        inside = (barycentric >= 0).all(axis=1)
+        triangle, barycentric, pixels = triangle[inside], barycentric[inside], (py * frame.width + px)[inside]
+        depths = np.einsum('ij,ij->i', barycentric, z[triangle])
+        winners = frame.resolve(pixels, depths)
+        triangle, barycentric, pixels = triangle[winners], barycentric[winners], pixels[winners]
+        # 屏幕空间的重心坐标按 1/w 加权得到透视校正的重心坐标，用于插值法向量和位置
+        corrected = barycentric * inverse_w[triangles[triangle]]
+        corrected /= corrected.sum(axis=1, keepdims=True)
+        triangle_ids[pixels] = triangle
+        weights[pixels] = corrected
+    return triangle_ids, weights, triangles
+
+# Phong 光照（逐像素插值法向量）：与 OpenGL 的固定管线光照公式相同（无限远观察者，单面光照）
+def shade(eye_positions, eye_normals, light):
+    lengths = np.linalg.norm(eye_normals, axis=1, keepdims=True)
+    normals = np.divide(eye_normals, lengths, out=np.zeros_like(eye_normals), where=lengths > 0)
+    to_light = light - eye_positions
+    to_light /= np.maximum(np.linalg.norm(to_light, axis=1, keepdims=True), 1e-300)
+    diffuse = np.einsum('ij,ij->i', normals, to_light)
+    half_vector = to_light + np.array([0.0, 0.0, 1.0])
+    half_vector /= np.maximum(np.linalg.norm(half_vector, axis=1, keepdims=True), 1e-300)
+    specular = np.where(diffuse > 0, np.maximum(np.einsum('ij,ij->i', normals, half_vector), 0) ** SHININESS, 0)
+    intensity = GLOBAL_AMBIENT + LIGHT_AMBIENT + LIGHT_DIFFUSE * np.maximum(diffuse, 0) + LIGHT_SPECULAR * specular
+    return np.clip(intensity, 0, 1)
+
+# 按方形的点绘制顶点，size 为点的边长（像素）
+def rasterize_points(frame, screen, visible, size):
+    points = np.flatnonzero(visible)
+    image = np.zeros(frame.width * frame.height, dtype=bool)
+    for start, end in batches(np.full(len(points), size * size)):
+        chosen = points[start:end]
+        x0 = np.ceil(screen[chosen, 0] - size / 2 - 0.5).astype(np.int64)
+        y0 = np.ceil(screen[chosen, 1] - size / 2 - 0.5).astype(np.int64)
+        owner, px, py = rectangle_pixels(x0, x0 + size - 1, y0, y0 + size - 1)
+        draw_fragments(frame, image, px, py, screen[chosen[owner], 2])
+    return image
+
+# 绘制线框：每条边沿主方向每个像素取一个采样点，在次方向上加宽到 width 个像素
+def rasterize_lines(frame, screen, visible, edges, width):
+    edges = edges[visible[edges].all(axis=1)]
+    start_points, end_points = screen[edges[:, 0]], screen[edges[:, 1]]
+    delta = end_points - start_points
+    samples = np.ceil(np.minimum(np.abs(delta[:, :2]).max(axis=1), 4 * (frame.width + frame.height))).astype(np.int64) + 1
+    x_major = np.abs(delta[:, 0]) >= np.abs(delta[:, 1])
+    offsets = np.arange(width) - (width - 1) // 2
+    image = np.zeros(frame.width * frame.height, dtype=bool)
+    for start, end in batches(samples * width):
+        step, owner = expand_ranges(np.zeros(end - start, dtype=np.int64), samples[start:end])
+        edge = start + owner
+        t = step / np.maximum(samples[edge] - 1, 1)
+        points = start_points[edge] + t[:, np.newaxis] * delta[edge]
+        points = np.repeat(points, width, axis=0)
+        shift = np.tile(offsets, len(edge))
+        major = np.repeat(x_major[edge], width)
+        px = np.floor(points[:, 0] + np.where(major, 0, shift)).astype(np.int64)
+        py = np.floor(points[:, 1] + np.where(major, shift, 0)).astype(np.int64)
+        draw_fragments(frame, image, px, py, points[:, 2])
+    return image
+
+# 把屏幕内的片元做深度测试后画到覆盖标记 image 上
+def draw_fragments(frame, image, px, py, depths):
+    inside = (px >= 0) & (px < frame.width) & (py >= 0) & (py < frame.height)
+    pixels = (py * frame.width + px)[inside]
+    winners = frame.resolve(pixels, depths[inside])
+    image[pixels[winners]] = True
+
+# 绘制网格，返回 (height, width, 3) 的 uint8 RGB 图像；mode 为 "point"、"line" 或 "fill"，
+# supersample 大于 1 时以该倍数的分辨率绘制后按块平均（抗锯齿），点的大小和线宽同比放大
+def render(mesh, camera, mode="fill", supersample=1):
+    if mode not in DRAW_MODES:
+        raise ValueError(f"mode must be one of {DRAW_MODES}, got {mode!r}")
+    width, height = camera.width * supersample, camera.height * supersample
+    frame = FrameBuffer(width, height)
+    eye, screen, inverse_w, visible = camera.project(mesh.vertices, supersample)
+
+    if mode == "point":
+        intensity = rasterize_points(frame, screen, visible, POINT_SIZE * supersample) * 1.0
+    elif mode == "line":
+        edges = np.asarray(mesh.edge_indices, dtype=np.int64).reshape(-1, 2)
+        intensity = rasterize_lines(frame, screen, visible, edges, LINE_WIDTH * supersample) * 1.0
+    else:
+        triangles = np.asarray(mesh.indices, dtype=np.int64).reshape(-1, 3)
+        triangle_ids, weights, triangles = rasterize_triangles(frame, screen, inverse_w, visible, triangles)
+        covered = np.flatnonzero(triangle_ids >= 0)
+        corners = triangles[triangle_ids[covered]]
+        rotation = camera.model_view()[:3, :3]
+        normals = np.asarray(mesh.normals, dtype=np.float64) @ rotation.T
+        positions = np.einsum('ij,ijk->ik', weights[covered], eye[corners])
+        interpolated = np.einsum('ij,ijk->ik', weights[covered], normals[corners])
+        light = (camera.model_view() @ LIGHT_POSITION)[:3]
+        intensity = np.zeros(width * height)
+        intensity[covered] = shade(positions, interpolated, light)
+
+    pixels = 255 * intensity.reshape(height, width)
+    if supersample > 1:
+        pixels = pixels.reshape(camera.height, supersample, camera.width, supersample).mean(axis=(1, 3))
+    gray = np.round(pixels).astype(np.uint8)
+    return np.repeat(gray[:, :, np.newaxis], 3, axis=2)
+
+# PNG 文件的一个数据块
+def png_chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+# 写出 8 位 RGB PNG 文件（每行不做预测滤波）
+def write_png(file, image):
+    image = np.ascontiguousarray(image, dtype=np.uint8)
+    height, width = image.shape[:2]
+    rows = np.concatenate([np.zeros((height, 1), dtype=np.uint8), image.reshape(height, width * 3)], axis=1)
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    with open_output(file) as f:
+        f.write(b'\x89PNG\r\n\x1a\n' + png_chunk(b'IHDR', header) + png_chunk(b'IDAT', zlib.compress(rows.tobytes(), 6))
+                + png_chunk(b'IEND', b''))
+
+# 读取 8 位 RGB 或 RGBA（不隔行）的 PNG 文件，返回 (height, width, 3) 的 uint8 图像；支持全部 5 种行滤波
+def read_png(file):
+    with open(file, 'rb') as f:
+        data = f.read()
+    if not data.startswith(b'\x89PNG\r\n\x1a\n'):
+        raise ValueError(f"{file} is not a PNG file")
+    position, chunks = 8, {}
+    while position < len(data):
+        length, kind = struct.unpack('>I4s', data[position:position + 8])
+        chunks.setdefault(kind, []).append(data[position + 8:position + 8 + length])
+        position += 12 + length
+    width, height, depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB', chunks[b'IHDR'][0])
+    if depth != 8 or color_type not in (2, 6) or interlace:
+        raise ValueError(f"{file}: only 8-bit non-interlaced RGB/RGBA PNG files are supported")
+    channels = 3 if color_type == 2 else 4
+    stride = width * channels
+    raw = np.frombuffer(zlib.decompress(b''.join(chunks[b'IDAT'])), dtype=np.uint8).reshape(height, stride + 1)
+    image = np.zeros((height, stride), dtype=np.uint8)
+    previous = np.zeros(stride, dtype=np.uint8)
+    for row in range(height):
+        kind, line = raw[row, 0], raw[row, 1:].astype(np.int64)
+        if kind == 1:  # Sub：每个通道沿行累加
+            line = np.cumsum(line.reshape(width, channels), axis=0).ravel()
+        elif kind == 2:  # Up
+            line = line + previous
+        elif kind in (3, 4):  # Average、Paeth 依赖左边已解码的值，逐像素计算
+            line = line.copy()
+            for i in range(stride):
+                left = line[i - channels] if i >= channels else 0
+                up = int(previous[i])
+                if kind == 3:
+                    line[i] = (line[i] + (left + up) // 2) & 0xFF
+                else:
+                    upper_left = int(previous[i - channels]) if i >= channels else 0
+                    estimate = left + up - upper_left
+                    distances = (abs(estimate - left), abs(estimate - up), abs(estimate - upper_left))
+                    line[i] = (line[i] + (left, up, upper_left)[distances.index(min(distances))]) & 0xFF
+        elif kind != 0:
+            raise ValueError(f"{file}: unknown PNG filter {kind}")
+        image[row] = previous = (line & 0xFF).astype(np.uint8)
+    return image.reshape(height, width, channels)[:, :, :3]
+
+# 与基准图像比较：返回最大的通道差和差值超过 threshold 的像素比例，尺寸不同时比例为 1
+def compare_images(image, golden, threshold=8):
+    if image.shape != golden.shape:
+        return {"max_difference": 255, "mismatched_fraction": 1.0}
+    difference = np.abs(image.astype(np.int16) - golden.astype(np.int16)).max(axis=2)
+    return {"max_difference": int(difference.max()), "mismatched_fraction": float((difference > threshold).mean())}
+
+# 生成一个缩略图（在工作进程中运行）：相机为 MeshViewer 的旋转角度，zoom 为 None 时自动取能看到整个模型的距离
+def render_thumbnail(location, output_file, mode="fill", size=256, rotation_x=0.0, rotation_y=0.0, zoom=None, supersample=2):
+    start = time.perf_counter()
+    mesh = load_mesh(location)
+    camera = Camera.fit(mesh, rotation_x, rotation_y, size, size)
+    if zoom is not None:
+        camera.zoom = zoom
+    write_png(output_file, render(mesh, camera, mode, supersample))
+    return {"triangles": len(mesh.indices) // 3, "seconds": time.perf_counter() - start}
+
+# 测量绘制吞吐量：对 location 的网格依次以三种模式绘制，返回 [(模式, 秒数, 三角形数/秒), ...]
+def measure_throughput(location, size=1024, repeat=3):
+    mesh = load_mesh(location)
+    mesh.triangulate_face()  # 三角化和边索引不计入绘制时间
+    mesh.extract_edges()
+    camera = Camera.fit(mesh, 30.0, 30.0, size, size)
+    triangles = len(mesh.indices) // 3
+    results = []
+    for mode in DRAW_MODES:
+        seconds = min(timed(render, mesh, camera, mode) for _ in range(repeat))
+        results.append((mode, seconds, triangles / seconds))
+    return triangles, results
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Render thumbnails of meshes without a GPU or window.")
+    parser.add_argument("inputs", nargs="*", help="OBJ files or procedural:// locations (default: Object/*.obj)")
+    parser.add_argument("--output", default="thumbnails", help="output folder")
+    parser.add_argument("--mode", choices=DRAW_MODES + ("all",), default="fill")
+    parser.add_argument("--size", type=int, help="image width and height in pixels (default 256, 1024 with --throughput)")
+    parser.add_argument("--rotation-x", type=float, default=0.0, help="same as MeshViewer.rotation_x, in degrees")
+    parser.add_argument("--rotation-y", type=float, default=0.0, help="same as MeshViewer.rotation_y, in degrees")
+    parser.add_argument("--zoom", type=float, help="same as MeshViewer.zoom (default: fit the model)")
+    parser.add_argument("--supersample", type=int, default=2, help="antialiasing factor per axis")
+    parser.add_argument("--workers", type=int, default=0, help="number of worker processes (0 for all CPUs)")
+    parser.add_argument("--golden", help="folder of golden images to compare the thumbnails against")
+    parser.add_argument("--update-golden", action="store_true", help="write the thumbnails into the golden folder")
+    parser.add_argument("--threshold", type=int, default=8, help="per-channel difference a pixel may have")
+    parser.add_argument("--tolerance", type=float, default=0.001, help="fraction of pixels allowed to exceed the threshold")
+    parser.add_argument("--throughput", nargs="?", const="procedural://sphere?res=708&domain=clip",
+                        help="report render throughput for a mesh (default: a 1M-triangle sphere)")
+    args = parser.parse_args()
+
+    if args.throughput:
+        triangles, results = measure_throughput(args.throughput, args.size or 1024)
+        for mode, seconds, rate in results:
+            print(f"{mode:6} {triangles} triangles in {seconds:.3f} s ({rate / 1e6:.2f} M triangles/s)")
+        return
+
+    inputs = args.inputs or sorted(os.path.join("Object", name) for name in os.listdir("Object") if name.endswith(".obj"))
+    modes = DRAW_MODES if args.mode == "all" else (args.mode,)
+    os.makedirs(args.output, exist_ok=True)
+    jobs = {}
+    for location in inputs:
+        stem = os.path.splitext(os.path.basename(location))[0] if os.path.exists(location) else location.split("://")[-1]
+        stem = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in stem)
+        for mode in modes:
+            jobs[os.path.join(args.output, f"{stem}_{mode}.png")] = (location, mode)
+
+    start = time.perf_counter()
+    failures = 0
+    with ProcessPoolExecutor(max_workers=args.workers or None) as executor:
+        futures = {executor.submit(render_thumbnail, location, output_file, mode, args.size or 256, args.rotation_x,
+                                   args.rotation_y, args.zoom, args.supersample): output_file
+                   for output_file, (location, mode) in jobs.items()}
+        for future in as_completed(futures):
+            output_file = futures[future]
+            error = future.exception()
+            if error is not None:
+                failures += 1
+                print(f"FAILED {output_file}: {type(error).__name__}: {error}")
+                continue
+            stats = future.result()
+            message = f"{output_file}: {stats['triangles']} triangles in {stats['seconds']:.3f} s"
+            if args.golden:
+                golden_file = os.path.join(args.golden, os.path.basename(output_file))
+                if args.update_golden:
+                    os.makedirs(args.golden, exist_ok=True)
+                    write_png(golden_file, read_png(output_file))
+                    message += ", golden updated"
+                elif not os.path.exists(golden_file):
+                    failures += 1
+                    message += ", NO GOLDEN IMAGE"
+                else:
+                    result = compare_images(read_png(output_file), read_png(golden_file), args.threshold)
+                    ok = result["mismatched_fraction"] <= args.tolerance
+                    failures += not ok
+                    message += (f", {result['mismatched_fraction']:.2%} pixels differ (max {result['max_difference']})"
+                                + ("" if ok else "  MISMATCH"))
+            print(message)
+    print(f"{len(jobs) - failures} of {len(jobs)} thumbnails ok in {time.perf_counter() - start:.2f} s")
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
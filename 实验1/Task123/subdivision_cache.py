@@ -0,0 +1,56 @@
+import threading
+from collections import OrderedDict
+
+# 细分结果缓存：
+# 以 (源网格标识, 细分方案序列) 为键保存各级细分得到的网格，方案序列如 ("Loop", "Loop") 表示对源网格做两次 Loop 细分，
+# 空序列 () 即源网格本身（第 0 级）；请求第 N 级时从已缓存的最深一级继续细分，不必从第 0 级重新计算；
+# 按网格占用的字节数统计总大小，超过 max_bytes 时按最近最少使用（LRU）的顺序淘汰；
+# 细分线程与界面线程会同时访问，所有操作都加锁；缓存中的网格不能被原地修改
+class SubdivisionCache:
+    def __init__(self, max_bytes=1024 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # 键 -> (网格, 字节数)，按最近使用的先后排列
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, source, schemes):
+        with self.lock:
+            key = (source, tuple(schemes))
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            return self.entries[key][0]
+
+    def put(self, source, schemes, mesh):
+        nbytes = mesh.nbytes
+        with self.lock:
+            key = (source, tuple(schemes))
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (mesh, nbytes)
+            self.total_bytes += nbytes
+            self.evict(keep=key)
+
+    # 在 schemes 的各个前缀中查找已缓存的最深一级，返回 (级数, 网格)，只查找长度不小于 min_level 的前缀，找不到时返回 (None, None)
+    def deepest(self, source, schemes, min_level=0):
+        schemes = tuple(schemes)
+        for level in range(len(schemes), min_level - 1, -1):
+            mesh = self.get(source, schemes[:level])
+            if mesh is not None:
+                return level, mesh
+        return None, None
+
+    # 淘汰最久未使用的网格，直到总大小不超过上限（刚放入的网格保留）
+    def evict(self, keep=None):
+        for key in list(self.entries):
+            if self.total_bytes <= self.max_bytes:
+                break
+            if key != keep:
+                self.total_bytes -= self.entries.pop(key)[1]
+
+    # 删除某个源网格的全部缓存，source 为 None 时清空缓存
+    def clear(self, source=None):
+        with self.lock:
+            for key in list(self.entries):
+                if source is None or key[0] == source:
+                    self.total_bytes -= self.entries.pop(key)[1]
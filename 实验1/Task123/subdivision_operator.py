@@ -0,0 +1,110 @@
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# 稀疏线性算子 new_values = S · old_values，S 为 num_new × num_old 的稀疏矩阵，以三元组 (rows, cols, weights) 形式保存；
+# 三元组按行稳定排序保存（同一行内保持原来的先后顺序），乘法用 np.add.reduceat 按行分段求和，
+# 计算在输入的浮点精度（float32 或 float64）下进行，float32 的坐标不会被提升为 float64
+class SparseOperator:
+    def __init__(self, rows, cols, weights, num_old, num_new):
+        order = np.argsort(rows, kind='stable')
+        self.rows = np.asarray(rows, dtype=np.int64)[order]
+        self.cols = np.asarray(cols, dtype=np.int64)[order]
+        self.weights = np.asarray(weights, dtype=np.float64)[order]
+        self.num_old = num_old
+        self.num_new = num_new
+        row_counts = np.bincount(self.rows, minlength=num_new)
+        self.filled_rows = np.flatnonzero(row_counts)  # 至少有一个权重的行
+        self.row_starts = (np.cumsum(row_counts) - row_counts)[self.filled_rows]
+        self.typed_weights = {np.dtype(np.float64): self.weights}  # 各精度的权重，按需转换一次
+
+    @property
+    def nnz(self):
+        return len(self.weights)
+
+    @property
+    def nbytes(self):
+        total = self.rows.nbytes + self.cols.nbytes + self.filled_rows.nbytes + self.row_starts.nbytes
+        return total + sum(weights.nbytes for weights in self.typed_weights.values())
+
+    # 作用于逐顶点属性，values 的第一维为顶点，其余维度任意（如 (N, 3) 的坐标、(N, 2) 的纹理坐标、(N,) 的标量）；
+    # float32 的输入得到 float32 的结果，其他类型按 float64 计算
+    def apply(self, values):
+        values = np.asarray(values)
+        dtype = values.dtype if values.dtype == np.float32 else np.dtype(np.float64)
+        values = values.astype(dtype, copy=False)
+        if len(values) != self.num_old:
+            raise ValueError(f"expected {self.num_old} values, got {len(values)}")
+        weights = self.typed_weights.get(dtype)
+        if weights is None:
+            weights = self.typed_weights[dtype] = self.weights.astype(dtype)
+        # 按分量转置为连续的一维数组后再按列号取值，比在 (N, k) 数组中按列取值快得多
+        columns = np.ascontiguousarray(values.reshape(self.num_old, -1).T)
+        result = np.zeros((len(columns), self.num_new), dtype=dtype)
+        if self.nnz:
+            full = len(self.filled_rows) == self.num_new  # 每行都有权重时直接写入整行
+            for axis, column in enumerate(columns):
+                sums = np.add.reduceat(column[self.cols] * weights, self.row_starts)
+                if full:
+                    result[axis] = sums
+                else:
+                    result[axis, self.filled_rows] = sums
+        return np.ascontiguousarray(result.T).reshape((self.num_new,) + values.shape[1:])
+
+# 细分算子：一次细分的线性映射 new_values = S · old_values 及细分后的面片数组
+# S 只由网格的连接关系决定，连接关系不变时（网格变形、平滑后重新细分，或同一模板网格换了几何），细分只需一次稀疏矩阵乘法；
+# 同一个算子也可以批量细分颜色、纹理坐标等其他逐顶点属性
+class SubdivisionOperator(SparseOperator):
+    def __init__(self, rows, cols, weights, num_old, num_new, face_offsets, face_flat):
+        super().__init__(rows, cols, weights, num_old, num_new)
+        self.face_offsets = face_offsets  # 细分后的面片（CSR 形式）
+        self.face_flat = face_flat
+        self.refined_half_edges = None  # 细分后网格的半边结构，首次使用后缓存，连接关系相同的网格共用
+
+    @property
+    def nbytes(self):
+        total = super().nbytes + self.face_offsets.nbytes + self.face_flat.nbytes
+        if self.refined_half_edges is not None:
+            total += self.refined_half_edges.nbytes
+        return total
+
+# 网格连接关系的标识：面片数组和顶点数的内容哈希，extra 为算子还依赖的其他数据
+def topology_key(face_offsets, face_flat, num_vertices, extra=b''):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.int64(num_vertices).tobytes())
+    digest.update(np.ascontiguousarray(face_offsets, dtype=np.int64).tobytes())
+    digest.update(np.ascontiguousarray(face_flat, dtype=np.int64).tobytes())
+    digest.update(extra)
+    return digest.hexdigest()
+
+# 细分算子缓存：以 (细分方案, 连接关系标识) 为键，按算子占用的字节数做 LRU 淘汰
+class OperatorCache:
+    def __init__(self, max_bytes=512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            operator = self.entries.get(key)
+            if operator is not None:
+                self.entries.move_to_end(key)
+            return operator
+
+    def put(self, key, operator):
+        with self.lock:
+            self.entries[key] = operator
+            self.entries.move_to_end(key)
+            total = sum(entry.nbytes for entry in self.entries.values())
+            for old_key in list(self.entries):
+                if total <= self.max_bytes:
+                    break
+                if old_key != key:
+                    total -= self.entries.pop(old_key).nbytes
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+OPERATOR_CACHE = OperatorCache()
@@ -0,0 +1,279 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+from multiprocessing import shared_memory
+import numpy as np
+from custom_mesh import CustomMesh
+from profiling import PROFILER, MemorySink
+
+# 在独立进程中细分：
+# 细分在子进程中进行，不占用界面进程的 GIL；网格数组通过共享内存传递（子进程写入、主进程复制后释放），不需要序列化；
+# 创建方在接收方复制完之前一直保持共享内存打开（Windows 上最后一个句柄关闭时共享内存即被释放）：
+# 输入网格由主进程保持到请求结束，每一级的结果由子进程保持到主进程通过确认队列告知已复制；
+# 每细分完一级立即发回结果，界面可以先显示第 1 级；新的请求会取代正在进行的请求，
+# 子进程正在计算时直接终止并在下次请求时重新启动，取消不需要等待当前这一级算完
+
+# 传递的网格数组及其在共享内存名称中的简称
+MESH_ARRAYS = {"vertices": "v", "normals": "n", "face_offsets": "o", "face_flat": "f", "indices": "i", "edge_indices": "e"}
+POLL_SECONDS = 0.05  # 等待结果时检查取消标记的间隔
+
+# 把数组复制到新建的共享内存中，返回 (描述 {名称: (共享内存名, 形状, 类型)}, 打开的共享内存列表)；
+# 共享内存由创建方在接收方复制完之后关闭（close_blocks），由接收方删除
+def share_arrays(arrays, prefix):
+    descriptors, blocks = {}, []
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        block = shared_memory.SharedMemory(name=f"{prefix}{MESH_ARRAYS[name]}", create=True, size=max(array.nbytes, 1))
+        blocks.append(block)
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        descriptors[name] = (block.name, array.shape, array.dtype.str)
+    return descriptors, blocks
+
+# 关闭本进程持有的共享内存，unlink 为 True 时同时删除（已被删除的忽略）
+def close_blocks(blocks, unlink=False):
+    for block in blocks:
+        block.close()
+        if unlink:
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+
+# 从共享内存中复制出数组，unlink 为 True 时复制后删除共享内存
+def attach_arrays(descriptors, unlink=True):
+    arrays = {}
+    for name, (block_name, shape, dtype) in descriptors.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        try:
+            arrays[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf).copy()
+        finally:
+            block.close()
+            if unlink:
+                block.unlink()
+    return arrays
+
+# 删除可能残留的共享内存（子进程被终止时已创建但未被接收的结果）
+def unlink_blocks(prefixes):
+    for prefix in prefixes:
+        for short_name in MESH_ARRAYS.values():
+            try:
+                block = shared_memory.SharedMemory(name=f"{prefix}{short_name}")
+            except (FileNotFoundError, OSError):
+                continue
+            block.close()
+            block.unlink()
+
+def mesh_arrays(mesh):
+    face_offsets, face_flat = mesh.face_arrays()
+    return {"vertices": mesh.vertices, "normals": mesh.normals, "face_offsets": face_offsets,
+            "face_flat": face_flat, "indices": mesh.indices, "edge_indices": mesh.edge_indices}
+
+# 由数组重建网格；输入网格只传递顶点和面片（细分时不需要法线、三角形索引和边索引）
+def mesh_from_arrays(arrays):
+    mesh = CustomMesh()
+    mesh.vertices = arrays["vertices"]
+    mesh.set_face_arrays(arrays["face_offsets"], arrays["face_flat"])
+    if "normals" in arrays:
+        mesh.normals = arrays["normals"]
+        mesh.indices = arrays["indices"]
+        mesh.edge_indices = arrays["edge_indices"]
+    return mesh
+
+# 按主进程的确认关闭已被复制的结果：确认为 (任务号, 级数)，级数为 None 表示请求已结束、全部关闭；
+# wait 为 False 时只处理已经到达的确认，为 True 时等到这个请求的共享内存全部关闭
+def close_acknowledged(acks, job_id, blocks, wait):
+    while blocks:
+        try:
+            ack_id, level = acks.get(block=wait)
+        except queue.Empty:
+            return
+        if ack_id != job_id:
+            continue  # 之前请求的确认
+        for acknowledged in (list(blocks) if level is None else [level]):
+            close_blocks(blocks.pop(acknowledged, []))
+
+# 子进程的主循环：任务为 (任务号, 输入网格的共享内存描述, 细分方案序列, 是否收集阶段耗时, 共享内存名前缀)，
+# 每完成一级发出 (任务号, "level", (级数, 结果描述, 耗时, 阶段耗时))，全部完成发出 "done"，出错发出 "error"；
+# 结果的共享内存保持打开，直到 acks 中收到主进程的确认
+def serve(jobs, results, acks):
+    while True:
+        job = jobs.get()
+        if job is None:
+            return
+        job_id, descriptors, schemes, profile, prefix = job
+        blocks = {}  # 级数 -> 主进程尚未确认复制的结果共享内存
+        try:
+            mesh = mesh_from_arrays(attach_arrays(descriptors, unlink=False))  # 输入由主进程在任务结束后删除
+            for level, scheme in enumerate(schemes, 1):
+                sink = MemorySink() if profile else None
+                if sink is not None:
+                    PROFILER.add_sink(sink)
+                start = time.perf_counter()
+                try:
+                    mesh = mesh.subdivide(scheme)
+                    mesh.triangulate_face()
+                    mesh.extract_edges()
+                finally:
+                    if sink is not None:
+                        PROFILER.remove_sink(sink)
+                seconds = time.perf_counter() - start
+                timings = [(path, entry["seconds"]) for path, entry in sink.top()] if sink is not None else None
+                level_descriptors, blocks[level] = share_arrays(mesh_arrays(mesh), f"{prefix}{level}")
+                results.put((job_id, "level", (level, level_descriptors, seconds, timings)))
+                close_acknowledged(acks, job_id, blocks, wait=False)
+            results.put((job_id, "done", None))
+        except Exception as error:
+            results.put((job_id, "error", f"{type(error).__name__}: {error}"))
+        close_acknowledged(acks, job_id, blocks, wait=True)
+
+# 一次细分请求，由 SubdivisionService.submit 创建
+class SubdivisionJob:
+    def __init__(self, service, job_id, schemes, prefix, results, acks):
+        self.service = service
+        self.id = job_id
+        self.schemes = tuple(schemes)
+        self.prefix = prefix
+        self.results = results
+        self.acks = acks
+        self.input_blocks = []  # 主进程持有的输入网格共享内存，请求结束时关闭并删除
+        self.cancelled = False
+        self.finished = False
+
+    # 共享内存名前缀：输入网格和每一级的结果各用一个
+    def block_prefixes(self):
+        return [f"{self.prefix}0"] + [f"{self.prefix}{level}" for level in range(1, len(self.schemes) + 1)]
+
+    # 按顺序逐级返回 (级数, 网格, 耗时秒数, 阶段耗时)，级数从 1 开始；请求被取消时提前结束，子进程出错时抛出 RuntimeError；
+    # 没有读到结束就不再读取时按取消处理，终止子进程中的计算
+    def levels(self):
+        completed = False
+        try:
+            while not self.cancelled:
+                try:
+                    job_id, kind, payload = self.results.get(timeout=POLL_SECONDS)
+                except queue.Empty:
+                    if not self.service.is_running(self):
+                        raise RuntimeError("subdivision process exited unexpectedly")
+                    continue
+                except (EOFError, OSError, ValueError):  # 取消时队列随子进程一起关闭
+                    if self.cancelled:
+                        return
+                    raise
+                if job_id != self.id:
+                    continue  # 被取代的旧请求留下的结果
+                if kind in ("done", "error"):
+                    completed = True
+                if kind == "done":
+                    return
+                if kind == "error":
+                    raise RuntimeError(payload)
+                level, descriptors, seconds, timings = payload
+                try:
+                    arrays = attach_arrays(descriptors)
+                except FileNotFoundError:
+                    if self.cancelled:
+                        return  # 取消时结果已被删除
+                    raise
+                self.service.acknowledge(self, level)
+                yield level, mesh_from_arrays(arrays), seconds, timings
+        finally:
+            if not completed:
+                self.service.cancel(self)
+            self.finished = True
+            self.service.release(self)
+
+# 细分服务：保持一个常驻的子进程（spawn 方式启动，首次请求时创建），同一时间只处理一个请求
+class SubdivisionService:
+    def __init__(self):
+        self.context = multiprocessing.get_context("spawn")
+        self.process = None
+        self.jobs = None
+        self.results = None
+        self.acks = None
+        self.active = None
+        self.lock = threading.Lock()
+
+    def start_process(self):
+        self.jobs = self.context.Queue()
+        self.results = self.context.Queue()
+        self.acks = self.context.Queue()
+        self.process = self.context.Process(target=serve, args=(self.jobs, self.results, self.acks), daemon=True)
+        self.process.start()
+
+    # 结束子进程并关闭与它通信的队列（释放队列的信号量），仍在运行时直接终止
+    def stop_process(self):
+        self.process.terminate()
+        self.process.join()
+        for channel in (self.jobs, self.results, self.acks):
+            channel.cancel_join_thread()
+            channel.close()
+        self.process = self.jobs = self.results = self.acks = None
+
+    # 提交细分请求：mesh 为起始网格，schemes 为依次进行的细分方案；正在进行的请求被取消
+    def submit(self, mesh, schemes, profile=False):
+        with self.lock:
+            if self.active is not None:
+                self.cancel_locked(self.active)
+            if self.process is None or not self.process.is_alive():
+                self.start_process()
+            prefix = f"ms{os.getpid() % 10000}{uuid.uuid4().hex[:8]}_"
+            job = SubdivisionJob(self, uuid.uuid4().hex, schemes, prefix, self.results, self.acks)
+            face_offsets, face_flat = mesh.face_arrays()
+            input_arrays = {"vertices": np.asarray(mesh.vertices), "face_offsets": face_offsets, "face_flat": face_flat}
+            descriptors, job.input_blocks = share_arrays(input_arrays, f"{prefix}0")
+            self.jobs.put((job.id, descriptors, job.schemes, profile, prefix))
+            self.active = job
+            return job
+
+    # 取消请求：子进程仍在计算这个请求时直接终止，残留的共享内存随即删除
+    def cancel(self, job):
+        with self.lock:
+            self.cancel_locked(job)
+
+    def cancel_locked(self, job):
+        if job.cancelled:
+            return
+        job.cancelled = True
+        if self.active is job:
+            if not job.finished and self.process is not None:
+                self.stop_process()
+            self.active = None
+        unlink_blocks(job.block_prefixes()[1:])  # 被终止的子进程已创建但未被接收的结果
+        self.close_input(job)
+
+    # 告知子进程某一级结果已复制（level 为 None 表示请求已结束），子进程已被重启时不再发送
+    def acknowledge(self, job, level):
+        with self.lock:
+            self.acknowledge_locked(job, level)
+
+    def acknowledge_locked(self, job, level):
+        if job.acks is not None and job.acks is self.acks:
+            job.acks.put((job.id, level))
+
+    @staticmethod
+    def close_input(job):
+        blocks, job.input_blocks = job.input_blocks, []
+        close_blocks(blocks, unlink=True)
+
+    # 请求结束（完成、出错或取消）后让子进程关闭全部结果，并关闭、删除输入网格的共享内存
+    def release(self, job):
+        with self.lock:
+            if self.active is job:
+                self.active = None
+            self.acknowledge_locked(job, None)
+            self.close_input(job)
+
+    def is_running(self, job):
+        return job.cancelled or (self.process is not None and self.process.is_alive())
+
+    def shutdown(self):
+        with self.lock:
+            if self.active is not None:
+                self.cancel_locked(self.active)
+            if self.process is not None:
+                self.jobs.put(None)
+                self.process.join(timeout=1)
+                self.stop_process()
@@ -0,0 +1,109 @@
+import os
+import numpy as np
+import pytest
+from benchmark import compare, run_benchmarks
+from procedural import load_mesh
+from precision import check_accuracy
+from software_render import compare_images, read_png, render_thumbnail, write_png
+
+# 无需窗口和 GPU 的回归检查（在仓库根目录运行 python -m pytest 实验1/Task123）：
+# GPU 缓冲区在相机移动时不重新上传、float32 路径与 float64 路径的误差、极限位置的一致性、
+# 基准结果的比较，以及软件渲染的缩略图与基准图像的比较
+OBJECT_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "Object")
+CUBE = os.path.join(OBJECT_FOLDER, "正方体.obj")
+SADDLE = os.path.join(OBJECT_FOLDER, "马鞍.obj")
+SCHEMES = ("Loop", "Catmull-Clark")
+
+# 记录调用的 OpenGL 替身，只实现 MeshBuffers 用到的函数和常量
+class RecordingGL:
+    GL_ARRAY_BUFFER, GL_ELEMENT_ARRAY_BUFFER, GL_STATIC_DRAW, GL_FLOAT, GL_FALSE = 1, 2, 3, 4, 0
+    GL_POINTS, GL_LINES, GL_TRIANGLES, GL_UNSIGNED_SHORT, GL_UNSIGNED_INT = 5, 6, 7, 8, 9
+    GL_POINT, GL_LINE, GL_FILL = 10, 11, 12
+
+    def __init__(self):
+        self.calls = []
+        self.next_name = 1
+
+    def __getattr__(self, name):
+        if not name.startswith("gl"):
+            raise AttributeError(name)
+
+        def call(*args):
+            self.calls.append(name)
+            if name in ("glGenBuffers", "glGenVertexArrays"):
+                names = list(range(self.next_name, self.next_name + args[0]))
+                self.next_name += args[0]
+                return names if args[0] > 1 else names[0]
+        return call
+
+# 相机移动只重绘、不重新上传，网格改变时才上传
+def test_buffers_upload_only_when_mesh_changes():
+    pytest.importorskip("OpenGL.GL")
+    from gpu_buffers import MeshBuffers
+    gl = RecordingGL()
+    buffers = MeshBuffers(gl)
+    mesh = load_mesh(CUBE)
+    for _ in range(50):
+        buffers.update(mesh)
+        for mode in (gl.GL_POINT, gl.GL_LINE, gl.GL_FILL):
+            buffers.draw(mode)
+    assert buffers.upload_count == 1
+    assert gl.calls.count("glGenBuffers") == 1 and gl.calls.count("glBufferData") == 2
+
+    subdivided = mesh.subdivide("Catmull-Clark")
+    buffers.update(subdivided)
+    assert buffers.upload_count == 2
+    assert buffers.edge_index_count == len(subdivided.half_edges.edge_vertices()) * 2
+
+# float32 路径不被提升为 float64，误差在 precision 命令行的默认容差之内
+@pytest.mark.parametrize("scheme", SCHEMES)
+@pytest.mark.parametrize("location", [CUBE, SADDLE, "procedural://sphere?res=24&domain=clip"])
+def test_float32_accuracy(location, scheme):
+    for report in check_accuracy(location, scheme, levels=2):
+        assert report["relative_error"] <= 1e-5
+        assert report["normal_degrees"] <= 0.5
+        assert report["bytes32"] < report["bytes64"]
+
+# 极限位置与极限法线在继续细分后不变：原有顶点在下一级中的极限与本级的极限相同（含边界规则）
+@pytest.mark.parametrize("scheme", SCHEMES)
+@pytest.mark.parametrize("location", [CUBE, SADDLE, "procedural://paraboloid?res=9"])
+def test_limit_is_invariant_under_subdivision(location, scheme):
+    mesh = load_mesh(location).subdivide(scheme)
+    finer = mesh.subdivide(scheme)
+    limit, finer_limit = mesh.project_to_limit(scheme), finer.project_to_limit(scheme)
+    count = len(mesh.vertices)
+    np.testing.assert_allclose(finer_limit.vertices[:count], limit.vertices, atol=1e-9)
+    np.testing.assert_allclose(finer_limit.normals[:count], limit.normals, atol=1e-9)
+
+# 与自身比较没有回归，耗时和内存超过阈值的阶段被报告
+def test_benchmark_compare_flags_regressions():
+    results = run_benchmarks("", [], [], levels=1, max_faces=10_000, locations=["procedural://square?res=8"])
+    assert results and compare(results, {"results": results}, threshold=0.2) == []
+
+    baseline = {"results": [dict(entry, seconds=1.0, peak_bytes=1000) for entry in results]}
+    within = [dict(entry, seconds=1.1, peak_bytes=1100) for entry in results]
+    assert compare(within, baseline, threshold=0.2) == []
+    slower = [dict(entry, seconds=1.5, peak_bytes=2000) for entry in results]
+    regressions = compare(slower, baseline, threshold=0.2)
+    assert sorted(regression["metric"] for regression in regressions) == ["peak_bytes"] * len(results) + ["seconds"] * len(results)
+
+# 缩略图与基准图像一致，相机改变后的图像被判为不一致
+@pytest.mark.parametrize("mode", ["point", "line", "fill"])
+def test_thumbnail_matches_golden(tmp_path, mode):
+    golden_file = tmp_path / "golden.png"
+    render_thumbnail(CUBE, str(golden_file), mode, size=64, rotation_x=25, rotation_y=35)
+    golden = read_png(str(golden_file))
+    assert golden.shape == (64, 64, 3) and golden.any()
+
+    image_file = tmp_path / "image.png"
+    render_thumbnail(CUBE, str(image_file), mode, size=64, rotation_x=25, rotation_y=35)
+    assert compare_images(read_png(str(image_file)), golden) == {"max_difference": 0, "mismatched_fraction": 0.0}
+
+    render_thumbnail(CUBE, str(image_file), mode, size=64, rotation_x=25, rotation_y=80)
+    assert compare_images(read_png(str(image_file)), golden)["mismatched_fraction"] > 0.01
+
+# PNG 写入后读回的图像不变
+def test_png_round_trip(tmp_path):
+    image = np.random.default_rng(0).integers(0, 256, (17, 23, 3), dtype=np.uint8)
+    write_png(str(tmp_path / "image.png"), image)
+    np.testing.assert_array_equal(read_png(str(tmp_path / "image.png")), image)